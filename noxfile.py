@@ -13,6 +13,14 @@ def tests(session, cocotb):
     session.run("make", external=True)
 
 
+@nox.session
+def benchmarks(session):
+    """Fail if Monitor._recv got slower than its recorded minimum speedups"""
+    session.install("cocotb")
+    session.install(".")
+    session.run("python", "tests/benchmarks/monitor_benchmark.py", "--check")
+
+
 def create_env_for_docs_build(session: nox.Session) -> None:
     session.run("pip", "install", "-r", "docs/requirements.txt")
 
@@ -45,9 +45,19 @@ if cocotb_2x_or_newer:
     def test_success():
         cocotb.pass_test()
 
+    def array_indices(handle):
+        return list(handle.range)
+
+    def value_change(signal):
+        return signal.value_change
+
+    def cancel_task(task):
+        task.cancel()
+
 else:
     from cocotb.binary import BinaryValue
     from cocotb.result import TestSuccess
+    from cocotb.triggers import Edge
 
     BinaryType = BinaryValue
 
@@ -70,3 +80,14 @@ else:
 
     def test_success():
         return TestSuccess()
+
+    def array_indices(handle):
+        left, right = handle._range
+        step = 1 if left <= right else -1
+        return list(range(left, right + step, step))
+
+    def value_change(signal):
+        return Edge(signal)
+
+    def cancel_task(task):
+        task.kill()
@@ -8,6 +8,46 @@
 A bus is simply defined as a collection of signals.
 """
 
+import collections.abc
+import operator
+import weakref
+
+from cocotb_bus._compat import array_indices, create_binary
+
+# Per-entity index of casefolded member names, shared by every Bus on that entity.
+# The hierarchy cannot change after elaboration, so an index never goes stale.
+_name_indices = weakref.WeakKeyDictionary()
+
+
+def _get_name_index(entity):
+    """Return a dict mapping casefolded member names of *entity* to their real names.
+
+    The index is built on first use with a single :func:`dir` call and cached.
+    If several members casefold to the same name, the first one in :func:`dir`
+    order wins, like a linear scan would.
+    """
+    try:
+        return _name_indices[entity]
+    except (KeyError, TypeError):
+        pass
+    index = {}
+    for a in dir(entity):
+        index.setdefault(a.casefold(), a)
+    try:
+        _name_indices[entity] = index
+    except TypeError:
+        # not weak-referenceable, so it can't be cached
+        pass
+    return index
+
+
+def _case_insensitive_getattr(entity, attr):
+    """Look up *attr* on *entity* ignoring case, returning ``None`` if absent."""
+    real_name = _get_name_index(entity).get(attr.casefold())
+    if real_name is None:
+        return None
+    return getattr(entity, real_name)
+
 
 def _build_sig_attr_dict(signals):
     if isinstance(signals, dict):
@@ -25,8 +65,22 @@ class Bus:
     to be named ``dut.stream_in_valid`` and ``dut.stream_in_data`` (with
     the default separator '_').
 
+    Writes done through :attr:`shadow` (e.g. ``bus.shadow.valid = 1``)
+    can optionally skip values that were already written,
+    see :class:`BusShadow` and the *coalesce_writes* argument.
+
+    A packed ``struct`` port, i.e. a single vector named ``entity.<bus_name>``,
+    is supported by giving the bit position of each signal in *layout*::
+
+        bus = Bus(dut, "stream_in", ["valid", "data"], layout={"valid": 8, "data": (7, 0)})
+
+    :meth:`drive` then packs all fields into one integer and writes the port once,
+    and :meth:`capture` reads the port once and unpacks all fields.
+    Each field is also available as an attribute with a ``value``,
+    but it can't be used as a trigger.
+
     TODO:
-        Support for ``struct``/``record`` ports where signals are member names.
+        Support for unpacked ``struct``/``record`` ports where signals are member names.
     """
 
     def __init__(
@@ -38,6 +92,8 @@ class Bus:
         bus_separator="_",
         case_insensitive=True,
         array_idx=None,
+        coalesce_writes=False,
+        layout=None,
     ):
         """
         Args:
@@ -58,10 +114,34 @@ class Bus:
             case_insensitive (bool, optional): Perform case-insensitive match on signal names.
                 Defaults to True.
             array_idx (int or None, optional): Optional index when signal is an array.
+            coalesce_writes (bool, optional): Skip writes done through :attr:`shadow`
+                when the value is unchanged since the last write.
+                Only valid if nothing but this bus writes its signals.
+                Defaults to False.
+            layout (dict, optional): Treat the bus as the single packed-vector port *name*
+                and map each signal name to its bit position in the port,
+                either as an ``(msb, lsb)`` tuple or as a single bit index.
+                Optional signals missing from *layout* are ignored.
+                Bits of the port not covered by *layout* are driven as ``0``.
         """
         self._entity = entity
         self._name = name
         self._signals = {}
+        self._packed = None
+        self.shadow = None
+        self._invalidate_plans()
+        if layout is not None:
+            self._init_packed(
+                name,
+                signals,
+                optional_signals,
+                layout,
+                array_idx,
+                case_insensitive,
+                coalesce_writes,
+            )
+            return
+
         for attr_name, sig_name in _build_sig_attr_dict(signals).items():
             if name:
                 signame = name + bus_separator + sig_name
@@ -85,11 +165,57 @@ class Bus:
                     "Ignoring optional missing signal %s on bus %s" % (sig_name, name)
                 )
 
+        self.shadow = _make_shadow_type(tuple(self._signals))(
+            self._signals, coalesce_writes
+        )
+
+    def _init_packed(
+        self,
+        name,
+        signals,
+        optional_signals,
+        layout,
+        array_idx,
+        case_insensitive,
+        coalesce_writes,
+    ):
+        self._entity._log.debug("Packed port {}, idx {}".format(name, array_idx))
+        if case_insensitive:
+            handle = self._caseInsensGetattr(self._entity, name)
+            if handle is None:
+                raise self._missing_attr_error("find", self._entity, name)
+        else:
+            handle = getattr(self._entity, name)
+        if array_idx is not None:
+            handle = handle[array_idx]
+
+        fields = {}
+        for attr_name, field_name in _build_sig_attr_dict(signals).items():
+            if field_name not in layout:
+                raise AttributeError(
+                    "Packed port {} has no field {} in its layout".format(
+                        name, field_name
+                    )
+                )
+            fields[attr_name] = layout[field_name]
+        for attr_name, field_name in _build_sig_attr_dict(optional_signals).items():
+            if field_name in layout:
+                fields[attr_name] = layout[field_name]
+            else:
+                self._entity._log.debug(
+                    "Ignoring optional missing field %s on bus %s" % (field_name, name)
+                )
+
+        self._packed = _PackedPort(handle, fields)
+        for attr_name, field in self._packed.fields.items():
+            setattr(self, attr_name, field)
+            self._signals[attr_name] = field
+        self.shadow = _make_shadow_type(tuple(self._signals))(
+            self._signals, coalesce_writes
+        )
+
     def _caseInsensGetattr(self, obj, attr):
-        for a in dir(obj):
-            if a.casefold() == attr.casefold():
-                return getattr(obj, a)
-        return None
+        return _case_insensitive_getattr(obj, attr)
 
     def _add_signal(self, attr_name, signame, array_idx=None, case_insensitive=True):
         self._entity._log.debug("Signal name {}, idx {}".format(signame, array_idx))
@@ -101,6 +227,48 @@ class Bus:
             handle = handle[array_idx]
         setattr(self, attr_name, handle)
         self._signals[attr_name] = getattr(self, attr_name)
+        self._invalidate_plans()
+        if self.shadow is not None:
+            # signal added after construction, the shadow needs the new attribute
+            self.shadow = _make_shadow_type(tuple(self._signals))(
+                self._signals, self.shadow.enabled
+            )
+
+    def _invalidate_plans(self):
+        # Plans and the capture type are compiled lazily from ``_signals``
+        self._plan = None
+        self._capture_type = None
+        # types of objects seen without some of the signal attributes
+        self._partial_attr_types = set()
+
+    def _get_plan(self):
+        """Return the compiled ``(items, handles, getter)`` plan of this bus.
+
+        *getter* fetches all signal attributes of an object in bus order with one call,
+        it is ``None`` for single-signal buses since :func:`operator.attrgetter`
+        doesn't return a tuple for a single name.
+        """
+        if self._plan is None:
+            getter = None
+            if len(self._signals) > 1:
+                getter = operator.attrgetter(*self._signals)
+            self._plan = (
+                tuple(self._signals.items()),
+                tuple(self._signals.values()),
+                getter,
+            )
+        return self._plan
+
+    def _missing_attr_error(self, action, obj, attr_name):
+        return AttributeError(
+            "Unable to {0} {1}.{2} because {3} is missing attribute {4}".format(
+                action,
+                self._entity._name,
+                self._name,
+                type(obj).__qualname__,
+                attr_name,
+            )
+        )
 
     def drive(self, obj, strict=False):
         """Drives values onto the bus.
@@ -112,52 +280,85 @@ class Bus:
         Raises:
             AttributeError: If not all signals have been assigned when ``strict=True``.
         """
-        for attr_name, hdl in self._signals.items():
-            if not hasattr(obj, attr_name):
+        if self._packed is not None:
+            return self._drive_packed(obj, strict)
+
+        items, handles, getter = self._plan or self._get_plan()
+
+        # Objects of a type that had all attributes before take the fast path
+        if getter is not None and type(obj) not in self._partial_attr_types:
+            try:
+                values = getter(obj)
+            except AttributeError:
+                self._partial_attr_types.add(type(obj))
+            else:
+                if self.shadow.enabled:
+                    for (attr_name, _), val in zip(items, values):
+                        self.shadow._write(attr_name, val)
+                    return
+                for hdl, val in zip(handles, values):
+                    hdl.value = val
+                return
+
+        for attr_name, hdl in items:
+            val = getattr(obj, attr_name, _MISSING)
+            if val is _MISSING:
                 if strict:
-                    msg = (
-                        "Unable to drive onto {0}.{1} because {2} is missing "
-                        "attribute {3}".format(
-                            self._entity._name,
-                            self._name,
-                            type(obj).__qualname__,
-                            attr_name,
-                        )
-                    )
-                    raise AttributeError(msg)
-                else:
-                    continue
-            val = getattr(obj, attr_name)
-            hdl.value = val
+                    raise self._missing_attr_error("drive onto", obj, attr_name)
+                continue
+            if self.shadow.enabled:
+                self.shadow._write(attr_name, val)
+            else:
+                hdl.value = val
+
+    def _drive_packed(self, obj, strict):
+        packed = self._packed
+        shadow = self.shadow
+        for attr_name, field in self._signals.items():
+            val = getattr(obj, attr_name, _MISSING)
+            if val is _MISSING:
+                if strict:
+                    raise self._missing_attr_error("drive onto", obj, attr_name)
+                continue
+            packed.set_field(field, val)
+            if shadow.enabled:
+                # keep the shadow in step with the port for later field writes
+                shadow._remember(attr_name, val)
+        if shadow.enabled and packed.unchanged():
+            shadow.skipped_writes += 1
+            return
+        packed.write()
+        shadow.writes += 1
+
+    def _get_capture_type(self):
+        if self._capture_type is None:
+            self._capture_type = _make_capture_type(tuple(self._signals))
+        return self._capture_type
 
     def capture(self):
         """Capture the values from the bus, returning an object representing the capture.
 
+        The returned record type is built once per bus and only stores the signal values,
+        so capturing every clock cycle is cheap.
+
         Returns:
-            dict: A dictionary that supports access by attribute,
+            Mapping: A read-only mapping that supports access by attribute,
             where each attribute corresponds to each signal's value.
+            It compares equal to a :class:`dict` with the same items.
+            Fields of a packed port are :class:`int`,
+            unless the port holds non-0/1 values.
         Raises:
             RuntimeError: If signal not present in bus,
                 or attempt to modify a bus capture.
         """
-
-        class _Capture(dict):
-            def __getattr__(self, name):
-                if name in self:
-                    return self[name]
-                else:
-                    raise RuntimeError("Signal {} not present in bus".format(name))
-
-            def __setattr__(self, name, value):
-                raise RuntimeError("Modifying a bus capture is not supported")
-
-            def __delattr__(self, name):
-                raise RuntimeError("Modifying a bus capture is not supported")
-
-        _capture = _Capture()
-        for attr_name, hdl in self._signals.items():
-            _capture[attr_name] = hdl.value
-
+        capture_type = self._capture_type or self._get_capture_type()
+        _capture = capture_type.__new__(capture_type)
+        if self._packed is not None:
+            values = self._packed.unpack()
+        else:
+            values = [hdl.value for hdl in (self._plan or self._get_plan())[1]]
+        for slot, value in zip(capture_type._slots, values):
+            slot.__set__(_capture, value)
         return _capture
 
     def sample(self, obj, strict=False):
@@ -171,25 +372,456 @@ class Bus:
         Raises:
             AttributeError: If attribute is missing in *obj* when ``strict=True``.
         """
-        for attr_name, hdl in self._signals.items():
-            if not hasattr(obj, attr_name):
+        if self._packed is not None:
+            for attr_name, value in zip(self._signals, self._packed.unpack()):
+                if strict and not hasattr(obj, attr_name):
+                    raise self._missing_attr_error("sample from", obj, attr_name)
+                if hasattr(obj, attr_name):
+                    setattr(obj, attr_name, value)
+            return
+
+        items, handles, getter = self._plan or self._get_plan()
+
+        values = None
+        if getter is not None and type(obj) not in self._partial_attr_types:
+            try:
+                values = getter(obj)
+            except AttributeError:
+                self._partial_attr_types.add(type(obj))
+        if values is None:
+            values = [getattr(obj, attr_name, _MISSING) for attr_name, _ in items]
+
+        for (attr_name, hdl), current in zip(items, values):
+            if current is _MISSING:
                 if strict:
-                    msg = (
-                        "Unable to sample from {0}.{1} because {2} is missing "
-                        "attribute {3}".format(
-                            self._entity._name,
-                            self._name,
-                            type(obj).__qualname__,
-                            attr_name,
-                        )
-                    )
-                    raise AttributeError(msg)
-                else:
-                    continue
+                    raise self._missing_attr_error("sample from", obj, attr_name)
+                continue
+            value = hdl.value
             # Try to use the get/set_binstr methods because they will not clobber the properties
             # of obj.attr_name on assignment.  Otherwise use setattr() to crush whatever type of
             # object was in obj.attr_name with hdl.value:
-            try:
-                getattr(obj, attr_name).set_binstr(hdl.value.get_binstr())
-            except AttributeError:
-                setattr(obj, attr_name, hdl.value)
+            set_binstr = getattr(current, "set_binstr", None)
+            get_binstr = getattr(value, "get_binstr", None)
+            if set_binstr is not None and get_binstr is not None:
+                set_binstr(get_binstr())
+            else:
+                setattr(obj, attr_name, value)
+
+    @classmethod
+    def _from_handles(cls, entity, name, handles, coalesce_writes=False):
+        """Create a bus from already resolved signal handles, without any lookups.
+
+        Args:
+            entity (SimHandle): The entity containing the bus.
+            name (str): Name of the bus.
+            handles (dict): Maps bus attribute names to signal handles.
+            coalesce_writes (bool, optional): See :class:`Bus`.
+        """
+        bus = cls.__new__(cls)
+        bus._entity = entity
+        bus._name = name
+        bus._signals = dict(handles)
+        bus._packed = None
+        bus._invalidate_plans()
+        for attr_name, handle in bus._signals.items():
+            setattr(bus, attr_name, handle)
+        bus.shadow = _make_shadow_type(tuple(bus._signals))(
+            bus._signals, coalesce_writes
+        )
+        return bus
+
+
+class BusArray:
+    """An indexed array of buses whose signals are HDL arrays.
+
+    Each signal is resolved once, as with :class:`Bus`,
+    and the per-index :class:`Bus` objects are sliced from those array handles
+    when they're first accessed.
+    This is equivalent to creating ``Bus(..., array_idx=i)`` for every index,
+    without resolving the signals again for each of them.
+
+    Example::
+
+        lanes = BusArray(dut, "in", ["data", "valid"])
+        lanes[1].valid.value = 1
+        for bus in lanes:
+            ...
+
+    Args:
+        entity (SimHandle): :class:`SimHandle` instance to the entity containing the buses.
+        name (str): Name of the buses, see :class:`Bus`.
+        signals (list or dict): Signals of each bus, see :class:`Bus`.
+        optional_signals (list or dict, optional): Signals that don't have to be present
+            on the interface, see :class:`Bus`.
+        bus_separator (str, optional): Character(s) to use as separator between bus
+            name and signal name. Defaults to '_'.
+        case_insensitive (bool, optional): Perform case-insensitive match on signal names.
+            Defaults to True.
+        coalesce_writes (bool, optional): Passed on to each :class:`Bus`.
+            Defaults to False.
+        indices (iterable of int, optional): Indices of the array to use.
+            Defaults to all indices of the first signal, in left-to-right order.
+    """
+
+    def __init__(
+        self,
+        entity,
+        name,
+        signals,
+        optional_signals=[],
+        bus_separator="_",
+        case_insensitive=True,
+        coalesce_writes=False,
+        indices=None,
+    ):
+        self._entity = entity
+        self._name = name
+        self._coalesce_writes = coalesce_writes
+        self._arrays = {}
+
+        for attr_name, sig_name in _build_sig_attr_dict(signals).items():
+            signame = name + bus_separator + sig_name if name else sig_name
+            if case_insensitive:
+                handle = _case_insensitive_getattr(entity, signame)
+            else:
+                handle = getattr(entity, signame)
+            self._arrays[attr_name] = handle
+
+        for attr_name, sig_name in _build_sig_attr_dict(optional_signals).items():
+            signame = name + bus_separator + sig_name if name else sig_name
+            handle = _case_insensitive_getattr(entity, signame)
+            if handle is not None:
+                self._arrays[attr_name] = handle
+            else:
+                entity._log.debug(
+                    "Ignoring optional missing signal %s on bus %s" % (sig_name, name)
+                )
+
+        if indices is None:
+            indices = array_indices(next(iter(self._arrays.values())))
+        self.indices = tuple(indices)
+        self._buses = {}
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, idx):
+        try:
+            return self._buses[idx]
+        except KeyError:
+            pass
+        if idx not in self.indices:
+            raise IndexError("Bus %s has no index %r" % (self._name, idx))
+        bus = Bus._from_handles(
+            self._entity,
+            self._name,
+            {attr_name: hdl[idx] for attr_name, hdl in self._arrays.items()},
+            coalesce_writes=self._coalesce_writes,
+        )
+        self._buses[idx] = bus
+        return bus
+
+    def __iter__(self):
+        for idx in self.indices:
+            yield self[idx]
+
+    def __repr__(self):
+        return "%s(%s, %r)" % (type(self).__qualname__, self._name, self.indices)
+
+
+class _BusObjectArray:
+    """Common implementation of :class:`~cocotb_bus.drivers.BusDriverArray`
+    and :class:`~cocotb_bus.monitors.BusMonitorArray`.
+    """
+
+    _base_class = object
+
+    def __init__(
+        self,
+        cls,
+        entity,
+        name,
+        clock,
+        *args,
+        bus_separator="_",
+        case_insensitive=True,
+        coalesce_writes=False,
+        indices=None,
+        **kwargs,
+    ):
+        if not issubclass(cls, self._base_class):
+            raise TypeError(
+                "Expected a sub-class of %s but got %s"
+                % (self._base_class.__qualname__, cls.__qualname__)
+            )
+        self.buses = BusArray(
+            entity,
+            name,
+            cls._signals,
+            optional_signals=cls._optional_signals,
+            bus_separator=bus_separator,
+            case_insensitive=case_insensitive,
+            coalesce_writes=coalesce_writes,
+            indices=indices,
+        )
+        self._instances = [
+            cls(entity, name, clock, *args, array_idx=idx, bus=bus, **kwargs)
+            for idx, bus in zip(self.buses.indices, self.buses)
+        ]
+        self._by_index = dict(zip(self.buses.indices, self._instances))
+
+    def __len__(self):
+        return len(self._instances)
+
+    def __getitem__(self, idx):
+        try:
+            return self._by_index[idx]
+        except KeyError:
+            raise IndexError("No instance at index %r" % (idx,)) from None
+
+    def __iter__(self):
+        return iter(self._instances)
+
+
+_MISSING = object()
+
+
+class _BusCapture(collections.abc.Mapping):
+    """Base class of the record types returned by :meth:`Bus.capture`.
+
+    Sub-classes are created per bus by :func:`_make_capture_type`
+    and store one signal value per slot.
+    """
+
+    __slots__ = ()
+    _fields = ()
+    _slots = ()
+
+    def __getattr__(self, name):
+        # only called for unknown names or slots that were never filled
+        raise RuntimeError("Signal {} not present in bus".format(name))
+
+    def __setattr__(self, name, value):
+        raise RuntimeError("Modifying a bus capture is not supported")
+
+    def __delattr__(self, name):
+        raise RuntimeError("Modifying a bus capture is not supported")
+
+    def __getitem__(self, name):
+        if name not in self._fields:
+            raise KeyError(name)
+        return object.__getattribute__(self, name)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, name):
+        return name in self._fields
+
+    def __repr__(self):
+        return repr(dict(zip(self._fields, (s.__get__(self) for s in self._slots))))
+
+
+class _PackedField:
+    """A field of a packed-vector port, see the *layout* argument of :class:`Bus`.
+
+    Reading :attr:`value` returns the field's bits of the port's current value
+    as an :class:`int` like :meth:`Bus.capture`, unless they hold non-0/1 values.
+    Writing it updates the field in the port's pending value and writes the whole port.
+    """
+
+    __slots__ = ("_port", "_name", "lsb", "width", "mask")
+
+    def __init__(self, port, name, lsb, width):
+        self._port = port
+        self._name = name
+        self.lsb = lsb
+        self.width = width
+        self.mask = (1 << width) - 1
+
+    @property
+    def value(self):
+        value = self._port.handle.value
+        try:
+            return (int(value) >> self.lsb) & self.mask
+        except ValueError:
+            pass
+        binstr = str(value)
+        end = len(binstr) - self.lsb
+        return create_binary(binstr[end - self.width : end], self.width, False)
+
+    @value.setter
+    def value(self, value):
+        self._port.set_field(self, value)
+        self._port.write()
+
+    def __len__(self):
+        return self.width
+
+    def __repr__(self):
+        return "<%s field %s>" % (self._port.handle._name, self._name)
+
+
+class _PackedPort:
+    """Field layout and pending value of a packed-vector port.
+
+    The pending value is kept as an integer,
+    plus the bit strings of the fields that were set to non-0/1 values.
+    """
+
+    def __init__(self, handle, layout):
+        self.handle = handle
+        self.width = len(handle)
+        self.fields = {}
+        for attr_name, bits in layout.items():
+            msb, lsb = (bits, bits) if isinstance(bits, int) else bits
+            if not self.width > msb >= lsb >= 0:
+                raise ValueError(
+                    "Field {} [{}:{}] is outside of the {} bits of {}".format(
+                        attr_name, msb, lsb, self.width, handle._name
+                    )
+                )
+            self.fields[attr_name] = _PackedField(self, attr_name, lsb, msb - lsb + 1)
+        # (lsb, mask) of every field, in bus order, for unpack()
+        self._unpack_plan = tuple((f.lsb, f.mask) for f in self.fields.values())
+
+        self._bits = 0
+        self._unresolved = {}
+        self._written = None
+        current = str(handle.value)
+        for field in self.fields.values():
+            end = len(current) - field.lsb
+            self.set_field(field, current[end - field.width : end])
+
+    def set_field(self, field, value):
+        try:
+            value = int(value, 2) if isinstance(value, str) else int(value)
+        except ValueError:
+            self._unresolved[field] = str(value)
+            return
+        self._unresolved.pop(field, None)
+        self._bits = (self._bits & ~(field.mask << field.lsb)) | (
+            (value & field.mask) << field.lsb
+        )
+
+    def unchanged(self):
+        return not self._unresolved and self._bits == self._written
+
+    def write(self):
+        if not self._unresolved:
+            self.handle.value = self._bits
+            self._written = self._bits
+            return
+        binstr = list(format(self._bits, "0{}b".format(self.width)))
+        for field, bits in self._unresolved.items():
+            end = self.width - field.lsb
+            binstr[end - field.width : end] = bits.rjust(field.width, "0")[
+                -field.width :
+            ]
+        self.handle.value = create_binary("".join(binstr), self.width, False)
+        self._written = None
+
+    def unpack(self):
+        """Read the port once and return the values of all fields in bus order."""
+        value = self.handle.value
+        try:
+            word = int(value)
+        except ValueError:
+            binstr = str(value)
+            n = len(binstr)
+            return [
+                create_binary(binstr[n - f.lsb - f.width : n - f.lsb], f.width, False)
+                for f in self.fields.values()
+            ]
+        return [(word >> lsb) & mask for lsb, mask in self._unpack_plan]
+
+
+class BusShadow:
+    """Write-through shadow of the values written to the signals of a :class:`Bus`.
+
+    Each signal of the bus is an attribute: assigning to it writes the signal,
+    reading it returns the signal's current value::
+
+        bus.shadow.valid = 1  # same as bus.valid.value = 1
+
+    If *enabled* (see the *coalesce_writes* argument of :class:`Bus`),
+    an integer write is skipped when it equals the last value written through the shadow,
+    which saves a call into the simulator for signals like ``valid`` or ``channel``
+    that drivers set to the same value every cycle.
+    Any other value is always written and clears the signal's shadow entry.
+    Writes happen immediately and cocotb applies all writes of a time step together,
+    so nothing has to be flushed.
+
+    The shadow only knows about writes done through it or :meth:`Bus.drive`.
+    If anything else writes a shadowed signal, call :meth:`invalidate`.
+
+    Attributes:
+        enabled (bool): Whether unchanged writes are skipped.
+        writes (int): Number of writes the shadow passed on to the simulator.
+        skipped_writes (int): Number of writes skipped because the value was unchanged.
+    """
+
+    __slots__ = ("_handles", "_values", "enabled", "writes", "skipped_writes")
+
+    def __init__(self, handles, enabled=False):
+        self._handles = handles
+        self._values = {}
+        self.enabled = enabled
+        self.writes = 0
+        self.skipped_writes = 0
+
+    def _write(self, name, value):
+        if self.enabled:
+            if type(value) is int or type(value) is bool:
+                if self._values.get(name, _MISSING) == value:
+                    self.skipped_writes += 1
+                    return
+                self._values[name] = value
+            else:
+                self._values.pop(name, None)
+        self._handles[name].value = value
+        self.writes += 1
+
+    def _remember(self, name, value):
+        # record a value written to the signal without going through the shadow
+        if type(value) is int or type(value) is bool:
+            self._values[name] = value
+        else:
+            self._values.pop(name, None)
+
+    def invalidate(self, *names):
+        """Forget the last written value of the given signals, or of all signals if none are given.
+
+        The next write to them is always passed on to the simulator.
+        """
+        if names:
+            for name in names:
+                self._values.pop(name, None)
+        else:
+            self._values.clear()
+
+
+def _make_shadow_type(fields):
+    def signal_property(name):
+        return property(
+            lambda self: self._handles[name].value,
+            lambda self, value: self._write(name, value),
+        )
+
+    namespace = {"__slots__": ()}
+    for name in fields:
+        namespace[name] = signal_property(name)
+    return type("_Shadow", (BusShadow,), namespace)
+
+
+def _make_capture_type(fields):
+    capture_type = type("_Capture", (_BusCapture,), {"__slots__": fields})
+    # keep the slot descriptors so capture() can fill them without attribute lookups
+    type.__setattr__(capture_type, "_fields", fields)
+    type.__setattr__(
+        capture_type, "_slots", tuple(capture_type.__dict__[f] for f in fields)
+    )
+    return capture_type
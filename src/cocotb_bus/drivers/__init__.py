@@ -6,15 +6,33 @@
 
 """Set of common driver base classes."""
 
+import functools
+import itertools
 import logging
+import math
+import os
+import selectors
+import socket
+import struct
+import threading
+import warnings
 from collections import deque
-from typing import Any, Callable, Iterable, Optional, Tuple
+from typing import Any, Callable, Iterable, List, Optional, Sequence, Tuple
 
 import cocotb
 from cocotb.handle import SimHandleBase
-from cocotb.triggers import Edge, Event, NextTimeStep, ReadOnly, RisingEdge
+from cocotb.triggers import (
+    Event,
+    NextTimeStep,
+    NullTrigger,
+    RisingEdge,
+)
+from cocotb.utils import get_sim_steps, get_sim_time
 
-from cocotb_bus.bus import Bus
+from cocotb_bus.bus import Bus, _BusObjectArray
+from cocotb_bus.handshake import _clock_timing, wait_cycles, wait_level
+from cocotb_bus.metrics import DriverInstrumentation
+from cocotb_bus.throttling import ValidSchedule, compile_pattern
 
 
 class BitDriver:
@@ -38,6 +56,7 @@ class BitDriver:
                 with the number of cycles to be on,
                 followed by the number of cycles to be off.
                 Typically the generator should go on forever.
+                If it ends, the signal is left at ``0``.
 
                 Example::
 
@@ -45,6 +64,37 @@ class BitDriver:
         """
         self._cr = cocotb.start_soon(self._cr_twiddler(generator=generator))
 
+    def start_pattern(self, pattern: Iterable[int], repeat: bool = True) -> None:
+        """Start driving a finite bit pattern, one bit per clock cycle.
+
+        The pattern is compiled into ``(on, off)`` segments up front
+        with :meth:`compile_pattern`.
+
+        Args:
+            pattern: Sequence of bits, e.g. a list or a NumPy array.
+            repeat: Start over at the end of the pattern,
+                otherwise leave the signal at ``0``.
+        """
+        segments = self.compile_pattern(pattern)
+        if not segments:
+            raise ValueError("Empty pattern")
+        self.start(itertools.cycle(segments) if repeat else iter(segments))
+
+    @staticmethod
+    def compile_pattern(pattern: Iterable[int]) -> List[Tuple[int, int]]:
+        """Convert a bit pattern into ``(on, off)`` segments.
+
+        Example::
+
+            >>> BitDriver.compile_pattern([1, 1, 0, 0, 0, 1, 0])
+            [(2, 3), (1, 1)]
+
+        Args:
+            pattern: Sequence of bits, e.g. a list or a NumPy array.
+                NumPy arrays are converted without iterating in Python.
+        """
+        return compile_pattern(pattern)
+
     def stop(self):
         """Stop generating data."""
         self._cr.kill()
@@ -55,17 +105,167 @@ class BitDriver:
         if generator is not None:
             self._generator = generator
 
-        edge = RisingEdge(self._clk)
-
         # Actual thread
-        while True:
-            on, off = next(self._generator)
+        for on, off in self._generator:
             self._signal.value = 1
-            for _ in range(on):
-                await edge
+            if on:
+                await wait_cycles(self._clk, on)
             self._signal.value = 0
-            for _ in range(off):
-                await edge
+            if off:
+                await wait_cycles(self._clk, off)
+
+
+class DriverQueueFull(Exception):
+    """Raised by :meth:`Driver.append` when the send queue is at its capacity."""
+
+
+class DriverStatistics:
+    """Wrapper class for storing Driver statistics"""
+
+    def __init__(self):
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.queued_transactions = 0
+        self.dequeued_transactions = 0
+        self.rejected_transactions = 0
+        self.producer_waits = 0
+        #: :class:`TrafficClassStatistics` per traffic class,
+        #: see :meth:`Driver.set_traffic_classes`.
+        self.classes = []
+
+
+class TrafficClassStatistics:
+    """Wrapper class for storing statistics of one Driver traffic class.
+
+    Wait times are in simulator time steps,
+    measured from :meth:`Driver.append` until the transaction is dequeued.
+    """
+
+    def __init__(self):
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.queued_transactions = 0
+        self.dequeued_transactions = 0
+        self.total_wait_time = 0
+        self.max_wait_time = 0
+
+    @property
+    def mean_wait_time(self):
+        """Mean wait time of the dequeued transactions."""
+        if not self.dequeued_transactions:
+            return 0
+        return self.total_wait_time / self.dequeued_transactions
+
+
+class TransactionHandle:
+    """Completion handle of a transaction queued with :meth:`Driver.append`.
+
+    The handle can be awaited, which returns once the transaction has been sent
+    (or dropped by :meth:`Driver.clear`).
+    :meth:`wait` returns a trigger which can be combined with
+    :class:`~cocotb.triggers.Combine` or :class:`~cocotb.triggers.First`.
+
+    An :class:`~cocotb.triggers.Event` is only created when someone waits on
+    an incomplete handle.
+    """
+
+    __slots__ = ("transaction", "done", "cancelled", "queued_at", "_event")
+
+    def __init__(self, transaction):
+        #: The queued transaction.
+        self.transaction = transaction
+        #: ``True`` once the transaction has been sent or cancelled.
+        self.done = False
+        #: ``True`` if the transaction was dropped from the queue without being sent.
+        self.cancelled = False
+        #: Simulation time the transaction was queued at,
+        #: only recorded when it is needed for statistics.
+        self.queued_at = None
+        self._event = None
+
+    def wait(self):
+        """Return a trigger that fires when the transaction is done."""
+        if self.done:
+            return NullTrigger()
+        if self._event is None:
+            self._event = Event()
+        return self._event.wait()
+
+    def __await__(self):
+        if not self.done:
+            yield from self.wait().__await__()
+        return self.transaction
+
+    def _complete(self, cancelled=False):
+        self.done = True
+        self.cancelled = cancelled
+        if self._event is not None:
+            self._event.set()
+
+    def __repr__(self):
+        if self.cancelled:
+            state = "cancelled"
+        elif self.done:
+            state = "done"
+        else:
+            state = "pending"
+        return "<%s %s %r>" % (type(self).__qualname__, state, self.transaction)
+
+
+class _TokenBucket:
+    """Token bucket refilled with *rate* tokens per clock cycle, up to *burst*.
+
+    *period* is the clock period in simulator steps. If it is ``None``,
+    the period learned by the :mod:`cocotb_bus.handshake` waits is used once
+    known; until then only the cycles waited in :meth:`wait` refill the bucket.
+    """
+
+    __slots__ = ("rate", "burst", "cost", "tokens", "last", "period")
+
+    def __init__(self, rate, burst, cost, period=None):
+        self.rate = rate
+        self.burst = burst
+        self.cost = cost
+        self.tokens = burst
+        self.last = get_sim_time()
+        self.period = period
+
+    def refill(self, clock):
+        now = get_sim_time()
+        period = self.period
+        if period is None:
+            period = _clock_timing.get(clock, (None,))[0]
+        if period is not None:
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.last) / period * self.rate
+            )
+        self.last = now
+
+    def cycles(self, transaction, clock):
+        """Return the clock cycles until *transaction* can be sent, ``0`` if now."""
+        # a transaction larger than the burst size is sent once the bucket is full
+        needed = min(self.cost(transaction), self.burst)
+        self.refill(clock)
+        if self.tokens >= needed:
+            return 0
+        # small tolerance against rounding of fractional rates
+        return max(1, math.ceil((needed - self.tokens) / self.rate - 1e-9))
+
+    async def wait(self, cycles, clock):
+        known = self.period is not None or clock in _clock_timing
+        # the tokens are refilled from the time waited, it needn't be exact
+        await wait_cycles(clock, cycles, free_running=True)
+        if not known:
+            # the time waited can't be converted to cycles, count them instead
+            self.tokens = min(self.burst, self.tokens + cycles * self.rate)
+            self.last = get_sim_time()
+
+    def take(self, transaction):
+        self.tokens -= self.cost(transaction)
+
+
+def _one(transaction):
+    return 1
 
 
 class Driver:
@@ -73,6 +273,18 @@ class Driver:
 
     The driver is responsible for serializing transactions onto the physical
     pins of the interface.  This may consume simulation time.
+
+    The send queue is unbounded unless limited with :meth:`set_queue_limits`.
+    Queue depth counters are kept in :attr:`stats`.
+
+    Transactions are sent in the order they were queued, unless several
+    traffic classes are set up with :meth:`set_traffic_classes`.
+
+    Latency and throughput of the sent transactions are measured
+    after :meth:`enable_instrumentation`.
+
+    The rate of sent transactions can be limited with :meth:`set_rate_limit`,
+    and sending can be suspended with :meth:`pause`.
     """
 
     def __init__(self):
@@ -81,6 +293,27 @@ class Driver:
         self._sendQ = deque()
         self.busy_event = Event()
         self.busy = False
+        self.stats = DriverStatistics()
+        self._capacity = None
+        self._high_watermark = None
+        self._low_watermark = None
+        self._throttled = False
+        self._drained = Event()
+        self._classQs = None
+        self._weights = None
+        self._wrr_index = 0
+        self._wrr_credit = 0
+        #: :class:`~cocotb_bus.metrics.DriverInstrumentation` of this driver,
+        #: ``None`` unless :meth:`enable_instrumentation` was called.
+        self.instrumentation = None
+        # Clock cycles spent waiting for the bus to be ready,
+        # counted by sub-classes with the cocotb_bus.handshake waits
+        self._stall_cycles = 0
+        self._bucket = None
+        self._paused = False
+        self._resumed = Event()
+        # Set by cocotb_bus.trace.TraceWriter.attach
+        self._tracer = None
 
         # Sub-classes may already set up logging
         if not hasattr(self, "log"):
@@ -105,13 +338,217 @@ class Driver:
             self._thread.kill()
             self._thread = None
 
+    def set_queue_limits(
+        self,
+        capacity: Optional[int] = None,
+        high_watermark: Optional[int] = None,
+        low_watermark: Optional[int] = None,
+    ) -> None:
+        """Limit the number of transactions waiting in the send queue.
+
+        Args:
+            capacity: Maximum queue depth, :meth:`append` raises
+                :exc:`DriverQueueFull` beyond it.
+                ``None`` (the default) for an unbounded queue.
+            high_watermark: Queue depth at which :meth:`put` starts blocking.
+                Defaults to *capacity*.
+            low_watermark: Queue depth the queue has to drain to
+                before blocked :meth:`put` calls resume.
+                Defaults to half of *high_watermark*.
+
+        Raises:
+            ValueError: If the limits are not ordered
+                ``0 <= low_watermark < high_watermark <= capacity``.
+        """
+        if high_watermark is None:
+            high_watermark = capacity
+        if low_watermark is None and high_watermark is not None:
+            low_watermark = high_watermark // 2
+        if high_watermark is not None:
+            if not 0 <= low_watermark < high_watermark:
+                raise ValueError(
+                    "Expected 0 <= low_watermark < high_watermark, got %d and %d"
+                    % (low_watermark, high_watermark)
+                )
+            if capacity is not None and high_watermark > capacity:
+                raise ValueError(
+                    "high_watermark %d is larger than capacity %d"
+                    % (high_watermark, capacity)
+                )
+        self._capacity = capacity
+        self._high_watermark = high_watermark
+        self._low_watermark = low_watermark
+        self._update_throttle()
+
+    def _add_stall_cycles(self, cycles: int) -> None:
+        """Count *cycles* the driver waited for the bus to be ready.
+
+        Use ``self._add_stall_cycles(await wait_handshake(...))`` rather than
+        ``self._stall_cycles += await ...``, which reads the counter before
+        the wait and loses the stalls of concurrent operations.
+        """
+        self._stall_cycles += cycles
+
+    def enable_instrumentation(self, **kwargs: Any) -> DriverInstrumentation:
+        """Start recording the latency and throughput of sent transactions.
+
+        Args:
+            **kwargs: Arguments of :class:`~cocotb_bus.metrics.DriverInstrumentation`.
+
+        Returns:
+            The new :attr:`instrumentation`.
+            Set :attr:`instrumentation` to ``None`` to stop recording.
+        """
+        self.instrumentation = DriverInstrumentation(**kwargs)
+        return self.instrumentation
+
+    def set_rate_limit(
+        self,
+        rate: Optional[float],
+        burst: Optional[float] = None,
+        unit: str = "transactions",
+        period: Optional[float] = None,
+        period_unit: str = "step",
+    ) -> None:
+        """Shape the sent transactions with a token bucket.
+
+        The bucket is refilled with *rate* tokens per cycle of ``self.clock``,
+        up to *burst* tokens.
+        The next transaction stays queued until the bucket holds enough tokens
+        for it, so it can still be cleared, paused or overtaken by a transaction
+        of a higher traffic class meanwhile;
+        a transaction costing more than *burst* is sent once the bucket is full.
+
+        Without a *period*, idle time between transactions only refills the bucket
+        once the clock period is known from a wait on ``self.clock``,
+        see :mod:`cocotb_bus.handshake`.
+
+        Args:
+            rate: Tokens per clock cycle, e.g. ``0.25`` to send at a quarter of
+                the line rate.
+                ``None`` removes the rate limit.
+            burst: Size of the bucket, which starts out full.
+                Defaults to the larger of ``1`` and *rate*.
+            unit: ``"transactions"`` for one token per transaction,
+                ``"bytes"`` for one token per byte (``len(transaction)``),
+                or a callable returning the tokens of a transaction.
+            period: Period of ``self.clock``.
+            period_unit: Time unit of *period*.
+
+        Raises:
+            ValueError: If *rate* or *burst* is not positive or *unit* is unknown.
+            AttributeError: If the driver has no ``clock``.
+        """
+        if rate is None:
+            self._bucket = None
+            return
+        if rate <= 0:
+            raise ValueError("Expected a positive rate, got %r" % (rate,))
+        if burst is None:
+            burst = max(1, rate)
+        elif burst <= 0:
+            raise ValueError("Expected a positive burst, got %r" % (burst,))
+        if callable(unit):
+            cost = unit
+        elif unit == "transactions":
+            cost = _one
+        elif unit == "bytes":
+            cost = len
+        else:
+            raise ValueError(
+                "Unknown unit %r, expected 'transactions' or 'bytes'" % (unit,)
+            )
+        if not hasattr(self, "clock"):
+            raise AttributeError("%s has no clock to limit the rate with" % self)
+        if period is not None:
+            period = get_sim_steps(period, period_unit)
+        self._bucket = _TokenBucket(rate, burst, cost, period)
+
+    def pause(self) -> None:
+        """Stop sending queued transactions.
+
+        The transaction being sent is completed.
+        Transactions can still be queued and are sent after :meth:`resume`.
+        """
+        self._paused = True
+        self._resumed.clear()
+
+    def resume(self) -> None:
+        """Continue sending queued transactions after :meth:`pause`."""
+        self._paused = False
+        self._resumed.set()
+
+    @property
+    def paused(self) -> bool:
+        """Whether sending is paused with :meth:`pause`."""
+        return self._paused
+
+    def set_traffic_classes(
+        self,
+        classes: int,
+        arbitration: str = "strict",
+        weights: Optional[Sequence[int]] = None,
+    ) -> None:
+        """Split the send queue into several traffic classes.
+
+        Transactions are assigned to a class with the *traffic_class* argument
+        of :meth:`append`, :meth:`extend` and :meth:`put`.
+        Within a class they are sent in order.
+        Per-class depth and wait time counters are kept in ``stats.classes``.
+
+        Args:
+            classes: Number of traffic classes.
+                ``1`` restores the single FIFO queue.
+            arbitration: ``"strict"`` always sends from the lowest numbered
+                non-empty class first.
+                ``"wrr"`` (weighted round-robin) sends up to ``weights[i]``
+                transactions from class ``i`` before moving to the next
+                non-empty class.
+            weights: Weight of each class for ``"wrr"`` arbitration.
+                Defaults to ``1`` for all classes.
+
+        Raises:
+            ValueError: If the arguments are invalid.
+            RuntimeError: If transactions are queued.
+        """
+        if classes < 1:
+            raise ValueError("Expected at least one traffic class, got %d" % classes)
+        if arbitration not in ("strict", "wrr"):
+            raise ValueError(
+                "Unknown arbitration %r, expected 'strict' or 'wrr'" % (arbitration,)
+            )
+        if weights is None:
+            weights = [1] * classes
+        elif arbitration != "wrr":
+            raise ValueError("weights are only used with 'wrr' arbitration")
+        weights = list(weights)
+        if len(weights) != classes or any(weight < 1 for weight in weights):
+            raise ValueError(
+                "Expected %d weights of at least 1, got %r" % (classes, weights)
+            )
+        if self._queue_depth():
+            raise RuntimeError(
+                "Traffic classes can only be changed while the send queue is empty"
+            )
+
+        if classes == 1:
+            self._classQs = None
+            self.stats.classes = []
+            return
+        self._classQs = [deque() for _ in range(classes)]
+        self._weights = weights if arbitration == "wrr" else None
+        self._wrr_index = 0
+        self._wrr_credit = weights[0]
+        self.stats.classes = [TrafficClassStatistics() for _ in range(classes)]
+
     def append(
         self,
         transaction: Any,
         callback: Callable[[Any], Any] = None,
         event: Event = None,
+        traffic_class: int = 0,
         **kwargs: Any,
-    ) -> None:
+    ) -> TransactionHandle:
         """Queue up a transaction to be sent over the bus.
 
         Mechanisms are provided to permit the caller to know when the
@@ -123,15 +560,224 @@ class Driver:
                 when the transaction has been sent.
             event: :class:`~cocotb.triggers.Event` to be set
                 when the transaction has been sent.
+            traffic_class: Traffic class to queue the transaction in,
+                see :meth:`set_traffic_classes`.
             **kwargs: Any additional arguments used in child class'
                 :any:`_driver_send` method.
+
+        Returns:
+            A :class:`TransactionHandle` which can be awaited until the
+            transaction has been sent.
+
+        Raises:
+            DriverQueueFull: If the queue is at the capacity set with :meth:`set_queue_limits`.
         """
-        self._sendQ.append((transaction, callback, event, kwargs))
+        handle = self._enqueue(transaction, callback, event, traffic_class, kwargs)
         self._pending.set()
+        return handle
+
+    def extend(
+        self,
+        transactions: Iterable[Any],
+        callback: Callable[[Any], Any] = None,
+        traffic_class: int = 0,
+        **kwargs: Any,
+    ) -> List[TransactionHandle]:
+        """Queue up several transactions to be sent over the bus.
+
+        Equivalent to calling :meth:`append` for each transaction,
+        but the send coroutine is only woken up once.
+
+        Args:
+            transactions: The transactions to be sent, in order.
+            callback: Optional function to be called
+                with each transaction when it has been sent.
+            traffic_class: Traffic class to queue the transactions in,
+                see :meth:`set_traffic_classes`.
+            **kwargs: Any additional arguments used in child class'
+                :any:`_driver_send` method, applied to all transactions.
+
+        Returns:
+            A list of :class:`TransactionHandle`, one per transaction.
+
+        Raises:
+            DriverQueueFull: If the queue reaches the capacity set with
+                :meth:`set_queue_limits`.
+                The transactions before the one that did not fit stay queued.
+        """
+        handles = []
+        try:
+            for transaction in transactions:
+                handles.append(
+                    self._enqueue(transaction, callback, None, traffic_class, kwargs)
+                )
+        finally:
+            if handles:
+                self._pending.set()
+        return handles
+
+    def _enqueue(self, transaction, callback, event, traffic_class, kwargs):
+        if self._classQs is None:
+            if traffic_class:
+                raise ValueError(
+                    "Traffic class %r used without set_traffic_classes()"
+                    % (traffic_class,)
+                )
+            queue = self._sendQ
+        elif 0 <= traffic_class < len(self._classQs):
+            queue = self._classQs[traffic_class]
+        else:
+            raise ValueError(
+                "Traffic class %r out of range 0..%d"
+                % (traffic_class, len(self._classQs) - 1)
+            )
+        if self._capacity is not None and self._queue_depth() >= self._capacity:
+            self.stats.rejected_transactions += 1
+            raise DriverQueueFull(
+                "Send queue of %s is full (%d transactions)" % (self, self._capacity)
+            )
+        if self._tracer is not None:
+            if traffic_class:
+                self._tracer(transaction, dict(kwargs, traffic_class=traffic_class))
+            else:
+                self._tracer(transaction, kwargs)
+        handle = TransactionHandle(transaction)
+        queue.append((transaction, callback, event, kwargs, handle))
+        if self.instrumentation is not None:
+            handle.queued_at = get_sim_time()
+        if self._classQs is not None:
+            if handle.queued_at is None:
+                handle.queued_at = get_sim_time()
+            stats = self.stats.classes[traffic_class]
+            stats.queued_transactions += 1
+            depth = stats.queue_depth = len(queue)
+            if depth > stats.max_queue_depth:
+                stats.max_queue_depth = depth
+        self._queued()
+        return handle
+
+    def _queue_depth(self):
+        if self._classQs is None:
+            return len(self._sendQ)
+        return sum(map(len, self._classQs))
+
+    def _select(self):
+        """Return the queue to send from next, its traffic class
+        and its remaining weighted round-robin credit, without changing any state.
+        """
+        classQs = self._classQs
+        if classQs is None:
+            return self._sendQ, None, None
+        if self._weights is None:
+            index = next(i for i, queue in enumerate(classQs) if queue)
+            return classQs[index], index, None
+        index = self._wrr_index
+        credit = self._wrr_credit
+        while not (credit and classQs[index]):
+            index = (index + 1) % len(classQs)
+            credit = self._weights[index]
+        return classQs[index], index, credit
+
+    def _peek(self):
+        return self._select()[0][0]
+
+    def _dequeue(self):
+        queue, index, credit = self._select()
+        entry = queue.popleft()
+        if index is not None:
+            if credit is not None:
+                self._wrr_credit = credit - 1
+                self._wrr_index = index
+            stats = self.stats.classes[index]
+            stats.dequeued_transactions += 1
+            stats.queue_depth = len(queue)
+            wait = get_sim_time() - entry[-1].queued_at
+            stats.total_wait_time += wait
+            if wait > stats.max_wait_time:
+                stats.max_wait_time = wait
+        self._dequeued()
+        return entry
+
+    async def put(
+        self,
+        transaction: Any,
+        callback: Callable[[Any], Any] = None,
+        event: Event = None,
+        traffic_class: int = 0,
+        **kwargs: Any,
+    ) -> TransactionHandle:
+        """Queue up a transaction like :meth:`append`, waiting for room in the queue first.
+
+        Once the queue depth reaches the high watermark set with :meth:`set_queue_limits`,
+        callers are blocked until it has drained to the low watermark.
+
+        Args:
+            transaction: The transaction to be sent.
+            callback: Optional function to be called
+                when the transaction has been sent.
+            event: :class:`~cocotb.triggers.Event` to be set
+                when the transaction has been sent.
+            traffic_class: Traffic class to queue the transaction in,
+                see :meth:`set_traffic_classes`.
+            **kwargs: Any additional arguments used in child class'
+                :any:`_driver_send` method.
+
+        Returns:
+            A :class:`TransactionHandle` which can be awaited until the
+            transaction has been sent.
+        """
+        if self._throttled:
+            self.stats.producer_waits += 1
+            while self._throttled:
+                await self._drained.wait()
+        return self.append(transaction, callback, event, traffic_class, **kwargs)
+
+    def _queued(self):
+        stats = self.stats
+        stats.queued_transactions += 1
+        depth = stats.queue_depth = self._queue_depth()
+        if depth > stats.max_queue_depth:
+            stats.max_queue_depth = depth
+        if self._high_watermark is not None and depth >= self._high_watermark:
+            self._throttled = True
+            self._drained.clear()
+
+    def _dequeued(self):
+        self.stats.dequeued_transactions += 1
+        self._update_throttle()
+
+    def _update_throttle(self):
+        depth = self.stats.queue_depth = self._queue_depth()
+        if self._high_watermark is None:
+            throttled = False
+        elif self._throttled:
+            throttled = depth > self._low_watermark
+        else:
+            throttled = depth >= self._high_watermark
+        if throttled != self._throttled:
+            self._throttled = throttled
+            if throttled:
+                self._drained.clear()
+            else:
+                self._drained.set()
 
     def clear(self):
-        """Clear any queued transactions without sending them onto the bus."""
+        """Clear any queued transactions without sending them onto the bus.
+
+        The :class:`TransactionHandle` of each dropped transaction is completed
+        with :attr:`~TransactionHandle.cancelled` set.
+        """
+        queues = [self._sendQ]
         self._sendQ = deque()
+        if self._classQs is not None:
+            queues += self._classQs
+            self._classQs = [deque() for _ in self._classQs]
+            for stats in self.stats.classes:
+                stats.queue_depth = 0
+        self._update_throttle()
+        for queue in queues:
+            for *_, handle in queue:
+                handle._complete(cancelled=True)
 
     async def send(self, transaction: Any, sync: bool = True, **kwargs: Any) -> None:
         """Blocking send call (hence must be "awaited" rather than called).
@@ -144,7 +790,13 @@ class Driver:
             **kwargs: Additional arguments used in child class'
                 :any:`_driver_send` method.
         """
-        await self._send(transaction, None, None, sync=sync, **kwargs)
+        if self._tracer is not None:
+            self._tracer(transaction, kwargs)
+        send = self._send(transaction, None, None, sync=sync, **kwargs)
+        if self.instrumentation is None:
+            await send
+        else:
+            await self.instrumentation._measure(self, transaction, None, send)
 
     async def _driver_send(
         self, transaction: Any, sync: bool = True, **kwargs: Any
@@ -193,20 +845,39 @@ class Driver:
     async def _send_thread(self):
         while True:
             # Sleep until we have something to send
-            while not self._sendQ:
-                self._pending.clear()
-                await self._pending.wait()
+            while self._paused or not self._queue_depth():
+                if self._paused:
+                    await self._resumed.wait()
+                else:
+                    self._pending.clear()
+                    await self._pending.wait()
 
             synchronised = False
 
             # Send in all the queued packets,
             # only synchronize on the first send
-            while self._sendQ:
-                transaction, callback, event, kwargs = self._sendQ.popleft()
+            while self._queue_depth() and not self._paused:
+                bucket = self._bucket
+                if bucket is not None:
+                    cycles = bucket.cycles(self._peek()[0], self.clock)
+                    if cycles:
+                        # the queue may change while waiting, look again
+                        await bucket.wait(cycles, self.clock)
+                        continue
+                transaction, callback, event, kwargs, handle = self._dequeue()
+                if bucket is not None:
+                    bucket.take(transaction)
                 self.log.debug("Sending queued packet...")
-                await self._send(
+                send = self._send(
                     transaction, callback, event, sync=not synchronised, **kwargs
                 )
+                if self.instrumentation is None:
+                    await send
+                else:
+                    await self.instrumentation._measure(
+                        self, transaction, handle.queued_at, send
+                    )
+                handle._complete()
                 synchronised = True
 
 
@@ -225,6 +896,8 @@ class BusDriver(Driver):
             bus-signals in an interface or a ``modport``.
             (untested on ``struct``/``record``, but could work here as well).
         clock: A handle to the clock associated with this bus.
+        bus: An already constructed :class:`~cocotb_bus.bus.Bus` to use
+            instead of creating one, e.g. from a :class:`~cocotb_bus.bus.BusArray`.
         **kwargs: Keyword arguments forwarded to :class:`cocotb.Bus`,
             see docs for that class for more information.
 
@@ -237,6 +910,8 @@ class BusDriver(Driver):
         entity: SimHandleBase,
         name: Optional[str],
         clock: SimHandleBase,
+        *,
+        bus: Optional[Bus] = None,
         **kwargs: Any,
     ):
         index = kwargs.get("array_idx", None)
@@ -245,13 +920,15 @@ class BusDriver(Driver):
         Driver.__init__(self)
         self.entity = entity
         self.clock = clock
-        self.bus = Bus(
-            self.entity,
-            name,
-            self._signals,
-            optional_signals=self._optional_signals,
-            **kwargs,
-        )
+        if bus is None:
+            bus = Bus(
+                self.entity,
+                name,
+                self._signals,
+                optional_signals=self._optional_signals,
+                **kwargs,
+            )
+        self.bus = bus
 
         # Give this instance a unique name
         self.name = name if index is None else "%s_%d" % (name, index)
@@ -274,10 +951,7 @@ class BusDriver(Driver):
         to move to :class:`~cocotb.triggers.NextTimeStep` before
         registering more callbacks can occur.
         """
-        await ReadOnly()
-        while int(signal.value) != 1:
-            await RisingEdge(signal)
-            await ReadOnly()
+        self._add_stall_cycles(await wait_level(signal, 1, self.clock))
         await NextTimeStep()
 
     async def _wait_for_nsignal(self, signal):
@@ -287,10 +961,7 @@ class BusDriver(Driver):
         to move to :class:`~cocotb.triggers.NextTimeStep` before
         registering more callbacks can occur.
         """
-        await ReadOnly()
-        while int(signal.value) != 0:
-            await Edge(signal)
-            await ReadOnly()
+        self._add_stall_cycles(await wait_level(signal, 0, self.clock))
         await NextTimeStep()
 
     def __str__(self):
@@ -307,7 +978,8 @@ class ValidatedBusDriver(BusDriver):
         name (str): Name of this bus.
         clock (SimHandle): A handle to the clock associated with this bus.
         valid_generator (generator, optional): a generator that yields tuples of
-            ``(valid, invalid)`` cycles to insert.
+            ``(valid, invalid)`` cycles to insert,
+            or a precompiled :class:`~cocotb_bus.throttling.ValidSchedule`.
     """
 
     def __init__(
@@ -332,6 +1004,24 @@ class ValidatedBusDriver(BusDriver):
         on followed by the number of cycles to be off.
         The ``on`` cycles should be non-zero, we skip invalid generator entries.
         """
+        schedule = self._schedule
+        if schedule is not None:
+            runs = schedule.runs
+            pos = self._schedule_pos
+            if pos == len(runs):
+                if not schedule.repeat:
+                    self.on = True
+                    self.log.info(
+                        "Valid schedule exhausted, not inserting "
+                        "non-valid cycles anymore"
+                    )
+                    return
+                pos = 0
+            self.on = runs[pos]
+            self.off = runs[pos + 1]
+            self._schedule_pos = pos + 2
+            return
+
         self.on = False
 
         if self.valid_generator is not None:
@@ -347,24 +1037,231 @@ class ValidatedBusDriver(BusDriver):
                     )
                     return
 
-            self.log.debug("Will be on for %d cycles, off for %s" % (self.on, self.off))
+            self.log.debug("Will be on for %d cycles, off for %s", self.on, self.off)
         else:
             # Valid every clock cycle
             self.on, self.off = True, False
             self.log.debug("Not using valid generator")
 
     def set_valid_generator(self, valid_generator=None):
-        """Set a new valid generator for this bus."""
+        """Set a new valid generator for this bus.
+
+        A :class:`~cocotb_bus.throttling.ValidSchedule` is consumed
+        directly from its run lengths.
+        """
         self.valid_generator = valid_generator
+        if isinstance(valid_generator, ValidSchedule):
+            self._schedule = valid_generator
+            self._schedule_pos = 0
+            if valid_generator.lead:
+                # Start with a gap, the drivers wait for self.off when not self.on
+                self.on, self.off = 0, valid_generator.lead
+                return
+        else:
+            self._schedule = None
         self._next_valids()
 
 
+class BusDriverArray(_BusObjectArray):
+    """An indexed array of drivers of the same class, one per index of array signals.
+
+    The signals are resolved once into a :class:`~cocotb_bus.bus.BusArray`
+    and every driver gets its sliced :class:`~cocotb_bus.bus.Bus`,
+    as if it had been created with ``array_idx=i``.
+
+    Example::
+
+        lanes = BusDriverArray(MyDriver, dut, "in", dut.clk)
+        await lanes[0].send(10)
+
+    Args:
+        cls: The :class:`BusDriver` sub-class to instantiate.
+        entity: A handle to the simulator entity.
+        name: Name of the buses.
+        clock: A handle to the clock associated with the buses.
+        *args: Additional positional arguments for each driver.
+        bus_separator, case_insensitive, coalesce_writes, indices:
+            See :class:`~cocotb_bus.bus.BusArray`.
+        **kwargs: Additional keyword arguments for each driver.
+
+    Attributes:
+        buses (BusArray): The shared bus array.
+    """
+
+    _base_class = BusDriver
+
+
+_FRAME_HEADER = struct.Struct(">I")
+
+
+def encode_frame(payload: bytes) -> bytes:
+    """Prefix *payload* with its length, as expected by :class:`SocketBridge`."""
+    return _FRAME_HEADER.pack(len(payload)) + payload
+
+
+class SocketBridge:
+    """Queue frames received on a socket or pipe for sending into a driver.
+
+    Every frame is a 4 byte big-endian length followed by that many bytes of
+    payload, see :func:`encode_frame`.
+    A background thread waits for data with a :mod:`selectors` selector and
+    splits it into frames, so the simulation does not make any system calls.
+    The bridge coroutine hands all frames received since its last wakeup to
+    :meth:`Driver.extend` as one batch.
+
+    The simulator cannot be woken up from another thread,
+    so the coroutine checks for received frames every clock cycle while
+    frames arrive, and backs off exponentially to every *max_poll_cycles*
+    cycles while the connection is idle.
+    The intervals are awaited with :func:`~cocotb_bus.handshake.wait_cycles`
+    sleeping through the clock edges,
+    so an idle connection costs two wakeups per check rather than one per cycle.
+
+    A partial frame left when the connection is closed is dropped with a warning.
+
+    Example::
+
+        bridge = SocketBridge(driver, sock)
+        bridge.start()
+        ...
+        bridge.stop()
+
+    Args:
+        driver: The :class:`BusDriver` to send the frames with.
+        sock: A connected socket, or a readable pipe file descriptor.
+        max_poll_cycles: Longest interval between checks for frames.
+        max_batch: Maximum number of frames handed to the driver at once.
+            ``None`` for no limit.
+    """
+
+    def __init__(
+        self,
+        driver: "BusDriver",
+        sock: Any,
+        max_poll_cycles: int = 64,
+        max_batch: Optional[int] = None,
+    ):
+        self.driver = driver
+        self.sock = sock
+        self.max_poll_cycles = max_poll_cycles
+        self.max_batch = max_batch
+        self.frames_received = 0
+        self.bytes_received = 0
+        self.batches = 0
+        self._frames = deque()
+        self._closed = False
+        self._error = None
+        # bytes of a partial frame left when the connection was closed
+        self._truncated = 0
+        self._thread = None
+        self._cr = None
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+
+    def start(self) -> None:
+        """Start the reader thread and the bridge coroutine."""
+        self._thread = threading.Thread(
+            target=self._reader, name="SocketBridge", daemon=True
+        )
+        self._thread.start()
+        self._cr = cocotb.start_soon(self._bridge())
+
+    def stop(self) -> None:
+        """Stop the reader thread and the bridge coroutine.
+
+        Frames already received but not yet handed to the driver are dropped.
+        """
+        if self._cr is not None:
+            self._cr.kill()
+            self._cr = None
+        if self._thread is not None:
+            self._wakeup_w.send(b"\0")
+            self._thread.join()
+            self._thread = None
+        self._wakeup_r.close()
+        self._wakeup_w.close()
+
+    def _reader(self):
+        if hasattr(self.sock, "recv"):
+            recv = self.sock.recv
+        else:
+            recv = functools.partial(os.read, self.sock)
+        buf = bytearray()
+        header = _FRAME_HEADER.size
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.sock, selectors.EVENT_READ)
+            selector.register(self._wakeup_r, selectors.EVENT_READ)
+            try:
+                while True:
+                    events = selector.select()
+                    if any(key.fileobj is self._wakeup_r for key, _ in events):
+                        return
+                    data = recv(65536)
+                    if not data:
+                        return
+                    buf += data
+                    while len(buf) >= header:
+                        (length,) = _FRAME_HEADER.unpack_from(buf)
+                        end = header + length
+                        if len(buf) < end:
+                            break
+                        self._frames.append(bytes(buf[header:end]))
+                        del buf[:end]
+            except Exception as e:
+                self._error = e
+            finally:
+                self._truncated = len(buf)
+                # set last, the bridge relies on all frames being queued by then
+                self._closed = True
+
+    async def _bridge(self):
+        driver = self.driver
+        frames = self._frames
+        driver.log.info("Listening for data from %r" % (self.sock,))
+        interval = 1
+        while True:
+            await wait_cycles(driver.clock, interval, free_running=True)
+            # read before checking the frames, the last frames may arrive
+            # between the two checks
+            closed = self._closed
+            if not frames:
+                if closed:
+                    break
+                interval = min(interval * 2, self.max_poll_cycles)
+                continue
+            interval = 1
+            count = len(frames)
+            if self.max_batch is not None:
+                count = min(count, self.max_batch)
+            batch = [frames.popleft() for _ in range(count)]
+            self.frames_received += count
+            self.bytes_received += sum(map(len, batch))
+            self.batches += 1
+            driver.extend(batch)
+
+        if self._truncated:
+            driver.log.warning(
+                "Dropped a partial frame of %d bytes at the end of the connection"
+                % self._truncated
+            )
+        if self._error is not None:
+            driver.log.error(repr(self._error))
+            raise self._error
+        driver.log.info("Remote end closed the connection")
+
+
 async def polled_socket_attachment(driver, sock):
     """Non-blocking socket attachment that queues any payload received from the
     socket to be queued for sending into the driver.
+
+    This function is deprecated, use :class:`SocketBridge` instead.
     """
     import errno
-    import socket
+
+    warnings.warn(
+        "polled_socket_attachment is deprecated, use SocketBridge instead",
+        DeprecationWarning,
+        stacklevel=2,
+    )
 
     sock.setblocking(False)
     driver.log.info("Listening for data from %s" % repr(sock))
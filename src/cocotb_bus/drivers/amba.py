@@ -23,6 +23,7 @@ from cocotb_bus._compat import (
     create_binary,
 )
 from cocotb_bus.drivers import BusDriver
+from cocotb_bus.handshake import wait_handshake
 
 
 class AXIBurst(enum.IntEnum):
@@ -210,26 +211,22 @@ class AXI4Master(BusDriver):
 
             # Set the address and, if present on the bus, burst, length and
             # size
-            self.bus.AWADDR.value = address
-            self.bus.AWVALID.value = 1
+            self.bus.shadow.AWADDR = address
+            self.bus.shadow.AWVALID = 1
 
             if hasattr(self.bus, "AWBURST"):
-                self.bus.AWBURST.value = burst.value
+                self.bus.shadow.AWBURST = burst.value
 
             if hasattr(self.bus, "AWLEN"):
-                self.bus.AWLEN.value = length - 1
+                self.bus.shadow.AWLEN = length - 1
 
             if hasattr(self.bus, "AWSIZE"):
-                self.bus.AWSIZE.value = size.bit_length() - 1
+                self.bus.shadow.AWSIZE = size.bit_length() - 1
 
             # Wait until acknowledged
-            while True:
-                await ReadOnly()
-                if str(self.bus.AWREADY.value) == "1":
-                    break
-                await RisingEdge(self.clock)
+            self._add_stall_cycles(await wait_handshake(self.clock, self.bus.AWREADY))
             await RisingEdge(self.clock)
-            self.bus.AWVALID.value = 0
+            self.bus.shadow.AWVALID = 0
 
     async def _send_write_data(
         self,
@@ -292,26 +289,26 @@ class AXI4Master(BusDriver):
             for beat_num, (word, strobe) in enumerate(zip(data, strobes)):
                 await ClockCycles(self.clock, delay)
 
-                self.bus.WVALID.value = 1
-                self.bus.WDATA.value = mask_and_shift(word, size * 8, narrow_block)
-                self.bus.WSTRB.value = mask_and_shift(strobe, size, narrow_block)
+                self.bus.shadow.WVALID = 1
+                self.bus.shadow.WDATA = mask_and_shift(word, size * 8, narrow_block)
+                self.bus.shadow.WSTRB = mask_and_shift(strobe, size, narrow_block)
 
                 if burst is not AXIBurst.FIXED:
                     narrow_block = (narrow_block + 1) % (wdata_bytes // size)
 
                 if hasattr(self.bus, "WLAST"):
                     if beat_num == len(data) - 1:
-                        self.bus.WLAST.value = 1
+                        self.bus.shadow.WLAST = 1
                     else:
-                        self.bus.WLAST.value = 0
+                        self.bus.shadow.WLAST = 0
 
-                while True:
-                    await RisingEdge(self.clock)
-                    if str(self.bus.WREADY.value) == "1":
-                        break
+                self._add_stall_cycles(
+                    await wait_handshake(self.clock, self.bus.WREADY)
+                )
+                await RisingEdge(self.clock)
 
                 if beat_num == len(data) - 1:
-                    self.bus.WVALID.value = 0
+                    self.bus.shadow.WVALID = 0
 
     async def write(
         self,
@@ -380,15 +377,10 @@ class AXI4Master(BusDriver):
 
         async with self.write_response_busy:
             # Wait for the response
-            while True:
-                await ReadOnly()
-                if (
-                    str(self.bus.BVALID.value) == "1"
-                    and str(self.bus.BREADY.value) == "1"
-                ):
-                    result = AXIxRESP(int(self.bus.BRESP.value))
-                    break
-                await RisingEdge(self.clock)
+            self._add_stall_cycles(
+                await wait_handshake(self.clock, self.bus.BVALID, self.bus.BREADY)
+            )
+            result = AXIxRESP(int(self.bus.BRESP.value))
 
             await RisingEdge(self.clock)
 
@@ -488,53 +480,41 @@ class AXI4Master(BusDriver):
             if sync:
                 await RisingEdge(self.clock)
 
-            self.bus.ARADDR.value = address
-            self.bus.ARVALID.value = 1
+            self.bus.shadow.ARADDR = address
+            self.bus.shadow.ARVALID = 1
 
             if hasattr(self.bus, "ARLEN"):
-                self.bus.ARLEN.value = length - 1
+                self.bus.shadow.ARLEN = length - 1
 
             if hasattr(self.bus, "ARSIZE"):
-                self.bus.ARSIZE.value = size.bit_length() - 1
+                self.bus.shadow.ARSIZE = size.bit_length() - 1
 
             if hasattr(self.bus, "ARBURST"):
-                self.bus.ARBURST.value = burst.value
+                self.bus.shadow.ARBURST = burst.value
 
-            while True:
-                await ReadOnly()
-                if str(self.bus.ARREADY.value) == "1":
-                    break
-                await RisingEdge(self.clock)
+            self._add_stall_cycles(await wait_handshake(self.clock, self.bus.ARREADY))
 
             await RisingEdge(self.clock)
-            self.bus.ARVALID.value = 0
+            self.bus.shadow.ARVALID = 0
 
         async with self.read_data_busy:
             data = []
             rresp = []
 
             for beat_num in itertools.count():
-                while True:
-                    await ReadOnly()
-                    if (
-                        str(self.bus.RVALID.value) == "1"
-                        and str(self.bus.RREADY.value) == "1"
-                    ):
-                        # Shift and mask to correctly handle narrow bursts
-                        beat_value = shift_and_mask(
-                            self.bus.RDATA.value, size, byte_offset
-                        )
-
-                        data.append(beat_value)
-                        rresp.append(AXIxRESP(int(self.bus.RRESP.value)))
+                self._add_stall_cycles(
+                    await wait_handshake(self.clock, self.bus.RVALID, self.bus.RREADY)
+                )
+                # Shift and mask to correctly handle narrow bursts
+                beat_value = shift_and_mask(self.bus.RDATA.value, size, byte_offset)
 
-                        if burst is not AXIBurst.FIXED:
-                            byte_offset = (byte_offset + size) % rdata_bytes
+                data.append(beat_value)
+                rresp.append(AXIxRESP(int(self.bus.RRESP.value)))
 
-                        break
-                    await RisingEdge(self.clock)
+                if burst is not AXIBurst.FIXED:
+                    byte_offset = (byte_offset + size) % rdata_bytes
 
-                if not hasattr(self.bus, "RLAST") or str(self.bus.RLAST.value) == "1":
+                if not hasattr(self.bus, "RLAST") or self.bus.RLAST.value == 1:
                     break
 
                 await RisingEdge(self.clock)
@@ -777,13 +757,9 @@ class AXI4Slave(BusDriver):
         clock_re = RisingEdge(self.clock)
 
         while True:
-            while True:
-                self.bus.WREADY.value = 0
-                await ReadOnly()
-                if str(self.bus.AWVALID.value) == "1":
-                    self.bus.WREADY.value = 1
-                    break
-                await clock_re
+            self.bus.WREADY.value = 0
+            await wait_handshake(self.clock, self.bus.AWVALID)
+            self.bus.WREADY.value = 1
 
             await ReadOnly()
             _awaddr = int(self.bus.AWADDR)
@@ -811,7 +787,7 @@ class AXI4Slave(BusDriver):
             await clock_re
 
             while True:
-                if str(self.bus.WVALID.value) == "1":
+                if self.bus.WVALID.value == 1:
                     _burst_diff = burst_length - burst_count
                     _st = _awaddr + (_burst_diff * bytes_in_beat)  # start
                     _end = _awaddr + ((_burst_diff + 1) * bytes_in_beat)  # end
@@ -828,11 +804,7 @@ class AXI4Slave(BusDriver):
         clock_re = RisingEdge(self.clock)
 
         while True:
-            while True:
-                await ReadOnly()
-                if str(self.bus.ARVALID.value) == "1":
-                    break
-                await clock_re
+            await wait_handshake(self.clock, self.bus.ARVALID)
 
             await ReadOnly()
             _araddr = int(self.bus.ARADDR)
@@ -862,7 +834,7 @@ class AXI4Slave(BusDriver):
             while True:
                 self.bus.RVALID.value = 1
                 await ReadOnly()
-                if str(self.bus.RREADY.value) == "1":
+                if self.bus.RREADY.value == 1:
                     _burst_diff = burst_length - burst_count
                     _st = _araddr + (_burst_diff * bytes_in_beat)
                     _end = _araddr + ((_burst_diff + 1) * bytes_in_beat)
@@ -15,7 +15,12 @@ import random
 from typing import Iterable, Union, Optional
 
 import cocotb
-from cocotb.triggers import FallingEdge, NextTimeStep, ReadOnly, RisingEdge
+from cocotb.triggers import (
+    FallingEdge,
+    NextTimeStep,
+    ReadOnly,
+    RisingEdge,
+)
 from cocotb.types import LogicArray
 from scapy.utils import hexdump
 
@@ -24,6 +29,7 @@ from cocotb_bus._compat import (
     create_binary,
 )
 from cocotb_bus.drivers import BusDriver, ValidatedBusDriver
+from cocotb_bus.handshake import wait_cycles, wait_handshake
 
 
 class AvalonMM(BusDriver):
@@ -116,12 +122,12 @@ class AvalonMaster(AvalonMM):
         # Apply values for next clock edge
         if sync:
             await RisingEdge(self.clock)
-        self.bus.address.value = address
-        self.bus.read.value = 1
+        self.bus.shadow.address = address
+        self.bus.shadow.read = 1
         if hasattr(self.bus, "byteenable"):
-            self.bus.byteenable.value = int("1" * len(self.bus.byteenable), 2)
+            self.bus.shadow.byteenable = int("1" * len(self.bus.byteenable), 2)
         if hasattr(self.bus, "cs"):
-            self.bus.cs.value = 1
+            self.bus.shadow.cs = 1
 
         # Wait for waitrequest to be low
         if hasattr(self.bus, "waitrequest"):
@@ -129,12 +135,12 @@ class AvalonMaster(AvalonMM):
         await RisingEdge(self.clock)
 
         # Deassert read
-        self.bus.read.value = 0
+        self.bus.shadow.read = 0
         if hasattr(self.bus, "byteenable"):
-            self.bus.byteenable.value = 0
+            self.bus.shadow.byteenable = 0
         if hasattr(self.bus, "cs"):
-            self.bus.cs.value = 0
-        self.bus.address.value = LogicArray("x" * len(self.bus.address))
+            self.bus.shadow.cs = 0
+        self.bus.shadow.address = LogicArray("x" * len(self.bus.address))
 
         if hasattr(self.bus, "readdatavalid"):
             while True:
@@ -173,13 +179,13 @@ class AvalonMaster(AvalonMM):
 
         # Apply values to bus
         await RisingEdge(self.clock)
-        self.bus.address.value = address
-        self.bus.writedata.value = value
-        self.bus.write.value = 1
+        self.bus.shadow.address = address
+        self.bus.shadow.writedata = value
+        self.bus.shadow.write = 1
         if hasattr(self.bus, "byteenable"):
-            self.bus.byteenable.value = int("1" * len(self.bus.byteenable), 2)
+            self.bus.shadow.byteenable = int("1" * len(self.bus.byteenable), 2)
         if hasattr(self.bus, "cs"):
-            self.bus.cs.value = 1
+            self.bus.shadow.cs = 1
 
         # Wait for waitrequest to be low
         if hasattr(self.bus, "waitrequest"):
@@ -187,13 +193,13 @@ class AvalonMaster(AvalonMM):
 
         # Deassert write
         await RisingEdge(self.clock)
-        self.bus.write.value = 0
+        self.bus.shadow.write = 0
         if hasattr(self.bus, "byteenable"):
-            self.bus.byteenable.value = 0
+            self.bus.shadow.byteenable = 0
         if hasattr(self.bus, "cs"):
-            self.bus.cs.value = 0
-        self.bus.address.value = LogicArray("x" * len(self.bus.address))
-        self.bus.writedata.value = LogicArray("x" * len(self.bus.writedata))
+            self.bus.shadow.cs = 0
+        self.bus.shadow.address = LogicArray("x" * len(self.bus.address))
+        self.bus.shadow.writedata = LogicArray("x" * len(self.bus.writedata))
         self._release_lock()
 
 
@@ -377,7 +383,7 @@ class AvalonMemory(BusDriver):
 
             await ReadOnly()
 
-            if self._readable and str(self.bus.read.value) == "1":
+            if self._readable and self.bus.read.value == 1:
                 if not self._burstread:
                     self._pad()
                     addr = int(self.bus.address.value)
@@ -454,7 +460,7 @@ class AvalonMemory(BusDriver):
                         await edge
                         self._do_response()
 
-            if self._writeable and str(self.bus.write.value) == "1":
+            if self._writeable and self.bus.write.value == 1:
                 if not self._burstwrite:
                     addr = int(self.bus.address.value)
                     data = int(self.bus.writedata.value)
@@ -540,10 +546,7 @@ class AvalonST(ValidatedBusDriver):
 
         FIXME assumes readyLatency of 0
         """
-        await ReadOnly()
-        while str(self.bus.ready.value) != "1":
-            await RisingEdge(self.clock)
-            await ReadOnly()
+        self._add_stall_cycles(await wait_handshake(self.clock, self.bus.ready))
 
     async def _driver_send(self, value, sync=True):
         """Send a transmission over the bus.
@@ -557,16 +560,16 @@ class AvalonST(ValidatedBusDriver):
         clkedge = RisingEdge(self.clock)
 
         # Drive some defaults since we don't know what state we're in
-        self.bus.valid.value = 0
+        self.bus.shadow.valid = 0
 
         if sync:
             await clkedge
 
         # Insert a gap where valid is low
         if not self.on:
-            self.bus.valid.value = 0
-            for _ in range(self.off):
-                await clkedge
+            self.bus.shadow.valid = 0
+            if self.off:
+                await wait_cycles(self.clock, self.off)
 
             # Grab the next set of on/off values
             self._next_valids()
@@ -575,8 +578,10 @@ class AvalonST(ValidatedBusDriver):
         if self.on is not True and self.on:
             self.on -= 1
 
-        self.bus.valid.value = 1
-        self.bus.data.value = create_binary(value, len(self.bus.data), big_endian=False)
+        self.bus.shadow.valid = 1
+        self.bus.shadow.data = create_binary(
+            value, len(self.bus.data), big_endian=False
+        )
 
         # If this is a bus with a ready signal, wait for this word to
         # be acknowledged
@@ -584,8 +589,8 @@ class AvalonST(ValidatedBusDriver):
             await self._wait_ready()
 
         await clkedge
-        self.bus.valid.value = 0
-        self.bus.data.value = create_binary(
+        self.bus.shadow.valid = 0
+        self.bus.shadow.data = create_binary(
             "x" * len(self.bus.data),
             len(self.bus.data),
             big_endian=self.config["firstSymbolInHighOrderBits"],
@@ -673,10 +678,7 @@ class AvalonSTPkts(ValidatedBusDriver):
 
         FIXME assumes readyLatency of 0
         """
-        await ReadOnly()
-        while str(self.bus.ready.value) != "1":
-            await RisingEdge(self.clock)
-            await ReadOnly()
+        self._add_stall_cycles(await wait_handshake(self.clock, self.bus.ready))
 
     async def _send_string(
         self, string: bytes, sync: bool = True, channel: Optional[int] = None
@@ -694,15 +696,15 @@ class AvalonSTPkts(ValidatedBusDriver):
 
         # Drive some defaults since we don't know what state we're in
         if self.use_empty:
-            self.bus.empty.value = 0
-        self.bus.startofpacket.value = 0
-        self.bus.endofpacket.value = 0
-        self.bus.valid.value = 0
+            self.bus.shadow.empty = 0
+        self.bus.shadow.startofpacket = 0
+        self.bus.shadow.endofpacket = 0
+        self.bus.shadow.valid = 0
         if hasattr(self.bus, "error"):
-            self.bus.error.value = 0
+            self.bus.shadow.error = 0
 
         if hasattr(self.bus, "channel"):
-            self.bus.channel.value = 0
+            self.bus.shadow.channel = 0
         elif channel is not None:
             raise AssertionError("%s does not have a channel signal" % self.name)
 
@@ -712,9 +714,9 @@ class AvalonSTPkts(ValidatedBusDriver):
 
             # Insert a gap where valid is low
             if not self.on:
-                self.bus.valid.value = 0
-                for _ in range(self.off):
-                    await clkedge
+                self.bus.shadow.valid = 0
+                if self.off:
+                    await wait_cycles(self.clock, self.off)
 
                 # Grab the next set of on/off values
                 self._next_valids()
@@ -723,36 +725,36 @@ class AvalonSTPkts(ValidatedBusDriver):
             if self.on is not True and self.on:
                 self.on -= 1
 
-            self.bus.valid.value = 1
+            self.bus.shadow.valid = 1
             if hasattr(self.bus, "channel"):
                 if channel is None:
-                    self.bus.channel.value = 0
+                    self.bus.shadow.channel = 0
                 elif channel > self.config["maxChannel"] or channel < 0:
                     raise AssertionError(
                         "%s: Channel value %d is outside range 0-%d"
                         % (self.name, channel, self.config["maxChannel"])
                     )
                 else:
-                    self.bus.channel.value = channel
+                    self.bus.shadow.channel = channel
 
             if firstword:
-                self.bus.startofpacket.value = 1
+                self.bus.shadow.startofpacket = 1
                 firstword = False
             else:
-                self.bus.startofpacket.value = 0
+                self.bus.shadow.startofpacket = 0
 
             nbytes = min(len(string), bus_width)
             data = string[:nbytes]
 
             if len(string) <= bus_width:
-                self.bus.endofpacket.value = 1
+                self.bus.shadow.endofpacket = 1
                 if self.use_empty:
-                    self.bus.empty.value = bus_width - len(string)
+                    self.bus.shadow.empty = bus_width - len(string)
                 string = b""
             else:
                 string = string[bus_width:]
 
-            self.bus.data.value = create_binary(
+            self.bus.shadow.data = create_binary(
                 data,
                 len(self.bus.data),
                 big_endian=self.config["firstSymbolInHighOrderBits"],
@@ -764,24 +766,24 @@ class AvalonSTPkts(ValidatedBusDriver):
                 await self._wait_ready()
 
         await clkedge
-        self.bus.valid.value = 0
-        self.bus.endofpacket.value = 0
-        self.bus.data.value = create_binary(
+        self.bus.shadow.valid = 0
+        self.bus.shadow.endofpacket = 0
+        self.bus.shadow.data = create_binary(
             "x" * len(self.bus.data),
             len(self.bus.data),
             big_endian=self.config["firstSymbolInHighOrderBits"],
         )
-        self.bus.startofpacket.value = create_binary("x", 1, big_endian=False)
-        self.bus.endofpacket.value = create_binary("x", 1, big_endian=False)
+        self.bus.shadow.startofpacket = create_binary("x", 1, big_endian=False)
+        self.bus.shadow.endofpacket = create_binary("x", 1, big_endian=False)
 
         if self.use_empty:
-            self.bus.empty.value = create_binary(
+            self.bus.shadow.empty = create_binary(
                 "x" * len(self.bus.empty),
                 len(self.bus.empty),
                 big_endian=self.config["firstSymbolInHighOrderBits"],
             )
         if hasattr(self.bus, "channel"):
-            self.bus.channel.value = create_binary(
+            self.bus.shadow.channel = create_binary(
                 "x" * len(self.bus.channel), len(self.bus.channel), big_endian=False
             )
 
@@ -801,9 +803,9 @@ class AvalonSTPkts(ValidatedBusDriver):
 
             # Insert a gap where valid is low
             if not self.on:
-                self.bus.valid.value = 0
-                for _ in range(self.off):
-                    await clkedge
+                self.bus.shadow.valid = 0
+                if self.off:
+                    await wait_cycles(self.clock, self.off)
 
                 # Grab the next set of on/off values
                 self._next_valids()
@@ -813,7 +815,7 @@ class AvalonSTPkts(ValidatedBusDriver):
                 self.on -= 1
 
             if not hasattr(word, "valid"):
-                self.bus.valid.value = 1
+                self.bus.shadow.valid = 1
             else:
                 self.bus.value = word
 
@@ -823,7 +825,7 @@ class AvalonSTPkts(ValidatedBusDriver):
                     await self._wait_ready()
 
         await clkedge
-        self.bus.valid.value = 0
+        self.bus.shadow.valid = 0
 
     async def _driver_send(
         self,
@@ -9,10 +9,13 @@ Drivers for On-chip Peripheral Bus.
 NOTE: Currently we only support a very small subset of functionality.
 """
 
-from cocotb.triggers import ReadOnly, RisingEdge
+import cocotb
+from cocotb.triggers import NextTimeStep, RisingEdge
+from cocotb.utils import get_sim_time
 
-from cocotb_bus._compat import BinaryType
+from cocotb_bus._compat import BinaryType, cancel_task
 from cocotb_bus.drivers import BusDriver
+from cocotb_bus.handshake import _cycles, wait_handshake
 
 
 class OPBException(Exception):
@@ -42,6 +45,44 @@ class OPBMaster(BusDriver):
         self.bus.select.value = 0
         self.log.debug("OPBMaster created")
 
+    async def _watch_tout_sup(self):
+        """Record the time of the last cycle the slave held ``toutSup``."""
+        while True:
+            await wait_handshake(self.clock, self.bus.toutSup)
+            self._tout_sup_time = get_sim_time()
+            await RisingEdge(self.clock)
+
+    async def _wait_ack(self, operation):
+        """Wait for ``xferAck``, for at most :attr:`_max_cycles` cycles
+        since the slave last held ``toutSup`` to suppress the timeout.
+
+        Returns in the :class:`~cocotb.triggers.ReadOnly` phase of the
+        acknowledged cycle.
+        """
+        self._tout_sup_time = get_sim_time()
+        watcher = cocotb.start_soon(self._watch_tout_sup())
+        try:
+            max_cycles = self._max_cycles
+            while True:
+                self._add_stall_cycles(
+                    await wait_handshake(
+                        self.clock, self.bus.xferAck, max_cycles=max_cycles
+                    )
+                )
+                if self.bus.xferAck.value == 1:
+                    return
+                if self.bus.toutSup.value == 1:
+                    counted = 0
+                else:
+                    counted = _cycles(self.clock, self._tout_sup_time, get_sim_time())
+                if counted >= self._max_cycles:
+                    raise OPBException(
+                        "%s took longer than %d cycles" % (operation, self._max_cycles)
+                    )
+                max_cycles = self._max_cycles - counted
+        finally:
+            cancel_task(watcher)
+
     async def read(self, address: int, sync: bool = True) -> BinaryType:
         """Issue a request to the bus and block until this comes back.
 
@@ -68,17 +109,9 @@ class OPBMaster(BusDriver):
         self.bus.RNW.value = 1
         self.bus.BE.value = 0xF
 
-        count = 0
-        while not int(self.bus.xferAck.value):
-            await RisingEdge(self.clock)
-            await ReadOnly()
-            if int(self.bus.toutSup.value):
-                count = 0
-            else:
-                count += 1
-            if count >= self._max_cycles:
-                raise OPBException("Read took longer than 16 cycles")
+        await self._wait_ack("Read")
         data = int(self.bus.DBus_out.value)
+        await NextTimeStep()
 
         # Deassert read
         self.bus.select.value = 0
@@ -108,16 +141,8 @@ class OPBMaster(BusDriver):
         self.bus.BE.value = 0xF
         self.bus.DBus_out.value = value
 
-        count = 0
-        while not int(self.bus.xferAck.value):
-            await RisingEdge(self.clock)
-            await ReadOnly()
-            if int(self.bus.toutSup.value):
-                count = 0
-            else:
-                count += 1
-            if count >= self._max_cycles:
-                raise OPBException("Write took longer than 16 cycles")
+        await self._wait_ack("Write")
+        await NextTimeStep()
 
         self.bus.select.value = 0
         self._release_lock()
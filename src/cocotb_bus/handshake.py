@@ -0,0 +1,204 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Handshake waits shared by the drivers.
+
+Signals are compared with ``signal.value == level``, which is ``False`` for
+unresolved values on all supported cocotb versions.
+
+:func:`wait_handshake` samples the signals once per clock cycle like a
+``while True: await ReadOnly(); ...; await RisingEdge(clock)`` loop would.
+It polls the first two cycles of a stall to learn the clock period,
+then sleeps until one of the signals changes instead.
+A change between clock edges is only sampled at the next clock edge,
+so the result matches the polling loop for a free-running clock.
+
+:func:`wait_cycles` counts clock edges like :class:`~cocotb.triggers.ClockCycles`.
+For a clock known to run freely, it can sleep with a single
+:class:`~cocotb.triggers.Timer` instead of waking up on every clock edge.
+"""
+
+import weakref
+
+from cocotb.triggers import ClockCycles, First, ReadOnly, RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+from cocotb_bus._compat import value_change
+
+# clock handle -> (period, time of a rising edge), in simulator steps,
+# as last learned by wait_handshake
+_clock_timing = weakref.WeakKeyDictionary()
+
+
+def _cycles(clock, start, end):
+    timing = _clock_timing.get(clock)
+    if timing is None:
+        return 0
+    period, edge = timing
+    return (end - edge) // period - (start - edge) // period
+
+
+async def wait_cycles(clock, cycles: int, free_running: bool = False) -> None:
+    """Wait for *cycles* rising edges of *clock*, like
+    :class:`ClockCycles(clock, cycles) <cocotb.triggers.ClockCycles>`.
+
+    With *free_running*, the clock period is learned from the first two edges
+    awaited, or taken from an earlier wait on the same clock.
+    Once it is known, the wait sleeps with a :class:`~cocotb.triggers.Timer`
+    until just after the second to last edge and then awaits the last one,
+    so it costs two wakeups however many cycles it waits.
+    Edges are not counted while sleeping, so only use it where a gated,
+    stopped or changed clock may shorten or lengthen the wait,
+    e.g. to poll for something.
+    The last edge is always awaited as a :class:`~cocotb.triggers.RisingEdge`,
+    so the wait ends aligned to the clock.
+
+    Args:
+        clock: The clock to count edges of.
+        cycles: The number of rising edges to wait for.
+        free_running: Sleep through the edges instead of counting them.
+    """
+    if not free_running:
+        if cycles > 0:
+            await ClockCycles(clock, cycles)
+        return
+    clock_edge = RisingEdge(clock)
+    last_edge = None
+    while cycles > 0:
+        timing = _clock_timing.get(clock)
+        expected = None
+        if timing is not None and cycles > 2 and timing[0] > 1:
+            period, edge = timing
+            now = get_sim_time()
+            # time of the second to last edge to wait for
+            before_last = edge + ((now - edge) // period + cycles - 1) * period
+            await Timer(before_last + 1 - now, "step")
+            expected = before_last + period
+            cycles = 1
+        await clock_edge
+        now = get_sim_time()
+        if expected is not None and now != expected:
+            # The clock changed, learn it again
+            _clock_timing.pop(clock, None)
+        elif expected is not None:
+            _clock_timing[clock] = (timing[0], now)
+        elif last_edge is not None:
+            _clock_timing[clock] = (now - last_edge, now)
+        last_edge = now
+        cycles -= 1
+
+
+def _failing(signals, level):
+    for signal in signals:
+        if signal.value != level:
+            return signal
+    return None
+
+
+async def wait_handshake(clock, *signals, level=1, max_cycles=None) -> int:
+    """Wait for a clock cycle in which all *signals* are at *level*.
+
+    The signals are sampled in the :class:`~cocotb.triggers.ReadOnly` phase,
+    starting with the current cycle.
+    Returns in the :class:`~cocotb.triggers.ReadOnly` phase of that cycle.
+
+    Args:
+        clock: The clock the signals are sampled with.
+        *signals: The handshake signals, e.g. ``ready`` or ``valid, ready``.
+        level: The value all signals have to be at.
+        max_cycles: Give up after stalling this many cycles,
+            in which case the signals are not all at *level* on return.
+            ``None`` waits forever.
+
+    Returns:
+        The number of clock cycles stalled.
+    """
+    await ReadOnly()
+    signal = _failing(signals, level)
+    if signal is None:
+        return 0
+
+    stalled = 0
+    period = None
+    last_edge = None
+    clock_edge = RisingEdge(clock)
+    while signal is not None:
+        if period is None:
+            await clock_edge
+            now = get_sim_time()
+            if last_edge is not None:
+                period = now - last_edge
+                _clock_timing[clock] = (period, now)
+            stalled += 1
+        else:
+            if max_cycles is None:
+                await value_change(signal)
+            else:
+                timeout = Timer((max_cycles - stalled) * period, "step")
+                await First(value_change(signal), timeout)
+            now = get_sim_time()
+            if (now - last_edge) % period:
+                # Changed between clock edges, sample at the next one
+                await clock_edge
+                now = get_sim_time()
+            cycles, misaligned = divmod(now - last_edge, period)
+            stalled += max(1, cycles)
+            if misaligned:
+                # The clock changed, learn it again
+                period = None
+        last_edge = now
+        await ReadOnly()
+        signal = _failing(signals, level)
+        if max_cycles is not None and stalled >= max_cycles:
+            break
+    return stalled
+
+
+async def wait_level(signal, level=1, clock=None) -> int:
+    """Wait until *signal* is at *level*, independent of any clock.
+
+    Returns in the :class:`~cocotb.triggers.ReadOnly` phase.
+
+    If a *clock* is given but its period isn't known from an earlier wait,
+    the first two cycles of the wait poll the signal on the rising edges
+    of *clock* to learn it, like :func:`wait_handshake`.
+
+    Args:
+        signal: The signal to wait for.
+        level: The value to wait for.
+        clock: Clock to count the stalled cycles in.
+
+    Returns:
+        The number of *clock* cycles stalled, ``0`` if no clock is given.
+    """
+    await ReadOnly()
+    if signal.value == level:
+        return 0
+    start = get_sim_time()
+    counted = 0
+    if clock is not None and clock not in _clock_timing:
+        clock_edge = RisingEdge(clock)
+        last_edge = None
+        while True:
+            await clock_edge
+            now = get_sim_time()
+            counted += 1
+            if last_edge is not None:
+                _clock_timing[clock] = (now - last_edge, now)
+            last_edge = now
+            await ReadOnly()
+            if signal.value == level:
+                return counted
+            if counted > 1:
+                start = now
+                break
+    change = value_change(signal)
+    while True:
+        await change
+        await ReadOnly()
+        if signal.value == level:
+            break
+    if clock is None:
+        return 0
+    return counted + _cycles(clock, start, get_sim_time())
@@ -0,0 +1,267 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Opt-in performance instrumentation of drivers."""
+
+import json
+import math
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from cocotb.utils import get_sim_time, get_time_from_sim_steps
+
+
+class Histogram:
+    """Histogram with power-of-two bucket boundaries.
+
+    A value ``v`` is counted in the bucket with the smallest upper bound
+    ``2**i >= v``; values ``<= 0`` go into bucket ``0``.
+    """
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def add(self, value, n: int = 1) -> None:
+        """Count *value* *n* times."""
+        if value <= 0:
+            bound = 0
+        else:
+            bound = 1 << (math.ceil(value) - 1).bit_length()
+        self.buckets[bound] = self.buckets.get(bound, 0) + n
+        self.count += n
+        self.total += value * n
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    @property
+    def mean(self):
+        """Mean of the counted values, ``0`` if there are none."""
+        return self.total / self.count if self.count else 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the histogram as a JSON-serializable :class:`dict`."""
+        return {
+            "count": self.count,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.mean,
+            "buckets": {str(bound): n for bound, n in sorted(self.buckets.items())},
+        }
+
+
+class TransactionRecord:
+    """Timing of one transaction sent by a driver.
+
+    Simulation times are in simulator time steps.
+    """
+
+    __slots__ = (
+        "queued_at",
+        "started_at",
+        "completed_at",
+        "wall_time",
+        "size",
+        "stall_cycles",
+    )
+
+    def __init__(self, queued_at, started_at, completed_at, wall_time, size, stalls):
+        #: Time the transaction was queued, equal to :attr:`started_at`
+        #: for transactions sent with :meth:`~cocotb_bus.drivers.Driver.send`.
+        self.queued_at = queued_at
+        #: Time the driver started sending the transaction.
+        self.started_at = started_at
+        #: Time the transaction had been sent.
+        self.completed_at = completed_at
+        #: Wall-clock seconds spent running the driver code sending the transaction,
+        #: excluding other coroutines that ran while it waited.
+        self.wall_time = wall_time
+        #: Size of the transaction in bytes.
+        self.size = size
+        #: Clock cycles the driver waited for the bus to be ready
+        #: while sending the transaction.
+        self.stall_cycles = stalls
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _Measured:
+    """Await the coroutine *coro* and measure its own steps only.
+
+    Each time the coroutine is resumed, the wall-clock time until it
+    suspends again and the stall cycles *driver* counted meanwhile are added
+    to :attr:`wall_time` and :attr:`stall_cycles`.
+    Coroutines run one step at a time, so operations running concurrently
+    on the same driver don't count towards each other.
+    """
+
+    __slots__ = ("_coro", "_driver", "wall_time", "stall_cycles")
+
+    def __init__(self, coro, driver):
+        self._coro = coro
+        self._driver = driver
+        self.wall_time = 0.0
+        self.stall_cycles = 0
+
+    def __await__(self):
+        coro = self._coro
+        driver = self._driver
+        step, arg = coro.send, None
+        while True:
+            stalls = driver._stall_cycles
+            start = time.perf_counter()
+            try:
+                try:
+                    trigger = step(arg)
+                finally:
+                    self.wall_time += time.perf_counter() - start
+                    self.stall_cycles += driver._stall_cycles - stalls
+            except StopIteration as stop:
+                return stop.value
+            try:
+                arg = yield trigger
+            except GeneratorExit:
+                coro.close()
+                raise
+            except BaseException as exc:
+                step, arg = coro.throw, exc
+            else:
+                step = coro.send
+
+
+def _transaction_size(transaction) -> int:
+    if isinstance(transaction, (bytes, bytearray, memoryview, str)):
+        return len(transaction)
+    return 0
+
+
+class DriverInstrumentation:
+    """Latency and throughput measurements of a driver.
+
+    Created with :meth:`cocotb_bus.drivers.Driver.enable_instrumentation`.
+    Every transaction sent through the driver is recorded in :attr:`records`,
+    of which the most recent *history* are kept,
+    and counted in the totals and histograms.
+
+    Args:
+        history: Number of :class:`TransactionRecord` to keep.
+        size_fn: Function returning the size in bytes of a transaction.
+            Defaults to the length of :class:`bytes` and :class:`str`
+            transactions and ``0`` for anything else.
+        unit: Time unit of the histograms, throughput and export.
+    """
+
+    def __init__(
+        self,
+        history: int = 1024,
+        size_fn: Optional[Callable[[Any], int]] = None,
+        unit: str = "ns",
+    ):
+        self.records = deque(maxlen=history)
+        self.unit = unit
+        self._size = size_fn or _transaction_size
+        self.transactions = 0
+        self.bytes = 0
+        self.stall_cycles = 0
+        self.wall_time = 0.0
+        #: :class:`Histogram` of the time from queuing to completion.
+        self.latency = Histogram()
+        #: :class:`Histogram` of the time from start of drive to completion.
+        self.service_time = Histogram()
+        #: :class:`Histogram` of the stall cycles per transaction.
+        self.stalls = Histogram()
+
+    async def _measure(self, driver, transaction, queued_at, send):
+        started_at = get_sim_time()
+        measured = _Measured(send, driver)
+        await measured
+        completed_at = get_sim_time()
+        if queued_at is None:
+            queued_at = started_at
+        self.add(
+            TransactionRecord(
+                queued_at,
+                started_at,
+                completed_at,
+                measured.wall_time,
+                self._size(transaction),
+                measured.stall_cycles,
+            )
+        )
+
+    def add(self, record: TransactionRecord) -> None:
+        """Count a transaction."""
+        self.records.append(record)
+        self.transactions += 1
+        self.bytes += record.size
+        self.stall_cycles += record.stall_cycles
+        self.wall_time += record.wall_time
+        self.latency.add(self._time(record.completed_at - record.queued_at))
+        self.service_time.add(self._time(record.completed_at - record.started_at))
+        self.stalls.add(record.stall_cycles)
+
+    def _time(self, steps):
+        return get_time_from_sim_steps(steps, self.unit)
+
+    def throughput(self, window: Optional[float] = None):
+        """Return the rate of recorded transactions.
+
+        Args:
+            window: Only consider the transactions completed during the last
+                *window* time units before the most recent completion.
+                ``None`` considers all kept :attr:`records`.
+
+        Returns:
+            A tuple ``(transactions, bytes)`` per time unit.
+        """
+        if not self.records:
+            return 0.0, 0.0
+        end = self.records[-1].completed_at
+        records = self.records
+        if window is not None:
+            records = [
+                record
+                for record in records
+                if self._time(end - record.completed_at) <= window
+            ]
+        start = min(record.started_at for record in records)
+        duration = window if window is not None else self._time(end - start)
+        if not duration:
+            return 0.0, 0.0
+        size = sum(record.size for record in records)
+        return len(records) / duration, size / duration
+
+    def as_dict(self, records: bool = False) -> Dict[str, Any]:
+        """Return the measurements as a JSON-serializable :class:`dict`.
+
+        Args:
+            records: Also include the kept :attr:`records`.
+        """
+        transactions, size = self.throughput()
+        result = {
+            "unit": self.unit,
+            "transactions": self.transactions,
+            "bytes": self.bytes,
+            "stall_cycles": self.stall_cycles,
+            "wall_time": self.wall_time,
+            "throughput": {"transactions": transactions, "bytes": size},
+            "latency": self.latency.as_dict(),
+            "service_time": self.service_time.as_dict(),
+            "stalls": self.stalls.as_dict(),
+        }
+        if records:
+            result["records"] = [record.as_dict() for record in self.records]
+        return result
+
+    def export(self, path: str, records: bool = False) -> None:
+        """Write :meth:`as_dict` to *path* as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.as_dict(records), f, indent=2)
@@ -10,21 +10,218 @@ The monitor is responsible for watching the pins of the DUT and recreating
 the transactions.
 """
 
+import json
 import logging
 import warnings
 from collections import deque
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Union
 
 import cocotb
-from cocotb.triggers import Event, First, Timer
+from cocotb.triggers import Event, First, RisingEdge, Timer
+from cocotb.utils import get_sim_time, get_time_from_sim_steps
 
-from cocotb_bus.bus import Bus
+from cocotb_bus.bus import Bus, _BusObjectArray
+from cocotb_bus.metrics import Histogram, _transaction_size
+from cocotb_bus.trace import TraceWriter
+
+_OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "raise")
+
+
+class MonitorQueueFull(Exception):
+    """Raised by :meth:`Monitor._recv` when the receive queue is at its capacity
+    and the overflow policy is ``"raise"``."""
+
+
+def _compile_callbacks(callbacks):
+    """Return one callable calling all *callbacks* in order."""
+    if len(callbacks) == 1:
+        return callbacks[0]
+    callbacks = tuple(callbacks)
+
+    def dispatch(transaction):
+        for callback in callbacks:
+            callback(transaction)
+
+    return dispatch
 
 
 class MonitorStatistics:
-    """Wrapper class for storing Monitor statistics"""
+    """Wrapper class for storing Monitor statistics
+
+    Transactions are counted by :meth:`Monitor._recv`.
+    The cycle counters are only maintained by monitors sampling a handshake
+    every clock cycle, like the Avalon-ST monitors.
+
+    The bytes, throughput, peak bandwidth and histograms take the size
+    and arrival time of every transaction, so they are only recorded
+    with *detailed*.
+    To use other settings, replace :attr:`Monitor.stats` before the first
+    transaction is received::
+
+        monitor.stats = MonitorStatistics(detailed=True)
+
+    Args:
+        unit: Time unit of the inter-arrival times, bandwidths and export.
+        window: Length of the windows of :attr:`peak_bandwidth` in *unit*,
+            ``None`` to not track it.
+            Windows are aligned to multiples of their length.
+        size_fn: Function returning the size in bytes of a transaction.
+            Defaults to the length of :class:`bytes` and :class:`str`
+            transactions and ``0`` for anything else.
+        detailed: Record the bytes, throughput, peak bandwidth and histograms.
+    """
 
-    def __init__(self):
+    def __init__(
+        self,
+        unit: str = "ns",
+        window: Optional[float] = 1000,
+        size_fn: Optional[Callable[[Any], int]] = None,
+        detailed: bool = False,
+    ):
         self.received_transactions = 0
+        #: Whether the bytes, throughput, peak bandwidth and histograms are recorded.
+        self.detailed = detailed
+        #: Transactions dropped from the full receive queue.
+        self.dropped_transactions = 0
+        #: Dropped transactions written to the spill file.
+        self.spilled_transactions = 0
+        #: Bytes received.
+        self.bytes = 0
+        #: Clock cycles sampled.
+        self.cycles = 0
+        #: Clock cycles with a transfer, i.e. valid and ready.
+        self.active_cycles = 0
+        #: Clock cycles with valid but without ready.
+        self.backpressure_cycles = 0
+        self._interarrival = Histogram()
+        self._size_histogram = Histogram()
+        # Exact counts of gaps in simulator steps and of sizes,
+        # folded into the histograms when read or grown too large
+        self._gaps = {}
+        self._sizes = {}
+        self.unit = unit
+        self.window = window
+        self._size = size_fn or _transaction_size
+        self._scale = None
+        self._first = None
+        self._last = None
+        self._window_steps = None
+        self._window_end = 0
+        self._window_bytes = 0
+        self._peak_bytes = 0
+        self._peak_start = None
+
+    def _add(self, transaction):
+        now = get_sim_time()
+        size = self._size(transaction)
+        self.bytes += size
+        sizes = self._sizes
+        sizes[size] = sizes.get(size, 0) + 1
+        last = self._last
+        if last is None:
+            self._first = now
+            self._scale = get_time_from_sim_steps(1, self.unit)
+            if self.window is not None:
+                self._window_steps = max(1, round(self.window / self._scale))
+        else:
+            gaps = self._gaps
+            gap = now - last
+            gaps[gap] = gaps.get(gap, 0) + 1
+            if len(gaps) > 1024:
+                self._fold()
+        self._last = now
+        if len(sizes) > 1024:
+            self._fold()
+
+        if self._window_steps is not None:
+            if now >= self._window_end:
+                self._end_window()
+                self._window_end = now - now % self._window_steps + self._window_steps
+            self._window_bytes += size
+
+    def _end_window(self):
+        if self._window_bytes > self._peak_bytes:
+            self._peak_bytes = self._window_bytes
+            self._peak_start = self._window_end - self._window_steps
+        self._window_bytes = 0
+
+    def _fold(self):
+        for gap, n in self._gaps.items():
+            self._interarrival.add(gap * self._scale, n)
+        self._gaps.clear()
+        for size, n in self._sizes.items():
+            self._size_histogram.add(size, n)
+        self._sizes.clear()
+
+    @property
+    def interarrival(self) -> Histogram:
+        """:class:`~cocotb_bus.metrics.Histogram` of the time between transactions."""
+        self._fold()
+        return self._interarrival
+
+    @property
+    def size(self) -> Histogram:
+        """:class:`~cocotb_bus.metrics.Histogram` of the transaction sizes in bytes."""
+        self._fold()
+        return self._size_histogram
+
+    @property
+    def utilization(self) -> Optional[float]:
+        """Fraction of :attr:`cycles` with a transfer, ``None`` if not counted."""
+        if not self.cycles:
+            return None
+        return self.active_cycles / self.cycles
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per time unit between the first and last transaction."""
+        if self._first is None or self._last == self._first:
+            return 0.0
+        return self.bytes / ((self._last - self._first) * self._scale)
+
+    @property
+    def peak_bandwidth(self) -> float:
+        """Bytes per time unit in the window with the most bytes received."""
+        if not self.window:
+            return 0.0
+        return max(self._peak_bytes, self._window_bytes) / self.window
+
+    @property
+    def peak_window_start(self) -> Optional[float]:
+        """Start of the window with the most bytes received, in *unit*."""
+        if self._window_bytes > self._peak_bytes:
+            return (self._window_end - self._window_steps) * self._scale
+        if self._peak_start is None:
+            return None
+        return self._peak_start * self._scale
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the statistics as a JSON-serializable :class:`dict`."""
+        return {
+            "detailed": self.detailed,
+            "unit": self.unit,
+            "received_transactions": self.received_transactions,
+            "dropped_transactions": self.dropped_transactions,
+            "spilled_transactions": self.spilled_transactions,
+            "bytes": self.bytes,
+            "throughput": self.throughput,
+            "cycles": self.cycles,
+            "active_cycles": self.active_cycles,
+            "backpressure_cycles": self.backpressure_cycles,
+            "utilization": self.utilization,
+            "peak_bandwidth": {
+                "window": self.window,
+                "bandwidth": self.peak_bandwidth,
+                "start": self.peak_window_start,
+            },
+            "interarrival": self.interarrival.as_dict(),
+            "size": self.size.as_dict(),
+        }
+
+    def export(self, path: str) -> None:
+        """Write :meth:`as_dict` to *path* as JSON."""
+        with open(path, "w") as f:
+            json.dump(self.as_dict(), f, indent=2)
 
 
 class Monitor:
@@ -40,16 +237,28 @@ class Monitor:
 
     The primary use of a Monitor is as an interface for a :class:`~cocotb.scoreboard.Scoreboard`.
 
+    Without callbacks, received transactions are kept in a receive queue,
+    which can be consumed with ``async for transaction in monitor:``
+    or :meth:`get_batch`.
+
     Args:
         callback (callable): Callback to be called with each recovered transaction
             as the argument. If the callback isn't used, received transactions will
             be placed on a queue and the event used to notify any consumers.
         event (cocotb.triggers.Event): Event that will be called when a transaction
             is received through the internal :meth:`_recv` method.
-            `Event.data` is set to the received transaction.
+            `Event.data` is only set to the received transaction
+            if :attr:`event_data` is enabled.
+        clock_domain (ClockDomain): Sample the bus from this shared
+            :class:`ClockDomain` instead of running :meth:`_monitor_recv`.
+            Requires the sub-class to implement :meth:`_sample_cycle`.
     """
 
-    def __init__(self, callback=None, event=None):
+    #: Set the deprecated `Event.data` of *event* to each received transaction.
+    #: Enable it on a class or instance that still relies on it.
+    event_data = False
+
+    def __init__(self, callback=None, event=None, clock_domain=None):
         self._event = event
         if self._event is not None:
             self._event.data = (
@@ -57,9 +266,19 @@ class Monitor:
             )
         self._wait_event = Event()
         self._wait_event_data = None
+        self._recv_waiters = 0
         self._recvQ = deque()
+        self._queued_event = Event()
+        self._queue_waiters = 0
+        self._capacity = None
+        self._overflow = "drop_oldest"
+        self._spill = None
         self._callbacks = []
+        # All callbacks combined into one callable, None without callbacks
+        self._dispatch = None
         self.stats = MonitorStatistics()
+        # Set by cocotb_bus.trace.TraceWriter.attach
+        self._tracer = None
 
         # Sub-classes may already set up logging
         if not hasattr(self, "log"):
@@ -70,14 +289,30 @@ class Monitor:
         if callback is not None:
             self.add_callback(callback)
 
-        # Create an independent coroutine which can receive stuff
-        self._thread = cocotb.start_soon(self._monitor_recv())
+        self._receiving = True
+        self._clock_domain = clock_domain
+        if clock_domain is None:
+            # Create an independent coroutine which can receive stuff
+            self._thread = cocotb.start_soon(self._monitor_recv())
+        else:
+            self._thread = None
+            clock_domain.add(self)
 
     def kill(self):
         """Kill monitor coroutine."""
         if self._thread:
             self._thread.kill()
             self._thread = None
+        if self._clock_domain is not None:
+            self._clock_domain.remove(self)
+            self._clock_domain = None
+        if self._receiving:
+            self._receiving = False
+            # Wake up consumers, there is nothing more to come
+            self._queued_event.set()
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
 
     def __len__(self):
         return len(self._recvQ)
@@ -85,6 +320,118 @@ class Monitor:
     def __getitem__(self, idx):
         return self._recvQ[idx]
 
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        """Remove and return the oldest transaction in the receive queue,
+        waiting for one if it is empty.
+
+        This allows consuming the received transactions with
+        ``async for transaction in monitor:``.
+        The iteration ends once the monitor was killed and its queue is empty.
+        """
+        while not self._recvQ:
+            if not self._receiving:
+                raise StopAsyncIteration
+            await self._wait_queued()
+        return self._recvQ.popleft()
+
+    async def get_batch(
+        self, max_n: Optional[int] = None, timeout: Optional[int] = None
+    ) -> List[Any]:
+        """Remove and return the oldest transactions in the receive queue,
+        waiting for at least one if it is empty.
+
+        All transactions received while waiting are returned together,
+        so a burst is consumed with a single wakeup.
+
+        Args:
+            max_n: Maximum number of transactions to return,
+                ``None`` returns all queued transactions.
+            timeout: The timeout value for :class:`~.triggers.Timer`.
+                Defaults to ``None``.
+
+        Returns:
+            The transactions in the order they were received,
+            an empty list if *timeout* expired or the monitor was killed.
+        """
+        recvQ = self._recvQ
+        if not recvQ and self._receiving:
+            await self._wait_queued(timeout)
+        if max_n is None or max_n >= len(recvQ):
+            batch = list(recvQ)
+            recvQ.clear()
+        else:
+            batch = [recvQ.popleft() for _ in range(max_n)]
+        return batch
+
+    def set_queue_limit(
+        self,
+        capacity: Optional[int] = None,
+        overflow: str = "drop_oldest",
+        spill: Union[str, BinaryIO, None] = None,
+    ) -> None:
+        """Limit the number of transactions kept in the receive queue.
+
+        Transactions that would exceed the capacity are counted in
+        :attr:`MonitorStatistics.dropped_transactions`.
+        If the queue is already longer than *capacity*,
+        the oldest transactions are dropped right away.
+
+        Args:
+            capacity: Maximum queue length,
+                ``None`` (the default) for an unbounded queue.
+            overflow: What to do with a transaction received into a full queue:
+                ``"drop_oldest"`` drops the oldest queued transaction
+                to make room, ``"drop_newest"`` drops the received transaction
+                and ``"raise"`` raises :exc:`MonitorQueueFull`.
+            spill: Path or binary file object to write the dropped
+                transactions to instead of discarding them,
+                in the format of :class:`~cocotb_bus.trace.TraceWriter`.
+                Read them back with :func:`~cocotb_bus.trace.read_trace`.
+
+        Raises:
+            ValueError: If *capacity* is not positive or *overflow* is unknown.
+        """
+        if capacity is not None and capacity < 1:
+            raise ValueError("Expected capacity >= 1, got %d" % (capacity,))
+        if overflow not in _OVERFLOW_POLICIES:
+            raise ValueError(
+                "Unknown overflow policy %r, expected one of %s"
+                % (overflow, ", ".join(_OVERFLOW_POLICIES))
+            )
+        if self._spill is not None:
+            self._spill.close()
+            self._spill = None
+        if spill is not None:
+            self._spill = TraceWriter(spill)
+        self._capacity = capacity
+        self._overflow = overflow
+        if capacity is not None:
+            while len(self._recvQ) > capacity:
+                self._drop(self._recvQ.popleft())
+
+    def _drop(self, transaction):
+        self.stats.dropped_transactions += 1
+        if self._spill is not None:
+            self._spill.record(
+                getattr(self, "name", None) or type(self).__qualname__, transaction
+            )
+            self.stats.spilled_transactions += 1
+
+    async def _wait_queued(self, timeout=None):
+        # _recv only sets the event while a consumer is waiting
+        self._queued_event.clear()
+        self._queue_waiters += 1
+        try:
+            if timeout:
+                await First(self._queued_event.wait(), Timer(timeout))
+            else:
+                await self._queued_event.wait()
+        finally:
+            self._queue_waiters -= 1
+
     def add_callback(self, callback):
         """Add function as a callback.
 
@@ -95,6 +442,7 @@ class Monitor:
             "Adding callback of function %s to monitor", callback.__qualname__
         )
         self._callbacks.append(callback)
+        self._dispatch = _compile_callbacks(self._callbacks)
 
     async def wait_for_recv(self, timeout=None):
         """With *timeout*, :meth:`.wait` for transaction to arrive on monitor
@@ -107,13 +455,18 @@ class Monitor:
         Returns:
             Data of received transaction.
         """
-        if timeout:
-            t = Timer(timeout)
-            fired = await First(self._wait_event.wait(), t)
-            if fired is t:
-                return None
-        else:
-            await self._wait_event.wait()
+        # _recv only pulses the event while someone is waiting
+        self._recv_waiters += 1
+        try:
+            if timeout:
+                t = Timer(timeout)
+                fired = await First(self._wait_event.wait(), t)
+                if fired is t:
+                    return None
+            else:
+                await self._wait_event.wait()
+        finally:
+            self._recv_waiters -= 1
 
         return self._wait_event_data
 
@@ -129,33 +482,69 @@ class Monitor:
             "providing a ``_monitor_recv`` method"
         )
 
+    #: Decode one clock cycle of the bus, called by a :class:`ClockDomain`
+    #: right after the rising edge of the clock.
+    #: Sub-classes supporting clock domains implement it as a method
+    #: and call :meth:`_recv` with each recovered transaction.
+    _sample_cycle = None
+
     def _recv(self, transaction):
         """Common handling of a received transaction."""
 
-        self.stats.received_transactions += 1
+        stats = self.stats
+        stats.received_transactions += 1
+        if stats.detailed:
+            stats._add(transaction)
+        if self._tracer is not None:
+            self._tracer(transaction, None)
 
         # either callback based consumer
-        for callback in self._callbacks:
-            callback(transaction)
+        dispatch = self._dispatch
+        if dispatch is not None:
+            dispatch(transaction)
 
         # Or queued with a notification
-        if not self._callbacks:
-            self._recvQ.append(transaction)
+        else:
+            recvQ = self._recvQ
+            if self._capacity is None or len(recvQ) < self._capacity:
+                recvQ.append(transaction)
+                if self._queue_waiters:
+                    self._queued_event.set()
+            elif self._overflow == "drop_oldest":
+                self._drop(recvQ.popleft())
+                recvQ.append(transaction)
+                if self._queue_waiters:
+                    self._queued_event.set()
+            elif self._overflow == "drop_newest":
+                self._drop(transaction)
+            else:
+                self.stats.dropped_transactions += 1
+                raise MonitorQueueFull(
+                    "Receive queue of %s is full (%d transactions)"
+                    % (self, self._capacity)
+                )
 
         if self._event is not None:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                self._event.set(transaction)
+            if self.event_data:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    self._event.set(transaction)
+            else:
+                self._event.set()
 
         # If anyone was waiting then let them know
-        if self._wait_event is not None:
-            self._wait_event.set()
+        if self._recv_waiters:
             self._wait_event_data = transaction
+            self._wait_event.set()
             self._wait_event.clear()
 
 
 class BusMonitor(Monitor):
-    """Wrapper providing common functionality for monitoring buses."""
+    """Wrapper providing common functionality for monitoring buses.
+
+    If *bus* is given, that :class:`~cocotb_bus.bus.Bus` is used instead of creating one
+    and *kwargs* other than *array_idx* are ignored.
+    """
 
     _signals = []
     _optional_signals = []
@@ -169,22 +558,28 @@ class BusMonitor(Monitor):
         reset_n=None,
         callback=None,
         event=None,
+        bus=None,
+        clock_domain=None,
         **kwargs,
     ):
         self.log = logging.getLogger("cocotb.%s.%s" % (entity._name, name))
         self.entity = entity
         self.name = name
         self.clock = clock
-        self.bus = Bus(
-            self.entity,
-            self.name,
-            self._signals,
-            optional_signals=self._optional_signals,
-            **kwargs,
-        )
+        if bus is None:
+            bus = Bus(
+                self.entity,
+                self.name,
+                self._signals,
+                optional_signals=self._optional_signals,
+                **kwargs,
+            )
+        self.bus = bus
         self._reset = reset
         self._reset_n = reset_n
-        Monitor.__init__(self, callback=callback, event=event)
+        Monitor.__init__(
+            self, callback=callback, event=event, clock_domain=clock_domain
+        )
 
     @property
     def in_reset(self):
@@ -197,3 +592,116 @@ class BusMonitor(Monitor):
 
     def __str__(self):
         return "%s(%s)" % (type(self).__qualname__, self.name)
+
+
+async def _reraise(exc):
+    raise exc
+
+
+class ClockDomain:
+    """Sample many monitors on the same clock from a single coroutine.
+
+    Instead of every monitor awaiting the rising edge of the clock in its own
+    coroutine, the clock domain wakes up once per rising edge and calls
+    :meth:`Monitor._sample_cycle` of all its monitors in the order they were added.
+    A monitor whose :meth:`~Monitor._sample_cycle` raises an exception
+    is removed from the domain and the exception is raised in a coroutine
+    of its own, the other monitors keep being sampled.
+
+    Monitors join a clock domain by passing it as their *clock_domain* argument.
+
+    Example::
+
+        domain = ClockDomain(dut.clk)
+        monitors = [
+            AvalonST(dut, "port%d" % i, dut.clk, clock_domain=domain)
+            for i in range(200)
+        ]
+
+    Args:
+        clock: The clock all monitors sample on.
+    """
+
+    def __init__(self, clock):
+        self.clock = clock
+        self._monitors = []
+        self._samplers = ()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._monitors)
+
+    def add(self, monitor: Monitor) -> None:
+        """Call :meth:`Monitor._sample_cycle` of *monitor* on every clock cycle.
+
+        Raises:
+            ValueError: If *monitor* does not implement
+                :meth:`~Monitor._sample_cycle`.
+        """
+        if monitor._sample_cycle is None:
+            raise ValueError(
+                "%s does not implement _sample_cycle() for clock domains"
+                % (type(monitor).__qualname__,)
+            )
+        self._monitors.append(monitor)
+        self._samplers = tuple((m, m._sample_cycle) for m in self._monitors)
+        if self._thread is None:
+            self._thread = cocotb.start_soon(self._sample())
+
+    def remove(self, monitor: Monitor) -> None:
+        """Stop sampling *monitor*."""
+        self._monitors.remove(monitor)
+        self._samplers = tuple((m, m._sample_cycle) for m in self._monitors)
+        if not self._monitors:
+            self.kill()
+
+    def kill(self) -> None:
+        """Stop sampling all monitors."""
+        if self._thread:
+            self._thread.kill()
+            self._thread = None
+
+    async def _sample(self):
+        clkedge = RisingEdge(self.clock)
+        while True:
+            await clkedge
+            for monitor, sample in self._samplers:
+                try:
+                    sample()
+                except Exception as e:
+                    self._failed(monitor, e)
+            if not self._monitors:
+                self._thread = None
+                return
+
+    def _failed(self, monitor, exc):
+        # Stop only the failing monitor, like its own coroutine would have
+        monitor.log.error("Stopped sampling after an exception: %r" % (exc,))
+        self._monitors.remove(monitor)
+        self._samplers = tuple((m, m._sample_cycle) for m in self._monitors)
+        monitor._clock_domain = None
+        cocotb.start_soon(_reraise(exc))
+
+
+class BusMonitorArray(_BusObjectArray):
+    """An indexed array of monitors of the same class, one per index of array signals.
+
+    The signals are resolved once into a :class:`~cocotb_bus.bus.BusArray`
+    and every monitor gets its sliced :class:`~cocotb_bus.bus.Bus`,
+    as if it had been created with ``array_idx=i``.
+
+    Args:
+        cls: The :class:`BusMonitor` sub-class to instantiate.
+        entity: A handle to the simulator entity.
+        name: Name of the buses.
+        clock: A handle to the clock associated with the buses.
+        *args: Additional positional arguments for each monitor.
+        bus_separator, case_insensitive, coalesce_writes, indices:
+            See :class:`~cocotb_bus.bus.BusArray`.
+        **kwargs: Additional keyword arguments for each monitor.
+
+    Attributes:
+        buses (BusArray): The shared bus array.
+    """
+
+    _base_class = BusMonitor
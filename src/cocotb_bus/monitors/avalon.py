@@ -25,6 +25,19 @@ class AvalonProtocolError(Exception):
     pass
 
 
+def _transfer(bus, stats):
+    """Return whether *bus* transfers in this cycle, counting it in *stats*."""
+    stats.cycles += 1
+    if str(bus.valid.value) != "1":
+        return False
+    ready = getattr(bus, "ready", None)
+    if ready is not None and str(ready.value) != "1":
+        stats.backpressure_cycles += 1
+        return False
+    stats.active_cycles += 1
+    return True
+
+
 class AvalonST(BusMonitor):
     """Avalon-ST bus.
 
@@ -51,24 +64,19 @@ class AvalonST(BusMonitor):
         # Avoid spurious object creation by recycling
         clkedge = RisingEdge(self.clock)
 
-        def valid():
-            if hasattr(self.bus, "ready"):
-                return (
-                    str(self.bus.valid.value) == "1"
-                    and str(self.bus.ready.value) == "1"
-                )
-            return str(self.bus.valid.value) == "1"
-
         # NB could await on valid here more efficiently?
         while True:
             await clkedge
-            if valid():
-                self._recv(
-                    convert_binary_to_bytes(
-                        self.bus.data.value,
-                        big_endian=self.config["firstSymbolInHighOrderBits"],
-                    )
+            self._sample_cycle()
+
+    def _sample_cycle(self):
+        if _transfer(self.bus, self.stats):
+            self._recv(
+                convert_binary_to_bytes(
+                    self.bus.data.value,
+                    big_endian=self.config["firstSymbolInHighOrderBits"],
                 )
+            )
 
 
 class AvalonSTPkts(BusMonitor):
@@ -102,6 +110,12 @@ class AvalonSTPkts(BusMonitor):
         report_channel=False,
         **kwargs,
     ):
+        # State of the packet being received
+        self._pkt = b""
+        self._in_pkt = False
+        self._invalid_cyclecount = 0
+        self._pkt_channel = None
+
         BusMonitor.__init__(self, entity, name, clock, **kwargs)
 
         self.config = self._default_config.copy()
@@ -153,104 +167,95 @@ class AvalonSTPkts(BusMonitor):
 
         # Avoid spurious object creation by recycling
         clkedge = RisingEdge(self.clock)
-        pkt = b""
-        in_pkt = False
-        invalid_cyclecount = 0
-        channel = None
-
-        def valid():
-            if hasattr(self.bus, "ready"):
-                return (
-                    str(self.bus.valid.value) == "1"
-                    and str(self.bus.ready.value) == "1"
-                )
-            return str(self.bus.valid.value) == "1"
 
         while True:
             await clkedge
+            self._sample_cycle()
 
-            if self.in_reset:
-                continue
+    def _sample_cycle(self):
+        if self.in_reset:
+            return
 
-            if valid():
-                invalid_cyclecount = 0
+        if _transfer(self.bus, self.stats):
+            self._invalid_cyclecount = 0
 
-                if str(self.bus.startofpacket.value) == "1":
-                    if pkt:
-                        raise AvalonProtocolError(
-                            "Duplicate start-of-packet received on %s"
-                            % str(self.bus.startofpacket)
-                        )
-                    pkt = b""
-                    in_pkt = True
+            if str(self.bus.startofpacket.value) == "1":
+                if self._pkt:
+                    raise AvalonProtocolError(
+                        "Duplicate start-of-packet received on %s"
+                        % str(self.bus.startofpacket)
+                    )
+                self._pkt = b""
+                self._in_pkt = True
+
+            if not self._in_pkt:
+                raise AvalonProtocolError("Data transfer outside of packet")
 
-                if not in_pkt:
-                    raise AvalonProtocolError("Data transfer outside of packet")
+            # Handle empty and X's in empty / data
+            if str(self.bus.endofpacket.value) != "1":
+                self._pkt += convert_binary_to_bytes(
+                    self.bus.data.value,
+                    big_endian=self.config["firstSymbolInHighOrderBits"],
+                )
+            else:
+                value = str(self.bus.data.value)
+                if self.config["useEmpty"] and int(self.bus.empty.value):
+                    empty = int(self.bus.empty.value) * self.config["dataBitsPerSymbol"]
+                    if self.config["firstSymbolInHighOrderBits"]:
+                        value = value[:-empty]
+                    else:
+                        value = value[empty:]
 
-                # Handle empty and X's in empty / data
-                if str(self.bus.endofpacket.value) != "1":
-                    pkt += convert_binary_to_bytes(
-                        self.bus.data.value,
-                        big_endian=self.config["firstSymbolInHighOrderBits"],
+                vec = create_binary(
+                    value,
+                    len(value),
+                    big_endian=self.config["firstSymbolInHighOrderBits"],
+                )
+                if not vec.is_resolvable:
+                    raise AvalonProtocolError(
+                        "After empty masking value is still bad?  "
+                        "Had empty {:d}, got value {:s}".format(empty, value)
                     )
-                else:
-                    value = str(self.bus.data.value)
-                    if self.config["useEmpty"] and int(self.bus.empty.value):
-                        empty = (
-                            int(self.bus.empty.value) * self.config["dataBitsPerSymbol"]
+
+                self._pkt += convert_binary_to_bytes(
+                    vec, big_endian=self.config["firstSymbolInHighOrderBits"]
+                )
+
+            if hasattr(self.bus, "channel"):
+                if self._pkt_channel is None:
+                    channel = int(self.bus.channel.value)
+                    if channel > self.config["maxChannel"]:
+                        raise AvalonProtocolError(
+                            "Channel value (%d) is greater than maxChannel (%d)"
+                            % (channel, self.config["maxChannel"])
                         )
-                        if self.config["firstSymbolInHighOrderBits"]:
-                            value = value[:-empty]
-                        else:
-                            value = value[empty:]
-
-                    vec = create_binary(
-                        value,
-                        len(value),
-                        big_endian=self.config["firstSymbolInHighOrderBits"],
-                    )
-                    if not vec.is_resolvable:
+                    self._pkt_channel = channel
+                elif int(self.bus.channel.value) != self._pkt_channel:
+                    raise AvalonProtocolError("Channel value changed during packet")
+
+            if str(self.bus.endofpacket.value) == "1":
+                pkt = self._pkt
+                channel = self._pkt_channel
+                self.log.info("Received a packet of %d bytes", len(pkt))
+                self.log.debug(f"Received Packet:\n{hexdump(pkt, dump=True)}")
+                self.channel = channel
+                self._pkt = b""
+                self._in_pkt = False
+                self._pkt_channel = None
+                if self.report_channel:
+                    self._recv({"data": pkt, "channel": channel})
+                else:
+                    self._recv(pkt)
+        else:
+            if self._in_pkt:
+                self._invalid_cyclecount += 1
+                if self.config["invalidTimeout"]:
+                    if self._invalid_cyclecount >= self.config["invalidTimeout"]:
                         raise AvalonProtocolError(
-                            "After empty masking value is still bad?  "
-                            "Had empty {:d}, got value {:s}".format(empty, value)
+                            "In-Packet Timeout. Didn't receive any valid data for %d cycles!"
+                            % self._invalid_cyclecount
                         )
 
-                    pkt += convert_binary_to_bytes(
-                        vec, big_endian=self.config["firstSymbolInHighOrderBits"]
-                    )
-
-                if hasattr(self.bus, "channel"):
-                    if channel is None:
-                        channel = int(self.bus.channel.value)
-                        if channel > self.config["maxChannel"]:
-                            raise AvalonProtocolError(
-                                "Channel value (%d) is greater than maxChannel (%d)"
-                                % (channel, self.config["maxChannel"])
-                            )
-                    elif int(self.bus.channel.value) != channel:
-                        raise AvalonProtocolError("Channel value changed during packet")
-
-                if str(self.bus.endofpacket.value) == "1":
-                    self.log.info("Received a packet of %d bytes", len(pkt))
-                    self.log.debug(f"Received Packet:\n{hexdump(pkt, dump=True)}")
-                    self.channel = channel
-                    if self.report_channel:
-                        self._recv({"data": pkt, "channel": channel})
-                    else:
-                        self._recv(pkt)
-                    pkt = b""
-                    in_pkt = False
-                    channel = None
-            else:
-                if in_pkt:
-                    invalid_cyclecount += 1
-                    if self.config["invalidTimeout"]:
-                        if invalid_cyclecount >= self.config["invalidTimeout"]:
-                            raise AvalonProtocolError(
-                                "In-Packet Timeout. Didn't receive any valid data for %d cycles!"
-                                % invalid_cyclecount
-                            )
-
 
 class AvalonSTPktsWithChannel(AvalonSTPkts):
     """Packetized AvalonST bus using channel.
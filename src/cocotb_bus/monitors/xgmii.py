@@ -40,13 +40,23 @@ class XGMII(Monitor):
         which matches the behavior of :class:`cocotb.drivers.xgmii.XGMII`.
     """
 
-    def __init__(self, signal, clock, interleaved=True, callback=None, event=None):
+    def __init__(
+        self,
+        signal,
+        clock,
+        interleaved=True,
+        callback=None,
+        event=None,
+        clock_domain=None,
+    ):
         """Args:
             signal (SimHandle): The XGMII data bus.
             clock (SimHandle): The associated clock (assumed to be
                 driven by another coroutine).
             interleaved (bool, optional): Whether control bits are interleaved
                 with the data bytes or not.
+            clock_domain (ClockDomain, optional): Sample the signal from this
+                shared :class:`~cocotb_bus.monitors.ClockDomain`.
 
         If interleaved the bus is
             byte0, byte0_control, byte1, byte1_control, ...
@@ -59,7 +69,11 @@ class XGMII(Monitor):
         self.signal = signal
         self.bytes = len(self.signal) // 9
         self.interleaved = interleaved
-        Monitor.__init__(self, callback=callback, event=event)
+        self._pkt = bytearray()
+        self._in_frame = False
+        Monitor.__init__(
+            self, callback=callback, event=event, clock_domain=clock_domain
+        )
 
     def _get_bytes(self):
         """Take a value and extract the individual bytes and control bits.
@@ -100,60 +114,65 @@ class XGMII(Monitor):
 
     async def _monitor_recv(self):
         clk = RisingEdge(self.clock)
-        self._pkt = bytearray()
 
         while True:
             await clk
-            ctrl, bytes = self._get_bytes()
-
-            if ctrl[0] and bytes[0] == _XGMII_START:
-                ctrl, bytes = ctrl[1:], bytes[1:]
-
-                while self._add_payload(ctrl, bytes):
-                    await clk
-                    ctrl, bytes = self._get_bytes()
-
-            elif self.bytes == 8:
-                if ctrl[4] and bytes[4] == _XGMII_START:
-                    ctrl, bytes = ctrl[5:], bytes[5:]
-
-                    while self._add_payload(ctrl, bytes):
-                        await clk
-                        ctrl, bytes = self._get_bytes()
-
-            if self._pkt:
-                self.log.debug("Received:\n%s" % (hexdump(self._pkt, dump=True)))
-
-                if len(self._pkt) < 64 + 7:
-                    self.log.error("Received a runt frame!")
-                if len(self._pkt) < 12:
-                    self.log.error("No data to extract")
-                    self._pkt = bytearray()
-                    continue
-
-                preamble_sfd = self._pkt[0:7]
-                crc32 = self._pkt[-4:]
-                payload = self._pkt[7:-4]
-
-                if preamble_sfd != _PREAMBLE_SFD:
-                    self.log.error("Got a frame with unknown preamble/SFD")
-                    self.log.error(hexdump(preamble_sfd, dump=True))
-                    self._pkt = bytearray()
-                    continue
-
-                expected_crc = struct.pack("<I", (zlib.crc32(payload) & 0xFFFFFFFF))
-
-                if crc32 != expected_crc:
-                    self.log.error("Incorrect CRC on received packet")
-                    self.log.info("Expected: %s" % (hexdump(expected_crc, dump=True)))
-                    self.log.info("Received: %s" % (hexdump(crc32, dump=True)))
-
-                # Use scapy to decode the packet
-                if _have_scapy:
-                    p = Ether(payload)
-                    self.log.debug("Received decoded packet:\n%s" % p.show2())
-                else:
-                    p = payload
-
-                self._recv(p)
-                self._pkt = bytearray()
+            self._sample_cycle()
+
+    def _sample_cycle(self):
+        ctrl, bytes = self._get_bytes()
+
+        if self._in_frame:
+            if self._add_payload(ctrl, bytes):
+                return
+            self._in_frame = False
+
+        elif ctrl[0] and bytes[0] == _XGMII_START:
+            if self._add_payload(ctrl[1:], bytes[1:]):
+                self._in_frame = True
+                return
+
+        elif self.bytes == 8 and ctrl[4] and bytes[4] == _XGMII_START:
+            if self._add_payload(ctrl[5:], bytes[5:]):
+                self._in_frame = True
+                return
+
+        if self._pkt:
+            self._end_frame()
+
+    def _end_frame(self):
+        self.log.debug("Received:\n%s" % (hexdump(self._pkt, dump=True)))
+
+        if len(self._pkt) < 64 + 7:
+            self.log.error("Received a runt frame!")
+        if len(self._pkt) < 12:
+            self.log.error("No data to extract")
+            self._pkt = bytearray()
+            return
+
+        preamble_sfd = self._pkt[0:7]
+        crc32 = self._pkt[-4:]
+        payload = self._pkt[7:-4]
+
+        if preamble_sfd != _PREAMBLE_SFD:
+            self.log.error("Got a frame with unknown preamble/SFD")
+            self.log.error(hexdump(preamble_sfd, dump=True))
+            self._pkt = bytearray()
+            return
+
+        expected_crc = struct.pack("<I", (zlib.crc32(payload) & 0xFFFFFFFF))
+
+        if crc32 != expected_crc:
+            self.log.error("Incorrect CRC on received packet")
+            self.log.info("Expected: %s" % (hexdump(expected_crc, dump=True)))
+            self.log.info("Received: %s" % (hexdump(crc32, dump=True)))
+
+        # Use scapy to decode the packet
+        if _have_scapy:
+            p = Ether(payload)
+            self.log.debug("Received decoded packet:\n%s" % p.show2())
+        else:
+            p = payload
+
+        self._recv(p)
+        self._pkt = bytearray()
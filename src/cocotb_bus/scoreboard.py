@@ -6,14 +6,524 @@
 
 """Common scoreboarding capability."""
 
+import hashlib
+import itertools
 import logging
+import struct
+from collections import OrderedDict, deque
+from typing import Any, Callable, Hashable, Iterable, Optional
 
-from scapy.utils import hexdiff, hexdump
+import cocotb
+from cocotb.triggers import Event
 
 from cocotb_bus._compat import test_success
 from cocotb_bus.monitors import Monitor
 
 
+# Returned when there is no expected transaction
+_NOTHING = object()
+
+
+async def _prefetch(queue, source, lookahead):
+    """Fill *queue* from the asynchronous iterator *source*."""
+    space = queue._space
+    while True:
+        while len(queue) >= lookahead:
+            space.clear()
+            await space.wait()
+        try:
+            transaction = await source.__anext__()
+        except StopAsyncIteration:
+            queue._space = None
+            return
+        queue.append(transaction)
+
+
+def _default_key(transaction):
+    try:
+        hash(transaction)
+    except TypeError:
+        return repr(transaction)
+    return transaction
+
+
+def _digest(transaction):
+    if isinstance(transaction, str):
+        data = transaction.encode()
+    elif isinstance(transaction, (bytes, bytearray, memoryview)):
+        data = transaction
+    else:
+        data = repr(transaction).encode()
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class ExpectedDigest:
+    """Stands in for an expected transaction in an :class:`ExpectedQueue`
+    storing digests."""
+
+    __slots__ = ("index", "digest", "transaction_type")
+
+    def __init__(self, index: int, digest: bytes, transaction_type: type):
+        #: Index of the transaction in the order it was appended, starting at 0.
+        self.index = index
+        #: BLAKE2b digest of the transaction.
+        self.digest = digest
+        #: Type of the transaction.
+        self.transaction_type = transaction_type
+
+    def __repr__(self):
+        return "%s(index=%d, digest=%s, transaction_type=%s)" % (
+            type(self).__qualname__,
+            self.index,
+            self.digest.hex(),
+            self.transaction_type.__qualname__,
+        )
+
+
+# Digest and type code of a transaction in the backlog of an ExpectedQueue
+_PACKED_DIGEST = struct.Struct("16sH")
+
+
+class ExpectedQueue:
+    """Queue of expected transactions, indexed for out-of-order matching.
+
+    Use it instead of a :class:`list` as the expected output of
+    :meth:`Scoreboard.add_interface`.
+    Transactions are appended like to a :class:`list`,
+    and the scoreboard removes them as they are received.
+
+    A :class:`list` is scanned for a matching transaction within
+    the reorder window on every received transaction.
+    This queue keeps the transactions of the reorder window in a hash index
+    instead, so matching costs about the same for any *reorder_depth*.
+    Only the reorder window is indexed, the transactions after it are kept
+    in a :class:`~collections.deque`, so a deep queue costs about as much
+    memory as a :class:`list`.
+    Indexing the queue is O(1) at both ends and slower towards the middle.
+
+    With *digest*, only a 16 byte BLAKE2b digest and the type of each
+    transaction is kept, represented by an :class:`ExpectedDigest`.
+    Received transactions are compared by their digest and type.
+    On a mismatch, the full expected transaction is fetched for reporting.
+
+    Args:
+        iterable: Initial expected transactions.
+        key: Function returning a hashable key of a transaction;
+            a received transaction matches the expected transactions with an equal key.
+            Defaults to the transaction itself,
+            or its :func:`repr` if it is not hashable,
+            and to the digest with *digest*.
+            Keys are computed when transactions enter the reorder window,
+            except with *digest*, where a custom key is kept for every
+            transaction.
+        digest: Store digests instead of the transactions.
+            The digest is taken of :class:`bytes`-like and :class:`str`
+            transactions, and of the :func:`repr` of anything else.
+        fetch: Function returning the expected transaction
+            with the :attr:`ExpectedDigest.index` it is called with,
+            e.g. by regenerating it, to report mismatches with *digest*.
+    """
+
+    def __init__(
+        self,
+        iterable: Iterable[Any] = (),
+        key: Optional[Callable[[Any], Hashable]] = None,
+        digest: bool = False,
+        fetch: Optional[Callable[[int], Any]] = None,
+    ):
+        self._digest = digest
+        self._fetch = fetch
+        if key is None:
+            key = _digest if digest else _default_key
+        self._key = key
+        self._depth = 0
+        # Keyed by stream, see Scoreboard.add_interface
+        self._streams = False
+        # Iterator the queue is filled from, up to lookahead transactions
+        self._source = None
+        self._lookahead = 0
+        # Set when a transaction was removed, while an asynchronous
+        # iterator is filling the queue
+        self._space = None
+        # seq of the next appended transaction
+        self._next_seq = 0
+        # seq -> (transaction, key) of the oldest depth + 1 transactions, in order
+        self._window = OrderedDict()
+        # key -> seq, or a deque of seqs if the key repeats,
+        # of the transactions in the window or of all transactions by stream
+        self._index = {}
+        # The transactions after the window, in order, starting with seq _next_in.
+        # With digest, their digests and type codes are packed into _packed
+        # from offset _head on, and _backlog only holds their custom keys.
+        self._next_in = 0
+        self._backlog = deque()
+        self._packed = bytearray()
+        self._head = 0
+        # type -> type code of the digested transactions, and the reverse
+        self._type_codes = {}
+        self._types = []
+        # seq -> transaction of all transactions, in order, by stream
+        self._items = {}
+        self.extend(iterable)
+
+    def __len__(self):
+        if self._streams:
+            return len(self._items)
+        return len(self._window) + self._next_seq - self._next_in
+
+    def __iter__(self):
+        if self._streams:
+            return iter(list(self._items.values()))
+        transactions = [transaction for transaction, _ in self._window.values()]
+        if self._digest:
+            packed = memoryview(self._packed)[self._head :]
+            transactions.extend(
+                ExpectedDigest(seq, digest, self._types[code])
+                for seq, (digest, code) in zip(
+                    itertools.count(self._next_in), _PACKED_DIGEST.iter_unpack(packed)
+                )
+            )
+            packed.release()
+        else:
+            transactions.extend(self._backlog)
+        return iter(transactions)
+
+    def __getitem__(self, index):
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("ExpectedQueue index out of range")
+        if self._streams:
+            return next(itertools.islice(self._items.values(), index, None))
+        if index < len(self._window):
+            return next(itertools.islice(self._window.values(), index, None))[0]
+        index -= len(self._window)
+        if self._digest:
+            digest, code = _PACKED_DIGEST.unpack_from(
+                self._packed, self._head + index * _PACKED_DIGEST.size
+            )
+            return ExpectedDigest(self._next_in + index, digest, self._types[code])
+        return self._backlog[index]
+
+    def __repr__(self):
+        return "%s(%r)" % (type(self).__qualname__, list(self))
+
+    def append(self, transaction: Any) -> None:
+        """Add *transaction* to the end of the queue."""
+        seq = self._next_seq
+        self._next_seq = seq + 1
+        if self._streams:
+            key = self._key(transaction)
+            if self._digest:
+                transaction = ExpectedDigest(
+                    seq, _digest(transaction), type(transaction)
+                )
+            self._items[seq] = transaction
+            self._index_add(key, seq)
+        elif self._next_in == seq and len(self._window) <= self._depth:
+            # Nothing in the backlog and room in the window
+            self._next_in = seq + 1
+            if self._digest:
+                expected = ExpectedDigest(seq, _digest(transaction), type(transaction))
+                if self._key is _digest:
+                    key = expected.digest
+                else:
+                    key = self._key(transaction)
+            else:
+                expected = transaction
+                key = self._key(transaction)
+            self._window[seq] = expected, key
+            self._index_add(key, seq)
+        elif self._digest:
+            cls = type(transaction)
+            code = self._type_codes.get(cls)
+            if code is None:
+                code = self._type_codes[cls] = len(self._types)
+                self._types.append(cls)
+            self._packed += _PACKED_DIGEST.pack(_digest(transaction), code)
+            if self._key is not _digest:
+                self._backlog.append(self._key(transaction))
+        else:
+            self._backlog.append(transaction)
+
+    def extend(self, transactions: Iterable[Any]) -> None:
+        """Add *transactions* to the end of the queue."""
+        for transaction in transactions:
+            self.append(transaction)
+
+    def clear(self) -> None:
+        """Remove all transactions."""
+        self._window.clear()
+        self._index.clear()
+        self._next_in = self._next_seq
+        self._backlog.clear()
+        self._packed = bytearray()
+        self._head = 0
+        self._items.clear()
+
+    def _index_add(self, key, seq):
+        seqs = self._index.get(key)
+        if seqs is None:
+            self._index[key] = seq
+        elif type(seqs) is int:
+            self._index[key] = deque((seqs, seq))
+        else:
+            seqs.append(seq)
+
+    def _index_first(self, key):
+        seqs = self._index.get(key)
+        if seqs is None or type(seqs) is int:
+            return seqs
+        return seqs[0]
+
+    def _index_remove(self, key, seq):
+        seqs = self._index[key]
+        if type(seqs) is int:
+            del self._index[key]
+            return
+        if seqs[0] == seq:
+            seqs.popleft()
+        else:
+            seqs.remove(seq)
+        if len(seqs) == 1:
+            self._index[key] = seqs[0]
+
+    def _slide(self):
+        """Move transactions from the backlog into the window."""
+        window = self._window
+        while len(window) <= self._depth and self._next_in < self._next_seq:
+            seq = self._next_in
+            self._next_in = seq + 1
+            if self._digest:
+                digest, code = _PACKED_DIGEST.unpack_from(self._packed, self._head)
+                self._head += _PACKED_DIGEST.size
+                expected = ExpectedDigest(seq, digest, self._types[code])
+                key = digest if self._key is _digest else self._backlog.popleft()
+            else:
+                expected = self._backlog.popleft()
+                key = self._key(expected)
+            window[seq] = expected, key
+            self._index_add(key, seq)
+        if self._head >= 4096 and self._head * 2 >= len(self._packed):
+            del self._packed[: self._head]
+            self._head = 0
+
+    def _fill(self):
+        missing = self._lookahead - len(self)
+        if missing > 0:
+            count = len(self)
+            self.extend(itertools.islice(self._source, missing))
+            if len(self) - count < missing:
+                self._source = None
+
+    def _fill_stream(self, stream):
+        for transaction in self._source:
+            self.append(transaction)
+            if self._index_first(stream) is not None:
+                return
+        self._source = None
+
+    def _removed(self):
+        if self._space is not None:
+            self._space.set()
+
+    def _set_reorder_depth(self, depth):
+        self._depth = depth
+        window = self._window
+        # Move the newest transactions of a larger window back to the backlog
+        while len(window) > depth + 1:
+            seq, (expected, key) = window.popitem()
+            if seq != self._next_in - 1:
+                raise RuntimeError(
+                    "Can't reduce the reorder depth after transactions were matched"
+                )
+            self._index_remove(key, seq)
+            self._next_in = seq
+            if self._digest:
+                code = self._type_codes[expected.transaction_type]
+                self._packed[self._head : self._head] = _PACKED_DIGEST.pack(
+                    expected.digest, code
+                )
+                if self._key is not _digest:
+                    self._backlog.appendleft(key)
+            else:
+                self._backlog.appendleft(expected)
+        self._slide()
+
+    def _set_stream_key(self, stream_key):
+        if self._digest and len(self):
+            raise ValueError(
+                "Can't key transactions by stream after they were stored as digests"
+            )
+        transactions = list(self)
+        self.clear()
+        self._key = stream_key
+        self._streams = True
+        self.extend(transactions)
+
+    def _resolve(self, expected, transaction, strict_type=True):
+        """Return *transaction* if it matches the digest and type of *expected*,
+        otherwise the fetched expected transaction if possible."""
+        if expected.digest == _digest(transaction):
+            if type(transaction) is expected.transaction_type:
+                return transaction
+            if (
+                not strict_type
+                and isinstance(transaction, _BYTES_TYPES)
+                and issubclass(expected.transaction_type, _BYTES_TYPES)
+            ):
+                return transaction
+        if self._fetch is not None:
+            return self._fetch(expected.index)
+        return expected
+
+    def _pop_stream(self, stream):
+        """Remove and return the oldest expected transaction of *stream*,
+        reading the iterator the queue is filled from until there is one."""
+        seq = self._index_first(stream)
+        while seq is None:
+            if self._source is None:
+                return _NOTHING
+            self._fill_stream(stream)
+            seq = self._index_first(stream)
+        self._index_remove(stream, seq)
+        return self._items.pop(seq)
+
+    def _remove(self, seq, key):
+        expected, _ = self._window.pop(seq)
+        self._index_remove(key, seq)
+        self._slide()
+        return expected
+
+    def _pop_match(self, transaction):
+        """Remove and return the expected transaction matching *transaction*
+        within the reorder window, or the oldest one if none matches."""
+        key = self._key(transaction)
+        # Only the window is indexed
+        seq = self._index_first(key)
+        if seq is not None:
+            return self._remove(seq, key)
+        if self._key is _default_key:
+            # Equal transactions of different types can have different keys
+            for seq, (expected, key) in self._window.items():
+                if expected == transaction:
+                    return self._remove(seq, key)
+        seq, (_, key) = next(iter(self._window.items()))
+        return self._remove(seq, key)
+
+
+_BYTES_TYPES = (bytes, bytearray, memoryview)
+# Types whose equality is the same as the equality of their str()
+_STR_EQUAL_TYPES = (bytes, bytearray, int, str)
+
+
+def _first_difference(a, b):
+    """Return the first index at which the sequences *a* and *b* differ,
+    ``None`` if they are equal."""
+    n = min(len(a), len(b))
+    i = 0
+    # Skip equal chunks with C-level slice compares
+    while i < n and a[i : i + 4096] == b[i : i + 4096]:
+        i += 4096
+    end = min(i + 4096, n)
+    while i < end and a[i] == b[i]:
+        i += 1
+    if i >= n:
+        return None if len(a) == len(b) else n
+    return i
+
+
+def _hexdump(data, start, end):
+    lines = []
+    for offset in range(start, end, 16):
+        chunk = bytes(data[offset : min(offset + 16, end)])
+        lines.append(
+            "%08x  %-47s  %s"
+            % (
+                offset,
+                " ".join("%02x" % b for b in chunk),
+                "".join(chr(b) if 32 <= b < 127 else "." for b in chunk),
+            )
+        )
+    return "\n".join(lines)
+
+
+class _Rendered:
+    """Render a transaction when logged, up to *limit* bytes or characters
+    starting shortly before *offset*."""
+
+    __slots__ = ("transaction", "limit", "offset")
+
+    def __init__(self, transaction, limit, offset=0):
+        self.transaction = transaction
+        self.limit = limit
+        self.offset = offset
+
+    def __str__(self):
+        transaction = self.transaction
+        start = max(0, self.offset - 32)
+        if isinstance(transaction, _BYTES_TYPES):
+            start -= start % 16
+            end = min(len(transaction), start + self.limit)
+            text = _hexdump(transaction, start, end)
+            length = len(transaction)
+        else:
+            text = repr(transaction)
+            length = len(text)
+            end = min(length, start + self.limit)
+            text = text[start:end]
+        if start:
+            text = "... %d skipped\n%s" % (start, text)
+        if end < length:
+            text = "%s\n... %d more" % (text, length - end)
+        return text
+
+
+class _Difference:
+    """Describe where two transactions differ, when logged."""
+
+    __slots__ = ("got", "exp", "limit")
+
+    def __init__(self, got, exp, limit):
+        self.got = got
+        self.exp = exp
+        self.limit = limit
+
+    def offset(self):
+        """Return the first differing offset of sequences, ``None`` otherwise."""
+        got, exp = self.got, self.exp
+        if isinstance(got, _BYTES_TYPES) and isinstance(exp, _BYTES_TYPES):
+            return _first_difference(
+                memoryview(got).cast("B"), memoryview(exp).cast("B")
+            )
+        if type(got) is type(exp) and isinstance(got, (str, tuple, list)):
+            return _first_difference(got, exp)
+        return None
+
+    def __str__(self):
+        got, exp = self.got, self.exp
+        if type(got) is int and type(exp) is int:
+            diff = got ^ exp
+            return "First differing bit is %d (mask %#x)" % (
+                (diff & -diff).bit_length() - 1,
+                diff,
+            )
+        offset = self.offset()
+        if offset is None:
+            return "Expected:\n%s\nReceived:\n%s" % (
+                _Rendered(exp, self.limit),
+                _Rendered(got, self.limit),
+            )
+        # Offsets into tuples and lists don't map onto their repr
+        start = offset if isinstance(got, (str,) + _BYTES_TYPES) else 0
+        return "First difference at offset %d\nExpected:\n%s\nReceived:\n%s" % (
+            offset,
+            _Rendered(exp, self.limit, start),
+            _Rendered(got, self.limit, start),
+        )
+
+
 class Scoreboard:
     """Generic scoreboarding class.
 
@@ -21,6 +531,8 @@ class Scoreboard:
 
     The expected output can either be a function which provides a transaction
     or a simple list containing the expected output.
+    An :class:`ExpectedQueue` can be used instead of a list
+    to match out-of-order transactions without scanning.
 
     TODO:
         Statistics for end-of-test summary etc.
@@ -34,23 +546,36 @@ class Scoreboard:
         fail_immediately (bool, optional): Raise :exc:`AssertionError`
             immediately when something is wrong instead of just
             recording an error. Default is ``True``.
+        report_size (int, optional): Maximum number of bytes or characters
+            of a transaction to log. Default is 256.
+        max_reports (int, optional): Maximum number of mismatches to log
+            in detail, further mismatches are only counted. Default is 16.
     """
 
     def __init__(
-        self, dut, reorder_depth=0, fail_immediately=True
+        self,
+        dut,
+        reorder_depth=0,
+        fail_immediately=True,
+        report_size=256,
+        max_reports=16,
     ):  # FIXME: reorder_depth needed here?
         self.dut = dut
         self.log = logging.getLogger("cocotb.scoreboard.%s" % self.dut._name)
         self.errors = 0
         self.expected = {}
         self._imm = fail_immediately
+        self._report_size = report_size
+        self._max_reports = max_reports
+        self._reports = 0
 
     @property
     def result(self):
         """Determine the test result, do we have any pending data remaining?
 
         Raises:
-            :exc:`AssertionError`: If not all expected output was received or
+            :exc:`AssertionError`: If not all expected output was received,
+                including an asynchronous iterator that isn't exhausted, or
                 error were recorded during the test.
         """
         fail = False
@@ -62,6 +587,15 @@ class Scoreboard:
                     "than a list" % str(monitor)
                 )
                 continue
+            if isinstance(expected_output, ExpectedQueue):
+                if expected_output._source is not None:
+                    expected_output._fill()
+                if expected_output._space is not None:
+                    self.log.warning(
+                        "Asynchronous iterator of expected output for %s "
+                        "isn't exhausted" % str(monitor)
+                    )
+                    fail = True
             if len(expected_output):
                 self.log.warning(
                     "Still expecting %d transactions on %s"
@@ -69,8 +603,9 @@ class Scoreboard:
                 )
                 for index, transaction in enumerate(expected_output):
                     self.log.info(
-                        "Expecting %d:\n%s"
-                        % (index, hexdump(str(transaction), dump=True))
+                        "Expecting %d:\n%s",
+                        index,
+                        _Rendered(transaction, self._report_size),
                     )
                     if index > 5:
                         self.log.info(
@@ -113,51 +648,49 @@ class Scoreboard:
                     "Set strict_type=False to avoid this."
                 )
             return
+
+        # Fast paths comparing the values directly
+        if type(got) is type(exp) and (
+            strict_type or isinstance(got, _STR_EQUAL_TYPES)
+        ):
+            equal = got == exp
+        elif isinstance(got, _BYTES_TYPES) and isinstance(exp, _BYTES_TYPES):
+            equal = got == exp
         # Or convert to a string before comparison
-        elif not strict_type:
+        else:
             got, exp = str(got), str(exp)
+            equal = got == exp
 
-        # Compare directly
-        if got != exp:
-            self.errors += 1
-
-            # Try our best to print out something useful
-            strgot, strexp = str(got), str(exp)
-
-            log.error("Received transaction differed from expected output")
-            if not strict_type:
-                log.info("Expected:\n" + hexdump(strexp, dump=True))
-            else:
-                log.info("Expected:\n" + repr(exp))
-            if not isinstance(exp, str):
-                try:
-                    for word in exp:
-                        log.info(str(word))
-                except Exception:
-                    pass
-            if not strict_type:
-                log.info("Received:\n" + hexdump(strgot, dump=True))
-            else:
-                log.info("Received:\n" + repr(got))
-            if not isinstance(got, str):
+        if equal:
+            if log.isEnabledFor(logging.DEBUG):
+                # Don't want to fail the test
+                # if we're passed something without __len__
                 try:
-                    for word in got:
-                        log.info(str(word))
+                    log.debug("Received expected transaction %d bytes" % (len(got)))
                 except Exception:
                     pass
-            log.warning("Difference:")
-            # NOTE: scapy.utils.hexdiff doesn't return a string but prints!
-            hexdiff(strexp, strgot)
-            if self._imm:
-                assert False, "Received transaction differed from expected transaction"
-        else:
-            # Don't want to fail the test
-            # if we're passed something without __len__
-            try:
-                log.debug("Received expected transaction %d bytes" % (len(got)))
-                log.debug(repr(got))
-            except Exception:
-                pass
+                log.debug("%s", _Rendered(got, self._report_size))
+            return
+
+        self.errors += 1
+        log.error("Received transaction differed from expected output")
+        self._report(log, got, exp)
+        if self._imm:
+            assert False, "Received transaction differed from expected transaction"
+
+    def _report(self, log, got, exp):
+        """Log the difference between *got* and *exp*,
+        up to :attr:`max_reports` times."""
+        self._reports += 1
+        if self._reports > self._max_reports:
+            if self._reports == self._max_reports + 1:
+                log.warning(
+                    "Not reporting the details of further mismatches, "
+                    "max_reports is %d" % (self._max_reports,)
+                )
+            return
+        # Rendered only if the log records are emitted
+        log.warning("Difference: %s", _Difference(got, exp, self._report_size))
 
     def add_interface(
         self,
@@ -166,6 +699,8 @@ class Scoreboard:
         compare_fn=None,
         reorder_depth=0,
         strict_type=True,
+        stream_key=None,
+        lookahead=None,
     ):
         """Add an interface to be scoreboarded.
 
@@ -176,7 +711,16 @@ class Scoreboard:
 
         Args:
             monitor: The monitor object.
-            expected_output: Queue of expected outputs.
+            expected_output: Queue of expected outputs,
+                a :class:`list`, an :class:`ExpectedQueue`,
+                a function returning the expected output
+                for a received transaction,
+                or an iterator or asynchronous iterator
+                (e.g. a generator) of the expected outputs.
+                Iterators are consumed on demand into an :class:`ExpectedQueue`
+                of up to *lookahead* transactions,
+                an asynchronous iterator must have produced a transaction
+                by the time it is received.
             compare_fn (callable, optional): Function doing the actual comparison.
             reorder_depth (int, optional): Consider up to *reorder_depth* elements
                 of the expected result list as passing matches.
@@ -184,14 +728,50 @@ class Scoreboard:
                 is considered for a passing match.
             strict_type (bool, optional): Require transaction type to match
                 exactly if ``True``, otherwise compare its string representation.
+            stream_key (callable, optional): Function returning the stream,
+                e.g. the ID or channel, of a transaction.
+                Transactions of different streams may be reordered,
+                but must be in order within each stream:
+                a received transaction is compared with the oldest expected
+                transaction of its stream, and *reorder_depth* is ignored.
+                With an :class:`ExpectedQueue`, it replaces the key of the queue
+                and each stream is an O(1) queue of its own.
+            lookahead (int, optional): Number of transactions to buffer
+                from an iterator *expected_output*.
+                Defaults to the reorder window, ``reorder_depth + 1``.
+                With *stream_key*, an iterator is read further
+                when a transaction is received on a stream with nothing buffered,
+                an asynchronous iterator requires a *lookahead* covering
+                the reordering across streams.
 
         Raises:
             :exc:`TypeError`: If no monitor is on the interface or
                 *compare_fn* is not a callable function.
+            :exc:`ValueError`: If *stream_key* is given for an asynchronous
+                iterator without *lookahead*.
         """
+        source = None
+        if hasattr(expected_output, "__next__") or hasattr(
+            expected_output, "__anext__"
+        ):
+            source = expected_output
+            expected_output = ExpectedQueue()
+            if lookahead is None:
+                if stream_key is not None and hasattr(source, "__anext__"):
+                    raise ValueError(
+                        "lookahead is required with stream_key "
+                        "and an asynchronous iterator"
+                    )
+                lookahead = reorder_depth + 1
+
         # save a handle to the expected output so we can check if all expected
         # data has been received at the end of a test.
         self.expected[monitor] = expected_output
+        indexed = isinstance(expected_output, ExpectedQueue)
+        if indexed and stream_key is not None:
+            expected_output._set_stream_key(stream_key)
+        elif indexed:
+            expected_output._set_reorder_depth(reorder_depth)
 
         # Enforce some type checking as we only work with a real monitor
         if not isinstance(monitor, Monitor):
@@ -209,22 +789,66 @@ class Scoreboard:
                 % str(type(compare_fn))
             )
 
-        self.log.info("Created with reorder_depth %d" % reorder_depth)
+        if source is not None:
+            expected_output._lookahead = max(1, lookahead, reorder_depth + 1)
+            if hasattr(source, "__anext__"):
+                expected_output._space = Event()
+                cocotb.start_soon(
+                    _prefetch(expected_output, source, expected_output._lookahead)
+                )
+            else:
+                expected_output._source = source
+                expected_output._fill()
+
+        if stream_key is None:
+            self.log.info("Created with reorder_depth %d" % reorder_depth)
+        else:
+            self.log.info("Created with stream_key %s" % (stream_key,))
+
+        if monitor.name:
+            log_name = self.log.name + "." + monitor.name
+        else:
+            log_name = self.log.name + "." + type(monitor).__qualname__
+        log = logging.getLogger(log_name)
 
         def check_received_transaction(transaction):
             """Called back by the monitor when a new transaction has been
             received."""
 
-            if monitor.name:
-                log_name = self.log.name + "." + monitor.name
-            else:
-                log_name = self.log.name + "." + type(monitor).__qualname__
-
-            log = logging.getLogger(log_name)
+            if indexed and expected_output._source is not None:
+                expected_output._fill()
 
             if callable(expected_output):
                 exp = expected_output(transaction)
 
+            elif stream_key is not None:
+                stream = stream_key(transaction)
+                if indexed:
+                    exp = expected_output._pop_stream(stream)
+                else:
+                    for i, exp in enumerate(expected_output):
+                        if stream_key(exp) == stream:
+                            del expected_output[i]
+                            break
+                    else:
+                        exp = _NOTHING
+                if exp is _NOTHING:
+                    self.errors += 1
+                    log.error(
+                        "Received a transaction on stream %r "
+                        "but wasn't expecting anything on it" % (stream,)
+                    )
+                    log.info("Got: %s", _Rendered(transaction, self._report_size))
+                    if self._imm:
+                        assert False, (
+                            "Received a transaction on stream %r "
+                            "but wasn't expecting anything on it" % (stream,)
+                        )
+                    return
+
+            elif indexed and len(expected_output):
+                exp = expected_output._pop_match(transaction)
+
             elif len(expected_output):  # we expect something
                 for i in range(min((reorder_depth + 1), len(expected_output))):
                     if expected_output[i] == transaction:
@@ -235,11 +859,35 @@ class Scoreboard:
             else:
                 self.errors += 1
                 log.error("Received a transaction but wasn't expecting anything")
-                log.info("Got: %s" % (hexdump(str(transaction), dump=True)))
+                log.info("Got: %s", _Rendered(transaction, self._report_size))
                 if self._imm:
                     assert False, "Received a transaction but wasn't expecting anything"
                 return
 
+            if indexed:
+                expected_output._removed()
+                if isinstance(exp, ExpectedDigest):
+                    exp = expected_output._resolve(
+                        exp, transaction, strict_type=strict_type
+                    )
+                    if isinstance(exp, ExpectedDigest):
+                        self.errors += 1
+                        log.error(
+                            "Received %s transaction differed from expected "
+                            "%s transaction %d with digest %s"
+                            % (
+                                type(transaction).__qualname__,
+                                exp.transaction_type.__qualname__,
+                                exp.index,
+                                exp.digest.hex(),
+                            )
+                        )
+                        log.info("Got: %s", _Rendered(transaction, self._report_size))
+                        if self._imm:
+                            assert False, (
+                                "Received transaction differed from expected transaction"
+                            )
+                        return
             self.compare(transaction, exp, log, strict_type=strict_type)
 
         monitor.add_callback(check_received_transaction)
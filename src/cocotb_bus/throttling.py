@@ -0,0 +1,217 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Precompiled valid-cycle schedules and throttling profiles.
+
+A :class:`ValidSchedule` can be used wherever a generator of ``(on, off)``
+tuples is expected, e.g. with
+:meth:`~cocotb_bus.drivers.ValidatedBusDriver.set_valid_generator`
+or :meth:`~cocotb_bus.drivers.BitDriver.start`.
+"""
+
+import itertools
+import math
+import random
+import sys
+from array import array
+from typing import Iterable, List, Optional, Tuple
+
+
+def compile_pattern(pattern: Iterable[int]) -> List[Tuple[int, int]]:
+    """Convert a bit pattern into ``(on, off)`` segments.
+
+    Example::
+
+        >>> compile_pattern([1, 1, 0, 0, 0, 1, 0])
+        [(2, 3), (1, 1)]
+
+    Args:
+        pattern: Sequence of bits, e.g. a list or a NumPy array.
+            NumPy arrays are converted without iterating in Python.
+    """
+    numpy = sys.modules.get("numpy")
+    if numpy is not None and isinstance(pattern, numpy.ndarray):
+        bits = pattern.ravel() != 0
+        if not bits.size:
+            return []
+        edges = numpy.flatnonzero(bits[1:] != bits[:-1]) + 1
+        starts = numpy.concatenate(([0], edges))
+        lengths = numpy.diff(numpy.concatenate((starts, [bits.size])))
+        runs = zip(bits[starts].tolist(), lengths.tolist())
+    else:
+        runs = (
+            (bit, sum(1 for _ in group))
+            for bit, group in itertools.groupby(map(bool, pattern))
+        )
+
+    segments = []
+    on = 0
+    for bit, length in runs:
+        if bit:
+            on = length
+        else:
+            segments.append((on, length))
+            on = 0
+    if on:
+        segments.append((on, 0))
+    return segments
+
+
+class ValidSchedule:
+    """A finite schedule of ``(on, off)`` cycles, stored as run lengths.
+
+    Segments without any on cycles are merged into the off cycles
+    of the previous segment, so every scheduled segment starts with a valid
+    cycle; off cycles before the first valid cycle are kept in :attr:`lead`.
+
+    Iterating over a schedule yields ``(on, off)`` tuples,
+    starting with ``(0, lead)`` if there is a lead.
+
+    Args:
+        segments: ``(on, off)`` tuples.
+        repeat: Start over at the end of the schedule.
+            The lead is then also inserted between repetitions.
+
+    Raises:
+        ValueError: If there are no on cycles or a negative cycle count.
+    """
+
+    __slots__ = ("runs", "lead", "repeat")
+
+    def __init__(self, segments: Iterable[Tuple[int, int]], repeat: bool = True):
+        runs = array("L")
+        lead = 0
+        for on, off in segments:
+            on, off = int(on), int(off)
+            if on < 0 or off < 0:
+                raise ValueError("Negative cycle count in segment %r" % ((on, off),))
+            if on:
+                runs.append(on)
+                runs.append(off)
+            elif runs:
+                runs[-1] += off
+            else:
+                lead += off
+        if not runs:
+            raise ValueError("Schedule has no valid cycles")
+        if repeat:
+            runs[-1] += lead
+        #: Interleaved on and off run lengths.
+        self.runs = runs
+        #: Off cycles before the first valid cycle.
+        self.lead = lead
+        self.repeat = repeat
+
+    @classmethod
+    def from_pattern(cls, pattern: Iterable[int], repeat: bool = True):
+        """Compile a bit pattern with one bit per cycle, see :func:`compile_pattern`."""
+        return cls(compile_pattern(pattern), repeat=repeat)
+
+    @classmethod
+    def from_generator(
+        cls, generator: Iterable[Tuple[int, int]], segments: int, repeat: bool = True
+    ):
+        """Compile the first *segments* tuples of a valid generator."""
+        return cls(itertools.islice(generator, segments), repeat=repeat)
+
+    @property
+    def cycles(self) -> int:
+        """Number of cycles in one pass of the schedule."""
+        return sum(self.runs) + (0 if self.repeat else self.lead)
+
+    @property
+    def duty_cycle(self) -> float:
+        """Fraction of valid cycles."""
+        return sum(self.runs[::2]) / self.cycles
+
+    def __iter__(self):
+        if self.lead:
+            yield 0, self.lead
+        runs = self.runs
+        while True:
+            for i in range(0, len(runs), 2):
+                yield runs[i], runs[i + 1]
+            if not self.repeat:
+                return
+
+    def __repr__(self):
+        return "%s(%d segments, %d cycles, repeat=%r)" % (
+            type(self).__qualname__,
+            len(self.runs) // 2,
+            self.cycles,
+            self.repeat,
+        )
+
+
+def burst(
+    on: int,
+    off: int,
+    jitter: int = 0,
+    seed: Optional[int] = None,
+    segments: int = 64,
+) -> ValidSchedule:
+    """Bursts of *on* valid cycles separated by *off* invalid cycles.
+
+    Args:
+        on: Valid cycles per burst.
+        off: Invalid cycles between bursts.
+        jitter: Vary *on* and *off* randomly by up to this many cycles,
+            over a repeating sequence of *segments* bursts.
+        seed: Seed of the random jitter.
+        segments: Number of bursts in the schedule if there is jitter.
+    """
+    if not jitter:
+        return ValidSchedule([(on, off)])
+    rng = random.Random(seed)
+    return ValidSchedule(
+        (
+            max(1, on + rng.randint(-jitter, jitter)),
+            max(0, off + rng.randint(-jitter, jitter)),
+        )
+        for _ in range(segments)
+    )
+
+
+def bernoulli(
+    probability: float, seed: Optional[int] = None, cycles: int = 1024
+) -> ValidSchedule:
+    """Each cycle is valid independently with *probability*.
+
+    Args:
+        probability: Probability of a valid cycle.
+        seed: Seed of the random pattern.
+        cycles: Length of the repeating pattern.
+    """
+    if not 0 < probability <= 1:
+        raise ValueError("Expected 0 < probability <= 1, got %r" % (probability,))
+    rng = random.Random(seed)
+    pattern = [rng.random() < probability for _ in range(cycles)]
+    if not any(pattern):
+        pattern[rng.randrange(cycles)] = True
+    return ValidSchedule.from_pattern(pattern)
+
+
+def sine(
+    on_ampl: float = 30, on_freq: int = 200, off_ampl: float = 10, off_freq: int = 100
+) -> ValidSchedule:
+    """On and off cycle counts following two sine waves.
+
+    Segment ``i`` is on for ``|on_ampl * sin(2 pi i / on_freq)|`` cycles
+    and off for ``|off_ampl * sin(2 pi i / off_freq)|`` cycles,
+    over one common period of both waves.
+
+    Args:
+        on_ampl: Amplitude of the on cycles.
+        on_freq: Period of the on cycles, in segments.
+        off_ampl: Amplitude of the off cycles.
+        off_freq: Period of the off cycles, in segments.
+    """
+    period = on_freq * off_freq // math.gcd(on_freq, off_freq)
+    return ValidSchedule(
+        (
+            int(abs(on_ampl * math.sin(2 * math.pi * (i % on_freq) / on_freq))),
+            int(abs(off_ampl * math.sin(2 * math.pi * (i % off_freq) / off_freq))),
+        )
+        for i in range(period)
+    )
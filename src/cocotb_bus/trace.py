@@ -0,0 +1,299 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Recording of transactions to binary trace files and their replay.
+
+A trace file starts with a magic string, followed by records.
+Each interface is defined once by a record holding its id, its source
+(a driver, a monitor or unknown) and its name.
+Every transaction record holds the simulation time in simulator steps,
+the interface id, the payload and the sideband arguments.
+:class:`bytes`, :class:`str` and :class:`int` payloads are stored as is,
+anything else and the sideband arguments are pickled.
+"""
+
+import functools
+import pickle
+import struct
+from collections import namedtuple
+from typing import Any, BinaryIO, Iterable, Iterator, Optional, Union
+
+import cocotb
+from cocotb.triggers import Timer
+from cocotb.utils import get_sim_time
+
+_MAGIC = b"CBTRACE\x01"
+_INTERFACE = struct.Struct(">BHBH")
+_TRANSACTION = struct.Struct(">BQHBII")
+_TAG_INTERFACE = 0
+_TAG_TRANSACTION = 1
+_KIND_BYTES = 0
+_KIND_STR = 1
+_KIND_INT = 2
+_KIND_PICKLE = 3
+_SOURCES = (None, "driver", "monitor")
+
+#: A transaction read back from a trace file.
+#: *source* is ``"driver"`` or ``"monitor"`` for interfaces recorded with
+#: :meth:`TraceWriter.attach`, ``None`` otherwise.
+TraceRecord = namedtuple(
+    "TraceRecord", ["timestamp", "interface", "transaction", "sideband", "source"]
+)
+# default source, the defaults argument of namedtuple needs Python 3.7
+TraceRecord.__new__.__defaults__ = (None,)
+
+
+def _encode(transaction):
+    if isinstance(transaction, (bytes, bytearray)):
+        return _KIND_BYTES, bytes(transaction)
+    if isinstance(transaction, str):
+        return _KIND_STR, transaction.encode()
+    if type(transaction) is int:
+        length = transaction.bit_length() // 8 + 1
+        return _KIND_INT, transaction.to_bytes(length, "big", signed=True)
+    return _KIND_PICKLE, pickle.dumps(transaction, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode(kind, payload):
+    if kind == _KIND_BYTES:
+        return payload
+    if kind == _KIND_STR:
+        return payload.decode()
+    if kind == _KIND_INT:
+        return int.from_bytes(payload, "big", signed=True)
+    return pickle.loads(payload)
+
+
+class TraceWriter:
+    """Write transactions to a binary trace file.
+
+    Drivers and monitors stream their transactions into the trace once
+    attached with :meth:`attach`.
+    Drivers record transactions with their keyword arguments as sideband
+    when they are queued, monitors when they are received.
+
+    Example::
+
+        with TraceWriter("stimulus.trace") as trace:
+            trace.attach(driver)
+            trace.attach(monitor)
+            ...
+
+    Args:
+        file: Path of the trace file, or a binary file object to write to.
+    """
+
+    def __init__(self, file: Union[str, BinaryIO]):
+        if isinstance(file, str):
+            self._file = open(file, "wb")
+            self._close = True
+        else:
+            self._file = file
+            self._close = False
+        self._file.write(_MAGIC)
+        self._interfaces = {}
+        self._sources = {}
+        self._attached = []
+
+    def attach(self, obj: Any, interface: Optional[str] = None) -> str:
+        """Record all transactions of a driver or monitor.
+
+        Args:
+            obj: A :class:`~cocotb_bus.drivers.Driver` or
+                :class:`~cocotb_bus.monitors.Monitor`.
+            interface: Name of the interface in the trace.
+                Defaults to the name of *obj* or its class.
+
+        Returns:
+            The interface name.
+        """
+        # imported here, the monitors import this module
+        from cocotb_bus.drivers import Driver
+        from cocotb_bus.monitors import Monitor
+
+        if interface is None:
+            interface = getattr(obj, "name", None) or type(obj).__qualname__
+        if isinstance(obj, Driver):
+            self._sources[interface] = _SOURCES.index("driver")
+        elif isinstance(obj, Monitor):
+            self._sources[interface] = _SOURCES.index("monitor")
+        obj._tracer = functools.partial(self._trace, interface)
+        self._attached.append(obj)
+        return interface
+
+    def _trace(self, interface, transaction, sideband):
+        self.record(interface, transaction, sideband)
+
+    def _interface_id(self, interface):
+        try:
+            return self._interfaces[interface]
+        except KeyError:
+            pass
+        id = len(self._interfaces)
+        name = interface.encode()
+        source = self._sources.get(interface, 0)
+        self._file.write(_INTERFACE.pack(_TAG_INTERFACE, id, source, len(name)) + name)
+        self._interfaces[interface] = id
+        return id
+
+    def record(
+        self,
+        interface: str,
+        transaction: Any,
+        sideband: Optional[dict] = None,
+        timestamp: Optional[int] = None,
+    ) -> None:
+        """Write a transaction to the trace.
+
+        Args:
+            interface: Name of the interface the transaction belongs to.
+            transaction: The transaction.
+            sideband: Keyword arguments to pass along with the transaction.
+            timestamp: Simulation time in simulator steps,
+                defaults to the current time.
+        """
+        if timestamp is None:
+            timestamp = get_sim_time()
+        kind, payload = _encode(transaction)
+        extra = pickle.dumps(sideband, pickle.HIGHEST_PROTOCOL) if sideband else b""
+        self._file.write(
+            _TRANSACTION.pack(
+                _TAG_TRANSACTION,
+                timestamp,
+                self._interface_id(interface),
+                kind,
+                len(payload),
+                len(extra),
+            )
+        )
+        self._file.write(payload)
+        self._file.write(extra)
+
+    def close(self) -> None:
+        """Detach from all drivers and monitors and close the trace file."""
+        for obj in self._attached:
+            obj._tracer = None
+        self._attached = []
+        if self._close:
+            self._file.close()
+        else:
+            self._file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def read_trace(file: Union[str, BinaryIO]) -> Iterator[TraceRecord]:
+    """Read the transactions of a trace file written by :class:`TraceWriter`.
+
+    Args:
+        file: Path of the trace file, or a binary file object to read from.
+
+    Yields:
+        A :class:`TraceRecord` per transaction, in recording order.
+
+    Raises:
+        ValueError: If *file* is not a trace file.
+    """
+    if isinstance(file, str):
+        with open(file, "rb") as f:
+            yield from read_trace(f)
+        return
+
+    if file.read(len(_MAGIC)) != _MAGIC:
+        raise ValueError("Not a trace file: %r" % (file,))
+    interfaces = {}
+    while True:
+        tag = file.read(1)
+        if not tag:
+            return
+        if tag[0] == _TAG_INTERFACE:
+            _, id, source, length = _INTERFACE.unpack(
+                tag + file.read(_INTERFACE.size - 1)
+            )
+            interfaces[id] = (file.read(length).decode(), _SOURCES[source])
+            continue
+        header = tag + file.read(_TRANSACTION.size - 1)
+        _, timestamp, id, kind, length, extra = _TRANSACTION.unpack(header)
+        transaction = _decode(kind, file.read(length))
+        sideband = pickle.loads(file.read(extra)) if extra else {}
+        name, source = interfaces[id]
+        yield TraceRecord(timestamp, name, transaction, sideband, source)
+
+
+class ReplayDriver:
+    """Feed the transactions of a trace back through a driver.
+
+    Args:
+        driver: The :class:`~cocotb_bus.drivers.Driver` to send the transactions with.
+        trace: Path of a trace file, a binary file object,
+            or an iterable of :class:`TraceRecord`.
+        interface: Only replay the transactions of this interface.
+            ``None`` replays the transactions of all interfaces recorded
+            from drivers, see :meth:`TraceWriter.attach`.
+        timing: ``"original"`` queues each transaction at the same time
+            relative to the first one as it was recorded;
+            ``"asap"`` queues them as fast as possible.
+            Either way, queuing waits while the driver's queue is at its
+            high watermark, see
+            :meth:`~cocotb_bus.drivers.Driver.set_queue_limits`.
+    """
+
+    def __init__(
+        self,
+        driver: Any,
+        trace: Union[str, BinaryIO, Iterable[TraceRecord]],
+        interface: Optional[str] = None,
+        timing: str = "original",
+    ):
+        if timing not in ("original", "asap"):
+            raise ValueError(
+                "Unknown timing %r, expected 'original' or 'asap'" % (timing,)
+            )
+        self.driver = driver
+        self.trace = trace
+        self.interface = interface
+        self.timing = timing
+        self.replayed = 0
+
+    def start(self):
+        """Start :meth:`replay` in a new task and return it."""
+        return cocotb.start_soon(self.replay())
+
+    async def replay(self) -> int:
+        """Queue the transactions of the trace and wait until they were sent.
+
+        Returns:
+            The number of replayed transactions.
+        """
+        trace = self.trace
+        if isinstance(trace, str) or hasattr(trace, "read"):
+            trace = read_trace(trace)
+
+        driver = self.driver
+        original = self.timing == "original"
+        handle = None
+        first = start = None
+        for record in trace:
+            if self.interface is None:
+                if record.source != "driver":
+                    continue
+            elif record.interface != self.interface:
+                continue
+            if original:
+                now = get_sim_time()
+                if first is None:
+                    first, start = record.timestamp, now
+                delay = (record.timestamp - first) - (now - start)
+                if delay > 0:
+                    await Timer(delay, "step")
+            handle = await driver.put(record.transaction, **record.sideband)
+            self.replayed += 1
+
+        if handle is not None:
+            await handle
+        return self.replayed
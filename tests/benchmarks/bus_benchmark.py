@@ -0,0 +1,130 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Microbenchmark of :class:`cocotb_bus.bus.Bus` drive/sample/capture.
+
+Runs without a simulator: signals are plain Python objects with a ``value``
+attribute, so the numbers only reflect the Python overhead of the Bus methods.
+The ``before`` column is the previous per-call ``hasattr``/``getattr``
+implementation, kept here for reference.
+
+Usage::
+
+    python tests/benchmarks/bus_benchmark.py [--signals N] [--seconds S]
+"""
+
+import argparse
+import logging
+import time
+
+from cocotb_bus.bus import Bus
+
+
+class _Signal:
+    def __init__(self):
+        self.value = 0
+
+
+class _Entity:
+    _name = "dut"
+    _log = logging.getLogger("bus_benchmark")
+
+    def __init__(self, names):
+        for name in names:
+            setattr(self, name, _Signal())
+
+
+class _Transaction:
+    def __init__(self, names):
+        for i, name in enumerate(names):
+            setattr(self, name, i)
+
+
+def _legacy_drive(bus, obj, strict=False):
+    for attr_name, hdl in bus._signals.items():
+        if not hasattr(obj, attr_name):
+            if strict:
+                raise AttributeError(attr_name)
+            continue
+        val = getattr(obj, attr_name)
+        hdl.value = val
+
+
+def _legacy_capture(bus):
+    class _Capture(dict):
+        def __getattr__(self, name):
+            if name in self:
+                return self[name]
+            else:
+                raise RuntimeError("Signal {} not present in bus".format(name))
+
+        def __setattr__(self, name, value):
+            raise RuntimeError("Modifying a bus capture is not supported")
+
+        def __delattr__(self, name):
+            raise RuntimeError("Modifying a bus capture is not supported")
+
+    _capture = _Capture()
+    for attr_name, hdl in bus._signals.items():
+        _capture[attr_name] = hdl.value
+
+    return _capture
+
+
+def _legacy_sample(bus, obj, strict=False):
+    for attr_name, hdl in bus._signals.items():
+        if not hasattr(obj, attr_name):
+            if strict:
+                raise AttributeError(attr_name)
+            continue
+        try:
+            getattr(obj, attr_name).set_binstr(hdl.value.get_binstr())
+        except AttributeError:
+            setattr(obj, attr_name, hdl.value)
+
+
+def _rate(fn, seconds):
+    """Return calls per second of *fn* measured over about *seconds*."""
+    calls = 0
+    batch = 1000
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--signals", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    args = parser.parse_args()
+
+    names = ["sig%d" % i for i in range(args.signals)]
+    entity = _Entity(["bus_" + name for name in names])
+    bus = Bus(entity, "bus", names)
+    txn = _Transaction(names)
+
+    cases = [
+        ("drive", lambda: _legacy_drive(bus, txn), lambda: bus.drive(txn)),
+        ("capture", lambda: _legacy_capture(bus), bus.capture),
+        ("sample", lambda: _legacy_sample(bus, txn), lambda: bus.sample(txn)),
+    ]
+
+    print("%d signals, calls per second" % args.signals)
+    print("%-10s %12s %12s %8s" % ("method", "before", "after", "speedup"))
+    for name, before, after in cases:
+        before_rate = _rate(before, args.seconds)
+        after_rate = _rate(after, args.seconds)
+        print(
+            "%-10s %12.0f %12.0f %7.2fx"
+            % (name, before_rate, after_rate, after_rate / before_rate)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Microbenchmark of :meth:`cocotb_bus.monitors.Monitor._recv`.
+
+Runs without a simulator: the monitor coroutine is never started, nobody
+waits on the monitor and the simulation time is a counter, so the numbers
+only reflect the Python overhead of dispatching a received transaction.
+The ``before`` column is the previous implementation, kept here for reference.
+Both only count the transactions in :class:`~cocotb_bus.monitors.MonitorStatistics`,
+which is the default.
+
+With ``--check``, the benchmark exits with status 1 if a speedup is below
+its minimum in :data:`MIN_SPEEDUP`; run it so after changing
+:meth:`~cocotb_bus.monitors.Monitor._recv`.
+The minimums are set well below the speedups measured when they were added
+(2.1x, 2.5x, 1.4x and 10x) to leave room for noise,
+and never below 1x, i.e. never slower than the previous implementation.
+
+Usage::
+
+    python tests/benchmarks/monitor_benchmark.py [--seconds S] [--check]
+"""
+
+import argparse
+import itertools
+import sys
+import time
+import warnings
+from unittest import mock
+
+from cocotb.triggers import Event
+
+from cocotb_bus.monitors import Monitor
+
+
+#: Minimum speedup of each case over the previous implementation for ``--check``.
+MIN_SPEEDUP = {
+    "queue": 1.4,
+    "1 callback": 1.6,
+    "4 callbacks": 1.0,
+    "event": 6.0,
+}
+
+
+class _Monitor(Monitor):
+    async def _monitor_recv(self):
+        pass
+
+
+def _monitor(callbacks=0, event=None):
+    with mock.patch("cocotb.start_soon", lambda coro: coro.close()):
+        monitor = _Monitor(event=event)
+    for _ in range(callbacks):
+        monitor.add_callback(lambda transaction: None)
+    return monitor
+
+
+def _legacy_recv(self, transaction):
+    self.stats.received_transactions += 1
+
+    for callback in self._callbacks:
+        callback(transaction)
+
+    if not self._callbacks:
+        self._recvQ.append(transaction)
+
+    if self._event is not None:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self._event.set(transaction)
+
+    if self._wait_event is not None:
+        self._wait_event.set()
+        self._wait_event_data = transaction
+        self._wait_event.clear()
+
+
+def _rate(fn, seconds):
+    """Return transactions per second of *fn* measured over about *seconds*."""
+    calls = 0
+    batch = 1000
+    start = time.perf_counter()
+    while True:
+        for _ in range(batch):
+            fn()
+        calls += batch
+        elapsed = time.perf_counter() - start
+        if elapsed >= seconds:
+            return calls / elapsed
+
+
+def _case(seconds, **kwargs):
+    before = _monitor(**kwargs)
+    after = _monitor(**kwargs)
+
+    def legacy():
+        _legacy_recv(before, 0)
+        before._recvQ.clear()
+
+    def current():
+        after._recv(0)
+        after._recvQ.clear()
+
+    return _rate(legacy, seconds), _rate(current, seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument(
+        "--check", action="store_true", help="fail if a speedup is below MIN_SPEEDUP"
+    )
+    args = parser.parse_args()
+
+    cases = [
+        ("queue", {}),
+        ("1 callback", {"callbacks": 1}),
+        ("4 callbacks", {"callbacks": 4}),
+        ("event", {"event": Event()}),
+    ]
+
+    sim_time = mock.patch(
+        "cocotb_bus.monitors.get_sim_time", itertools.count(0, 1000).__next__
+    )
+    sim_time.start()
+
+    print("transactions per second")
+    print("%-12s %12s %12s %8s" % ("consumer", "before", "after", "speedup"))
+    slow = []
+    for name, kwargs in cases:
+        before_rate, after_rate = _case(args.seconds, **kwargs)
+        speedup = after_rate / before_rate
+        print("%-12s %12.0f %12.0f %7.2fx" % (name, before_rate, after_rate, speedup))
+        if speedup < MIN_SPEEDUP[name]:
+            slow.append("%s: %.2fx < %.2fx" % (name, speedup, MIN_SPEEDUP[name]))
+
+    if args.check and slow:
+        print("Below the minimum speedup: " + ", ".join(slow))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 import cocotb
 from cocotb.clock import Clock
-from cocotb_bus.drivers import BusDriver
-from cocotb_bus.monitors import BusMonitor
-from cocotb.triggers import RisingEdge
+from cocotb_bus.bus import BusArray
+from cocotb_bus.drivers import BusDriver, BusDriverArray
+from cocotb_bus.monitors import BusMonitor, BusMonitorArray
+from cocotb.triggers import ReadOnly, RisingEdge
 
 
 class TestDriver(BusDriver):
@@ -78,3 +79,51 @@ async def test_array_buses(dut):
 
     assert not out_data_0.expected
     assert not out_data_1.expected
+
+
+@cocotb.test(
+    expect_error=AttributeError if cocotb.SIM_NAME.lower().startswith("ghdl") else ()
+)
+async def test_bus_driver_array(dut):
+    clock = Clock(dut.clk, 10, "ns")
+    cocotb.start_soon(clock.start())
+    clkedge = RisingEdge(dut.clk)
+    in_data = BusDriverArray(TestDriver, dut, "in", dut.clk)
+    out_data = BusMonitorArray(TestMonitor, dut, "in", dut.clk)
+    assert len(in_data) == len(out_data) == 2
+    assert in_data[0].bus.data is in_data.buses[0].data
+    assert in_data[1].name == "in_1"
+
+    for value, idx in [(10, 0), (20, 1), (30, 0), (40, 1)]:
+        out_data[idx].add_expected(value)
+        await in_data[idx].send(value)
+        await clkedge
+    await clkedge
+
+    for monitor in out_data:
+        assert not monitor.expected
+
+
+class Transaction:
+    def __init__(self, data, valid):
+        self.data = data
+        self.valid = valid
+
+
+@cocotb.test(
+    expect_error=AttributeError if cocotb.SIM_NAME.lower().startswith("ghdl") else ()
+)
+async def test_bus_array_drive_capture(dut):
+    clock = Clock(dut.clk, 10, "ns")
+    cocotb.start_soon(clock.start())
+    buses = BusArray(dut, "in", ["data", "valid"])
+
+    for idx, bus in zip(buses.indices, buses):
+        bus.drive(Transaction(idx + 5, 1))
+    await RisingEdge(dut.clk)
+    await ReadOnly()
+    for idx, bus in zip(buses.indices, buses):
+        assert bus.capture() == {"data": idx + 5, "valid": 1}
+        sampled = Transaction(0, 0)
+        bus.sample(sampled)
+        assert sampled.data == idx + 5
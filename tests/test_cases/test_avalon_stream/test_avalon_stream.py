@@ -8,10 +8,12 @@ import cocotb
 from cocotb.clock import Clock
 from cocotb.triggers import RisingEdge
 
+from cocotb_bus._compat import create_binary
 from cocotb_bus.drivers import BitDriver
 from cocotb_bus.drivers.avalon import AvalonST as AvalonSTDriver
 from cocotb_bus.monitors.avalon import AvalonST as AvalonSTMonitor
 from cocotb_bus.scoreboard import Scoreboard
+from cocotb_bus.throttling import ValidSchedule, bernoulli, sine
 
 
 def sine_wave(amplitude, w, offset=0):
@@ -51,7 +53,7 @@ def wave(on_ampl=30, on_freq=200, off_ampl=10, off_freq=100):
 class AvalonSTTB(object):
     """Testbench for avalon basic stream"""
 
-    def __init__(self, dut):
+    def __init__(self, dut, coalesce_writes=False):
         self.dut = dut
 
         self.clkedge = RisingEdge(dut.clk)
@@ -60,6 +62,7 @@ class AvalonSTTB(object):
             self.dut,
             "asi",
             dut.clk,
+            coalesce_writes=coalesce_writes,
         )
         self.stream_out = AvalonSTMonitor(self.dut, "aso", dut.clk)
         self.scoreboard = Scoreboard(self.dut, fail_immediately=True)
@@ -100,3 +103,82 @@ async def test_avalon_stream(dut):
         await tb.clkedge
 
     raise tb.scoreboard.result
+
+
+@cocotb.test()
+async def test_avalon_stream_pattern_backpressure(dut):
+    """Test stream of avalon data with a precompiled backpressure pattern"""
+
+    tb = AvalonSTTB(dut)
+    await tb.initialise()
+    tb.backpressure.start_pattern([1, 1, 0, 1, 0, 0, 0] + [0] * 20 + [1] * 5)
+
+    for _ in range(20):
+        data = random.randint(0, (2**7) - 1)
+        await tb.send_data(data)
+        await tb.clkedge
+
+    for _ in range(60):
+        await tb.clkedge
+
+    raise tb.scoreboard.result
+
+
+@cocotb.test()
+async def test_avalon_stream_valid_schedules(dut):
+    """Test stream of avalon data with precompiled valid schedules"""
+
+    tb = AvalonSTTB(dut)
+    await tb.initialise()
+    tb.backpressure.start(bernoulli(0.5, seed=1))
+
+    schedules = [
+        ValidSchedule.from_pattern([0, 0, 1, 1, 0, 1, 0, 0, 0]),
+        ValidSchedule.from_generator(wave(), 50),
+        sine(on_ampl=4, on_freq=20, off_ampl=3, off_freq=10),
+        bernoulli(0.3, seed=2),
+    ]
+    for schedule in schedules:
+        tb.stream_in.set_valid_generator(schedule)
+        for _ in range(10):
+            data = random.randint(0, (2**7) - 1)
+            await tb.send_data(data)
+
+    for _ in range(60):
+        await tb.clkedge
+
+    raise tb.scoreboard.result
+
+
+@cocotb.test()
+async def test_avalon_stream_coalesce_writes(dut):
+    """Test that a driver with coalesce_writes skips unchanged integer writes"""
+
+    tb = AvalonSTTB(dut, coalesce_writes=True)
+    await tb.initialise()
+    dut.aso_ready.value = 1
+    shadow = tb.stream_in.bus.shadow
+    assert shadow.enabled
+
+    # valid is written as 0, 1, 0 per word, the leading 0 is skipped after
+    # the first word; data is not an integer and always written
+    for data in range(3):
+        await tb.send_data(data)
+    assert shadow.writes == 13
+    assert shadow.skipped_writes == 2
+
+    shadow.valid = 0
+    assert shadow.skipped_writes == 3
+    shadow.invalidate("valid")
+    shadow.valid = 0
+    assert (shadow.writes, shadow.skipped_writes) == (14, 3)
+
+    empty = create_binary("x" * len(dut.asi_data), len(dut.asi_data), big_endian=True)
+    shadow.data = empty
+    shadow.data = empty
+    assert (shadow.writes, shadow.skipped_writes) == (16, 3)
+
+    for _ in range(10):
+        await tb.clkedge
+    assert tb.scoreboard.errors == 0
+    assert not tb.expected_output
@@ -0,0 +1,280 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Tests of the send queue of the base Driver class."""
+
+import json
+import os
+import socket
+import tempfile
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Combine, RisingEdge
+from cocotb.utils import get_sim_time
+
+from cocotb_bus.drivers import DriverQueueFull, SocketBridge, encode_frame
+from cocotb_bus.drivers.avalon import AvalonST as AvalonSTDriver
+from cocotb_bus.monitors.avalon import AvalonST as AvalonSTMonitor
+
+
+async def reset(dut):
+    dut.reset.value = 0
+    dut.aso_ready.value = 1
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    for _ in range(3):
+        await RisingEdge(dut.clk)
+    dut.reset.value = 1
+    await RisingEdge(dut.clk)
+
+
+@cocotb.test()
+async def test_queue_capacity(dut):
+    """append() refuses transactions beyond the queue capacity."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    driver.set_queue_limits(capacity=4)
+
+    for i in range(4):
+        driver.append(i)
+    try:
+        driver.append(4)
+        assert False, "append() accepted a transaction beyond the queue capacity"
+    except DriverQueueFull:
+        pass
+
+    assert driver.stats.rejected_transactions == 1
+    assert driver.stats.max_queue_depth == 4
+
+
+@cocotb.test()
+async def test_queue_watermarks(dut):
+    """put() blocks at the high watermark and resumes at the low watermark."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    driver.set_queue_limits(capacity=8, high_watermark=6, low_watermark=2)
+
+    depths_on_resume = []
+    for i in range(20):
+        waits = driver.stats.producer_waits
+        await driver.put(i)
+        if driver.stats.producer_waits != waits:
+            # depth after appending this transaction
+            depths_on_resume.append(driver.stats.queue_depth)
+
+    while len(monitor) < 20:
+        await RisingEdge(dut.clk)
+
+    assert [ord(monitor[i]) for i in range(20)] == list(range(20))
+    assert depths_on_resume
+    assert all(depth <= 3 for depth in depths_on_resume)
+    assert driver.stats.max_queue_depth == 6
+
+
+@cocotb.test()
+async def test_completion_handles(dut):
+    """append() and extend() return awaitable completion handles."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+
+    first = driver.append(0)
+    rest = driver.extend(range(1, 10))
+    assert len(rest) == 9
+    assert not first.done
+
+    assert await first == 0
+    assert first.done and not first.cancelled
+    await Combine(*(handle.wait() for handle in rest))
+    assert all(handle.done for handle in rest)
+    # awaiting a completed handle returns immediately
+    await rest[0]
+
+    while len(monitor) < 10:
+        await RisingEdge(dut.clk)
+    assert [ord(monitor[i]) for i in range(10)] == list(range(10))
+
+    handles = driver.extend(range(4))
+    driver.clear()
+    assert all(handle.done and handle.cancelled for handle in handles)
+
+
+@cocotb.test()
+async def test_traffic_classes(dut):
+    """Strict-priority traffic classes send control before bulk transactions."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    driver.set_traffic_classes(2)
+
+    driver.extend(range(1, 6), traffic_class=1)
+    await driver.append(0xC0, traffic_class=0)
+    await driver.extend(range(6, 9), traffic_class=1)[-1]
+
+    while len(monitor) < 9:
+        await RisingEdge(dut.clk)
+
+    assert [ord(monitor[i]) for i in range(9)] == [0xC0] + list(range(1, 9))
+    control, bulk = driver.stats.classes
+    assert control.dequeued_transactions == 1
+    assert bulk.dequeued_transactions == 8
+    assert bulk.max_queue_depth == 5
+    assert bulk.max_wait_time > control.max_wait_time
+
+
+@cocotb.test()
+async def test_instrumentation(dut):
+    """Instrumentation records latency, size and stall cycles per transaction."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    instrumentation = driver.enable_instrumentation(size_fn=lambda txn: 1)
+
+    # the DUT buffers 10 transactions before deasserting asi_ready
+    dut.aso_ready.value = 0
+    handles = driver.extend(range(12))
+    for _ in range(20):
+        await RisingEdge(dut.clk)
+    dut.aso_ready.value = 1
+    await handles[-1]
+
+    while len(monitor) < 12:
+        await RisingEdge(dut.clk)
+
+    assert instrumentation.transactions == 12
+    assert instrumentation.bytes == 12
+    assert instrumentation.stall_cycles > 0
+    # every stall is counted once, by the transaction that waited
+    assert instrumentation.stall_cycles == driver._stall_cycles
+    assert sum(r.stall_cycles for r in instrumentation.records) == driver._stall_cycles
+    assert instrumentation.latency.count == 12
+    assert instrumentation.latency.max >= instrumentation.service_time.max
+    transactions, size = instrumentation.throughput()
+    assert transactions == size > 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "driver.json")
+        instrumentation.export(path, records=True)
+        with open(path) as f:
+            exported = json.load(f)
+    assert exported["transactions"] == 12
+    assert len(exported["records"]) == 12
+
+
+@cocotb.test()
+async def test_socket_bridge(dut):
+    """SocketBridge sends length-prefixed frames from a socket into a driver."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    remote, local = socket.socketpair()
+    bridge = SocketBridge(driver, local, max_poll_cycles=8)
+    bridge.start()
+
+    payload = b"".join(encode_frame(bytes([i])) for i in range(16))
+    # split in the middle of a frame header
+    remote.sendall(payload[:10])
+    remote.sendall(payload[10:])
+    remote.close()
+
+    for _ in range(100000):
+        if len(monitor) == 16:
+            break
+        await RisingEdge(dut.clk)
+    bridge.stop()
+    local.close()
+
+    assert [ord(monitor[i]) for i in range(16)] == list(range(16))
+    assert bridge.frames_received == 16
+    assert 1 <= bridge.batches <= 16
+
+
+@cocotb.test()
+async def test_socket_bridge_truncated(dut):
+    """SocketBridge sends all complete frames before a truncated one."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    remote, local = socket.socketpair()
+    bridge = SocketBridge(driver, local)
+    bridge.start()
+
+    remote.sendall(encode_frame(b"\x01") + encode_frame(b"\x02\x03")[:-1])
+    remote.close()
+    await bridge._cr
+    bridge.stop()
+    local.close()
+
+    assert bridge.frames_received == 1
+    assert bridge._truncated == 5
+
+
+@cocotb.test()
+async def test_rate_limit(dut):
+    """The token bucket spaces transactions at the configured rate."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    AvalonSTMonitor(dut, "aso", dut.clk)
+    driver.set_rate_limit(0.25)
+
+    completed = []
+    for handle in driver.extend(range(8)):
+        await handle
+        completed.append(get_sim_time("ns"))
+
+    # one transaction every 4 cycles of 10 ns
+    span = completed[-1] - completed[0]
+    assert 7 * 40 - 20 <= span <= 7 * 40 + 20, completed
+
+
+@cocotb.test()
+async def test_rate_limit_queued(dut):
+    """Transactions wait for tokens while queued, so they can be overtaken or cleared."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    driver.set_traffic_classes(2)
+    driver.set_rate_limit(0.1, period=10, period_unit="ns")
+
+    start = get_sim_time("ns")
+    first, second = driver.extend([1, 2], traffic_class=1)
+    await first
+    # the full bucket doesn't delay the first transaction
+    assert get_sim_time("ns") - start <= 20
+    await ClockCycles(dut.clk, 2)
+    assert driver._queue_depth() == 1
+    await driver.append(0xC0, traffic_class=0)
+    await second
+
+    while len(monitor) < 3:
+        await RisingEdge(dut.clk)
+    assert [ord(monitor[i]) for i in range(3)] == [1, 0xC0, 2]
+
+    handle = driver.append(3, traffic_class=1)
+    await ClockCycles(dut.clk, 2)
+    driver.clear()
+    assert handle.cancelled
+    await ClockCycles(dut.clk, 20)
+    assert len(monitor) == 3
+
+
+@cocotb.test()
+async def test_pause_resume(dut):
+    """pause() parks the send coroutine until resume()."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+
+    driver.pause()
+    handles = driver.extend(range(3))
+    await ClockCycles(dut.clk, 10)
+    assert driver.paused
+    assert not any(handle.done for handle in handles)
+    assert len(monitor) == 0
+
+    driver.resume()
+    await handles[-1]
+    while len(monitor) < 3:
+        await RisingEdge(dut.clk)
+    assert [ord(monitor[i]) for i in range(3)] == [0, 1, 2]
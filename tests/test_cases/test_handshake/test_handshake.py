@@ -0,0 +1,152 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Tests of the shared handshake waits."""
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+from cocotb_bus import handshake
+from cocotb_bus.drivers.opb import OPBException, OPBMaster
+from cocotb_bus.handshake import wait_cycles, wait_handshake, wait_level
+
+
+async def release(signal, clock, cycles, glitch=False):
+    await ClockCycles(clock, cycles)
+    if glitch:
+        # a pulse between clock edges must not be sampled
+        await Timer(2, "ns")
+        signal.value = 1
+        await Timer(2, "ns")
+        signal.value = 0
+        await ClockCycles(clock, 2)
+    signal.value = 1
+
+
+@cocotb.test()
+async def test_wait_handshake(dut):
+    """wait_handshake counts the same stall cycles while polling and edge-triggered."""
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    dut.aso_ready.value = 0
+    await RisingEdge(dut.clk)
+
+    # each wait polls two cycles to learn the clock, then waits for edges
+    for cycles, glitch, expected in ((5, False, 5), (7, False, 7), (3, True, 5)):
+        dut.aso_ready.value = 0
+        await RisingEdge(dut.clk)
+        cocotb.start_soon(release(dut.aso_ready, dut.clk, cycles, glitch))
+        assert await wait_handshake(dut.clk, dut.aso_ready) == expected
+        await RisingEdge(dut.clk)
+
+    # no stall if the handshake is already complete
+    assert await wait_handshake(dut.clk, dut.aso_ready) == 0
+
+
+@cocotb.test()
+async def test_wait_level(dut):
+    """wait_level returns once the signal reaches the level."""
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    dut.aso_ready.value = 1
+    await RisingEdge(dut.clk)
+    cocotb.start_soon(release(dut.aso_ready, dut.clk, 4))
+    dut.aso_ready.value = 0
+    await RisingEdge(dut.clk)
+    await wait_level(dut.aso_ready, 1)
+    assert dut.aso_ready.value == 1
+
+
+@cocotb.test()
+async def test_wait_level_cycles(dut):
+    """wait_level counts stalled cycles without an earlier wait on the clock."""
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    handshake._clock_timing.pop(dut.clk, None)
+    dut.aso_ready.value = 0
+    await RisingEdge(dut.clk)
+    for cycles in (6, 1, 9):
+        dut.aso_ready.value = 0
+        await RisingEdge(dut.clk)
+        cocotb.start_soon(release(dut.aso_ready, dut.clk, cycles))
+        assert await wait_level(dut.aso_ready, 1, dut.clk) == cycles
+        await RisingEdge(dut.clk)
+
+
+@cocotb.test()
+async def test_wait_handshake_max_cycles(dut):
+    """wait_handshake gives up after max_cycles stalled cycles."""
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    dut.aso_ready.value = 0
+    await RisingEdge(dut.clk)
+    for max_cycles in (1, 2, 16):
+        assert await wait_handshake(dut.clk, dut.aso_ready, max_cycles=max_cycles) == (
+            max_cycles
+        )
+        assert dut.aso_ready.value == 0
+        await RisingEdge(dut.clk)
+
+
+@cocotb.test()
+async def test_wait_cycles(dut):
+    """wait_cycles ends on the same clock edge as ClockCycles."""
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    await RisingEdge(dut.clk)
+
+    # the first free running wait learns the clock period, the later ones sleep
+    for free_running in (False, True):
+        for cycles in (3, 1, 17, 2, 100):
+            start = get_sim_time("ns")
+            await wait_cycles(dut.clk, cycles, free_running=free_running)
+            assert get_sim_time("ns") - start == 10 * cycles
+            assert dut.clk.value == 1
+
+        # also from between two clock edges
+        await Timer(3, "ns")
+        start = get_sim_time("ns")
+        await wait_cycles(dut.clk, 5, free_running=free_running)
+        assert get_sim_time("ns") - start == 10 * 5 - 3
+
+
+class _OPBMaster(OPBMaster):
+    # Only xferAck and toutSup are used while waiting for the acknowledge
+    _signals = dict(
+        {name: "asi_data" for name in OPBMaster._signals},
+        xferAck="aso_ready",
+        toutSup="asi_valid",
+    )
+
+
+async def pulse(signal, clock, cycles):
+    await ClockCycles(clock, cycles)
+    signal.value = 1
+    await RisingEdge(clock)
+    signal.value = 0
+
+
+@cocotb.test()
+async def test_opb_tout_sup(dut):
+    """A toutSup pulse restarts the OPB acknowledge timeout."""
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    master = _OPBMaster(dut, None, dut.clk)
+    dut.aso_ready.value = 0
+    dut.asi_valid.value = 0
+    await RisingEdge(dut.clk)
+
+    # acknowledged 20 cycles in, after toutSup was held in cycle 10
+    cocotb.start_soon(pulse(dut.asi_valid, dut.clk, 10))
+    cocotb.start_soon(release(dut.aso_ready, dut.clk, 20))
+    await master._wait_ack("Read")
+    assert master._stall_cycles == 20
+
+    # timeout 16 cycles after the toutSup pulse in cycle 4
+    dut.aso_ready.value = 0
+    await RisingEdge(dut.clk)
+    cocotb.start_soon(pulse(dut.asi_valid, dut.clk, 4))
+    start = get_sim_time("ns")
+    try:
+        await master._wait_ack("Read")
+    except OPBException:
+        assert get_sim_time("ns") - start == 10 * (4 + 16)
+    else:
+        assert False, "Expected OPBException"
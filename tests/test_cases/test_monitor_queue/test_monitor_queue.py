@@ -0,0 +1,250 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Tests of the receive queue of the base Monitor class."""
+
+import json
+import os
+import tempfile
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ClockCycles, Event, RisingEdge
+
+from cocotb_bus.drivers.avalon import AvalonST as AvalonSTDriver
+from cocotb_bus.monitors import ClockDomain, MonitorQueueFull, MonitorStatistics
+from cocotb_bus.monitors.avalon import AvalonST as AvalonSTMonitor
+from cocotb_bus.trace import read_trace
+
+
+async def reset(dut):
+    dut.reset.value = 0
+    dut.aso_ready.value = 1
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    for _ in range(3):
+        await RisingEdge(dut.clk)
+    dut.reset.value = 1
+    await RisingEdge(dut.clk)
+
+
+async def send(dut, driver, n):
+    for i in range(n):
+        driver.append(i)
+    await ClockCycles(dut.clk, n + 10)
+
+
+@cocotb.test()
+async def test_queue_limit_overflow(dut):
+    """A full receive queue drops the oldest or newest transactions."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+
+    monitor.set_queue_limit(4)
+    await send(dut, driver, 10)
+    assert [ord(txn) for txn in monitor._recvQ] == [6, 7, 8, 9]
+    assert monitor.stats.dropped_transactions == 6
+
+    monitor._recvQ.clear()
+    monitor.set_queue_limit(4, overflow="drop_newest")
+    await send(dut, driver, 10)
+    assert [ord(txn) for txn in monitor._recvQ] == [0, 1, 2, 3]
+    assert monitor.stats.dropped_transactions == 12
+
+    monitor.set_queue_limit(2)
+    assert [ord(txn) for txn in monitor._recvQ] == [2, 3]
+    assert monitor.stats.dropped_transactions == 14
+
+
+@cocotb.test()
+async def test_queue_limit_raise(dut):
+    """A full receive queue raises with the "raise" policy."""
+    await reset(dut)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    monitor.set_queue_limit(2, overflow="raise")
+
+    monitor._recv(b"a")
+    monitor._recv(b"b")
+    try:
+        monitor._recv(b"c")
+        assert False, "_recv() accepted a transaction beyond the queue capacity"
+    except MonitorQueueFull:
+        pass
+    assert list(monitor._recvQ) == [b"a", b"b"]
+    assert monitor.stats.dropped_transactions == 1
+
+
+@cocotb.test()
+async def test_queue_limit_spill(dut):
+    """Dropped transactions are written to the spill file."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+
+    path = os.path.join(tempfile.mkdtemp(), "overflow.trace")
+    monitor.set_queue_limit(3, spill=path)
+    await send(dut, driver, 8)
+    monitor.kill()
+
+    assert [ord(txn) for txn in monitor._recvQ] == [5, 6, 7]
+    assert monitor.stats.spilled_transactions == 5
+    records = list(read_trace(path))
+    assert [ord(record.transaction) for record in records] == list(range(5))
+    assert {record.interface for record in records} == {"aso"}
+
+
+@cocotb.test()
+async def test_async_iteration(dut):
+    """async for consumes every received transaction in order."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    for i in range(10):
+        driver.append(i)
+
+    received = []
+    async for transaction in monitor:
+        received.append(ord(transaction))
+        if len(received) == 10:
+            break
+    assert received == list(range(10))
+    assert len(monitor) == 0
+
+    monitor._recv(b"x")
+    monitor.kill()
+    assert [txn async for txn in monitor] == [b"x"]
+
+
+@cocotb.test()
+async def test_get_batch(dut):
+    """get_batch() returns the queued burst with one wakeup."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+
+    assert await monitor.get_batch(timeout=100) == []
+
+    await send(dut, driver, 8)
+    batch = await monitor.get_batch(5)
+    assert [ord(txn) for txn in batch] == [0, 1, 2, 3, 4]
+    batch = await monitor.get_batch()
+    assert [ord(txn) for txn in batch] == [5, 6, 7]
+
+    driver.append(8)
+    batch = await monitor.get_batch()
+    assert [ord(txn) for txn in batch] == [8]
+
+
+@cocotb.test()
+async def test_recv_notification(dut):
+    """Events, waiters and combined callbacks are notified of transactions."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    event = Event()
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk, event=event)
+    received = []
+    monitor.add_callback(received.append)
+    monitor.add_callback(lambda txn: received.append(ord(txn)))
+
+    driver.append(1)
+    assert ord(await monitor.wait_for_recv()) == 1
+    assert event.is_set()
+    assert received == [b"\x01", 1]
+    assert len(monitor) == 0
+    assert monitor._recv_waiters == 0
+
+
+@cocotb.test()
+async def test_statistics(dut):
+    """Monitors count bytes, cycles, backpressure and histograms."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    monitor.stats = MonitorStatistics(detailed=True)
+    plain = AvalonSTMonitor(dut, "aso", dut.clk)
+
+    dut.aso_ready.value = 0
+    for i in range(8):
+        driver.append(i)
+    await ClockCycles(dut.clk, 20)
+    dut.aso_ready.value = 1
+    await ClockCycles(dut.clk, 20)
+
+    stats = monitor.stats
+    assert stats.received_transactions == 8
+    assert stats.bytes == 8
+    assert stats.size.buckets == {1: 8}
+    assert stats.interarrival.count == 7
+    assert stats.interarrival.max == 10
+    assert stats.backpressure_cycles >= 10
+    assert stats.active_cycles == 8
+    assert 0 < stats.utilization < 1
+    assert stats.peak_bandwidth > 0
+
+    # only the counters without detailed
+    assert plain.stats.received_transactions == 8
+    assert plain.stats.active_cycles == 8
+    assert plain.stats.bytes == 0
+    assert plain.stats.interarrival.count == 0
+
+    path = os.path.join(tempfile.mkdtemp(), "stats.json")
+    stats.export(path)
+    with open(path) as f:
+        summary = json.load(f)
+    assert summary["bytes"] == 8
+    assert summary["active_cycles"] == 8
+    assert summary["interarrival"]["count"] == 7
+
+
+@cocotb.test()
+async def test_clock_domain(dut):
+    """Monitors sampled by a ClockDomain see the same transactions."""
+    await reset(dut)
+    driver = AvalonSTDriver(dut, "asi", dut.clk)
+    reference = AvalonSTMonitor(dut, "aso", dut.clk)
+    domain = ClockDomain(dut.clk)
+    monitors = [
+        AvalonSTMonitor(dut, "aso", dut.clk, clock_domain=domain) for _ in range(3)
+    ]
+    assert len(domain) == 3
+
+    dut.aso_ready.value = 0
+    for i in range(6):
+        driver.append(i)
+    await ClockCycles(dut.clk, 10)
+    dut.aso_ready.value = 1
+    await ClockCycles(dut.clk, 10)
+
+    for monitor in monitors:
+        assert list(monitor._recvQ) == list(reference._recvQ)
+        assert monitor.stats.cycles == reference.stats.cycles
+        assert monitor.stats.backpressure_cycles == reference.stats.backpressure_cycles
+
+    for monitor in monitors:
+        monitor.kill()
+    assert len(domain) == 0
+    assert domain._thread is None
+
+
+class _FailingMonitor(AvalonSTMonitor):
+    def _sample_cycle(self):
+        raise ValueError("Sampling failed")
+
+
+class _CheckingMonitor(AvalonSTMonitor):
+    def _sample_cycle(self):
+        # sampled after the failing monitor in the same cycle
+        assert len(self._clock_domain) == 1
+        super()._sample_cycle()
+
+
+@cocotb.test(expect_error=ValueError)
+async def test_clock_domain_error(dut):
+    """A monitor failing in a ClockDomain is removed, the others are still sampled."""
+    await reset(dut)
+    domain = ClockDomain(dut.clk)
+    failing = _FailingMonitor(dut, "aso", dut.clk, clock_domain=domain)
+    _CheckingMonitor(dut, "aso", dut.clk, clock_domain=domain)
+    await ClockCycles(dut.clk, 2)
+    assert failing._clock_domain is None
@@ -0,0 +1,18 @@
+// Copyright cocotb contributors
+// Licensed under the Revised BSD License, see LICENSE for details.
+// SPDX-License-Identifier: BSD-3-Clause
+
+module packed_bus
+   (
+      input             clk,
+      input      [11:0] in_port,
+      output reg [11:0] out_port
+      );
+
+   // {error[1:0], unused, valid, data[7:0]}
+   initial out_port = '0;
+
+   always @(posedge clk) begin
+      out_port <= in_port;
+   end
+endmodule
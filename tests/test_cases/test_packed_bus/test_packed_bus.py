@@ -0,0 +1,100 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+import cocotb
+from cocotb.clock import Clock
+from cocotb.triggers import ReadOnly, RisingEdge
+
+from cocotb_bus.bus import Bus
+
+LAYOUT = {"valid": 8, "data": (7, 0), "error": (11, 10)}
+
+
+class Transaction:
+    def __init__(self, valid, data, error):
+        self.valid = valid
+        self.data = data
+        self.error = error
+
+
+@cocotb.test()
+async def test_packed_bus_drive_capture(dut):
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    clkedge = RisingEdge(dut.clk)
+    in_bus = Bus(dut, "in_port", ["valid", "data"], ["error"], layout=LAYOUT)
+    out_bus = Bus(dut, "out_port", ["valid", "data"], ["error"], layout=LAYOUT)
+
+    in_bus.drive(Transaction(1, 0xA5, 2))
+    await clkedge
+    await clkedge
+    await ReadOnly()
+    assert int(dut.out_port.value) == 0b10_0_1_10100101
+    assert out_bus.capture() == {"valid": 1, "data": 0xA5, "error": 2}
+
+    await clkedge
+    # a single field write keeps the other fields
+    in_bus.valid.value = 0
+    await clkedge
+    await clkedge
+    await ReadOnly()
+    assert out_bus.capture() == {"valid": 0, "data": 0xA5, "error": 2}
+    assert out_bus.data.value == 0xA5
+    assert type(out_bus.data.value) is type(out_bus.capture().data)
+    assert len(out_bus.error) == 2
+
+
+@cocotb.test()
+async def test_packed_bus_coalesce(dut):
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    clkedge = RisingEdge(dut.clk)
+    in_bus = Bus(
+        dut,
+        "in_port",
+        ["valid", "data"],
+        ["error"],
+        layout=LAYOUT,
+        coalesce_writes=True,
+    )
+
+    for _ in range(4):
+        in_bus.drive(Transaction(1, 0x11, 0))
+        await clkedge
+    assert in_bus.shadow.writes == 1
+    assert in_bus.shadow.skipped_writes == 3
+
+
+@cocotb.test()
+async def test_packed_bus_coalesce_after_drive(dut):
+    cocotb.start_soon(Clock(dut.clk, 10, "ns").start())
+    clkedge = RisingEdge(dut.clk)
+    in_bus = Bus(
+        dut,
+        "in_port",
+        ["valid", "data"],
+        ["error"],
+        layout=LAYOUT,
+        coalesce_writes=True,
+    )
+
+    in_bus.shadow.valid = 1
+    await clkedge
+    in_bus.drive(Transaction(0, 0x11, 0))
+    await clkedge
+    # the drive changed valid, so writing 1 again isn't skipped
+    in_bus.shadow.valid = 1
+    assert in_bus.shadow.skipped_writes == 0
+    await clkedge
+    await clkedge
+    await ReadOnly()
+    assert int(dut.out_port.value) & 0x1FF == 0x111
+
+
+@cocotb.test()
+async def test_packed_bus_missing_port(dut):
+    try:
+        Bus(dut, "no_port", ["valid", "data"], layout=LAYOUT)
+    except AttributeError as e:
+        assert "no_port" in str(e)
+    else:
+        assert False, "Expected AttributeError for a missing port"
@@ -0,0 +1,329 @@
+# Copyright cocotb contributors
+# Licensed under the Revised BSD License, see LICENSE for details.
+# SPDX-License-Identifier: BSD-3-Clause
+
+"""Tests of the Scoreboard expected output handling."""
+
+import logging
+import tracemalloc
+
+import cocotb
+from cocotb.triggers import Timer
+
+from cocotb_bus.monitors.avalon import AvalonST as AvalonSTMonitor
+from cocotb_bus.scoreboard import ExpectedDigest, ExpectedQueue, Scoreboard
+
+
+@cocotb.test()
+async def test_expected_queue_reorder(dut):
+    """An ExpectedQueue matches reordered transactions within reorder_depth."""
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False)
+    expected = ExpectedQueue([b"a", b"b", b"c"])
+    scoreboard.add_interface(monitor, expected, reorder_depth=2)
+    expected.extend([b"d", b"e"])
+
+    for transaction in [b"c", b"a", b"d", b"b", b"e"]:
+        monitor._recv(transaction)
+    assert scoreboard.errors == 0
+    assert len(expected) == 0
+
+    # b"c" is 3 transactions ahead, beyond the reorder window
+    expected.extend([b"a", b"b", b"x", b"c"])
+    monitor._recv(b"c")
+    assert scoreboard.errors == 1
+    assert list(expected) == [b"b", b"x", b"c"]
+
+
+@cocotb.test()
+async def test_expected_queue_key(dut):
+    """An ExpectedQueue with a key matches transactions by key."""
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False)
+    expected = ExpectedQueue(key=lambda transaction: transaction[:1])
+    scoreboard.add_interface(monitor, expected, reorder_depth=1)
+    expected.extend([b"a1", b"b1", b"a2"])
+
+    monitor._recv(b"b1")
+    monitor._recv(b"a1")
+    assert scoreboard.errors == 0
+    # Matched by key, but the compare still fails
+    monitor._recv(b"a3")
+    assert scoreboard.errors == 1
+    assert len(expected) == 0
+
+
+def _allocated(function):
+    """Return the bytes still allocated by the result of *function*."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        allocated = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    # Kept alive until measured
+    del result
+    return allocated
+
+
+@cocotb.test()
+async def test_expected_queue_memory(dut):
+    """A deep ExpectedQueue costs about as much memory as a list."""
+    packets = [bytes([i % 256]) * 64 for i in range(10000)]
+    in_list = _allocated(lambda: list(packets))
+    in_queue = _allocated(lambda: ExpectedQueue(packets, key=len))
+    assert in_queue < 2 * in_list
+
+
+@cocotb.test()
+async def test_stream_key(dut):
+    """Transactions are in order per stream but reordered across streams."""
+    for expected in [[], ExpectedQueue()]:
+        monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+        scoreboard = Scoreboard(dut, fail_immediately=False)
+        scoreboard.add_interface(
+            monitor, expected, stream_key=lambda transaction: transaction["channel"]
+        )
+        expected.extend(
+            [
+                {"data": b"a", "channel": 0},
+                {"data": b"b", "channel": 0},
+                {"data": b"c", "channel": 1},
+                {"data": b"d", "channel": 1},
+            ]
+        )
+
+        monitor._recv({"data": b"c", "channel": 1})
+        monitor._recv({"data": b"a", "channel": 0})
+        monitor._recv({"data": b"d", "channel": 1})
+        assert scoreboard.errors == 0
+        monitor._recv({"data": b"b", "channel": 1})
+        assert scoreboard.errors == 1
+        assert list(expected) == [{"data": b"b", "channel": 0}]
+        monitor.kill()
+
+
+@cocotb.test()
+async def test_stream_key_iterator(dut):
+    """An iterator is read ahead to the next transaction of a received stream."""
+
+    def model():
+        for channel in [0, 0, 0, 1]:
+            yield {"data": b"a", "channel": channel}
+
+    async def async_model():
+        yield {"data": b"a", "channel": 0}
+
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False)
+    scoreboard.add_interface(
+        monitor, model(), stream_key=lambda transaction: transaction["channel"]
+    )
+    expected = scoreboard.expected[monitor]
+    assert len(expected) == 1
+
+    monitor._recv({"data": b"a", "channel": 1})
+    assert scoreboard.errors == 0
+    assert len(expected) == 3
+    for _ in range(3):
+        monitor._recv({"data": b"a", "channel": 0})
+    monitor._recv({"data": b"a", "channel": 1})
+    assert scoreboard.errors == 1
+    monitor.kill()
+
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    try:
+        scoreboard.add_interface(
+            monitor,
+            async_model(),
+            stream_key=lambda transaction: transaction["channel"],
+        )
+    except ValueError:
+        pass
+    else:
+        assert False, "Expected ValueError without lookahead"
+    monitor.kill()
+
+
+@cocotb.test()
+async def test_iterator_expected(dut):
+    """Expected outputs are pulled from an iterator into a bounded buffer."""
+    pulled = []
+
+    def model():
+        for i in range(1000):
+            pulled.append(i)
+            yield bytes([i % 256])
+
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False)
+    scoreboard.add_interface(monitor, model(), reorder_depth=1)
+    expected = scoreboard.expected[monitor]
+    assert len(pulled) == 2
+
+    monitor._recv(b"\x01")
+    monitor._recv(b"\x00")
+    for i in range(2, 1000):
+        monitor._recv(bytes([i % 256]))
+        assert len(expected) <= 2
+    assert scoreboard.errors == 0
+    assert len(expected) == 0
+    assert expected._source is None
+
+
+@cocotb.test()
+async def test_async_iterator_expected(dut):
+    """Expected outputs are pulled from an asynchronous iterator."""
+
+    async def model():
+        for i in range(10):
+            await Timer(1, "ns")
+            yield bytes([i])
+
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False)
+    scoreboard.add_interface(monitor, model(), lookahead=4)
+    expected = scoreboard.expected[monitor]
+
+    for i in range(10):
+        await Timer(10, "ns")
+        assert 0 < len(expected) <= 4
+        monitor._recv(bytes([i]))
+    await Timer(10, "ns")
+    assert scoreboard.errors == 0
+    assert len(expected) == 0
+
+
+@cocotb.test()
+async def test_async_iterator_result(dut):
+    """The result fails until an asynchronous iterator is exhausted."""
+
+    async def model():
+        yield b"a"
+        await Timer(100, "ns")
+        yield b"b"
+
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False)
+    scoreboard.add_interface(monitor, model())
+    expected = scoreboard.expected[monitor]
+
+    await Timer(10, "ns")
+    monitor._recv(b"a")
+    await Timer(10, "ns")
+    assert len(expected) == 0
+    try:
+        scoreboard.result()
+    except AssertionError:
+        pass
+    else:
+        assert False, "Expected the result to fail"
+
+    await Timer(100, "ns")
+    monitor._recv(b"b")
+    await Timer(10, "ns")
+    scoreboard.result()
+
+
+@cocotb.test()
+async def test_digest_expected(dut):
+    """An ExpectedQueue storing digests matches by digest and fetches on mismatch."""
+
+    def packet(index):
+        return bytes(range(index, index + 64))
+
+    fetched = []
+
+    def fetch(index):
+        fetched.append(index)
+        return packet(index)
+
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False)
+    expected = ExpectedQueue(digest=True, fetch=fetch)
+    scoreboard.add_interface(monitor, expected, reorder_depth=1)
+    expected.extend(packet(i) for i in range(4))
+    assert all(isinstance(exp, ExpectedDigest) for exp in expected)
+
+    monitor._recv(packet(1))
+    monitor._recv(packet(0))
+    assert scoreboard.errors == 0
+    assert fetched == []
+
+    monitor._recv(b"corrupted")
+    assert scoreboard.errors == 1
+    assert fetched == [2]
+
+    expected._fetch = None
+    monitor._recv(b"corrupted")
+    assert scoreboard.errors == 2
+    assert len(expected) == 0
+
+
+@cocotb.test()
+async def test_digest_memory(dut):
+    """An ExpectedQueue storing digests costs much less memory than the packets."""
+
+    def packets():
+        return (bytes([i % 256]) * 64 for i in range(10000))
+
+    in_list = _allocated(lambda: list(packets()))
+    in_queue = _allocated(lambda: ExpectedQueue(packets(), digest=True))
+    assert in_queue * 3 < in_list
+
+
+@cocotb.test()
+async def test_digest_strict_type(dut):
+    """A digest only matches a transaction of the expected type with strict_type."""
+    for strict_type, errors in [(True, 2), (False, 1)]:
+        monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+        scoreboard = Scoreboard(dut, fail_immediately=False)
+        expected = ExpectedQueue([b"ab", b"cd"], digest=True)
+        scoreboard.add_interface(monitor, expected, strict_type=strict_type)
+
+        monitor._recv(bytearray(b"ab"))
+        monitor._recv("cd")
+        assert scoreboard.errors == errors
+        assert len(expected) == 0
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@cocotb.test()
+async def test_mismatch_report(dut):
+    """Mismatches report the first differing offset, capped by max_reports."""
+    monitor = AvalonSTMonitor(dut, "aso", dut.clk)
+    scoreboard = Scoreboard(dut, fail_immediately=False, report_size=64, max_reports=2)
+    expected = []
+    scoreboard.add_interface(monitor, expected, strict_type=False)
+    records = _Records()
+    logger = logging.getLogger(scoreboard.log.name)
+    logger.addHandler(records)
+    try:
+        # Equal buffers of different types match without strict_type
+        expected.append(bytearray(b"abc"))
+        monitor._recv(b"abc")
+        assert scoreboard.errors == 0
+
+        packet = bytes(4096)
+        expected.extend([packet] * 4)
+        for _ in range(4):
+            monitor._recv(packet[:1000] + b"\x01" + packet[1001:])
+    finally:
+        logger.removeHandler(records)
+
+    assert scoreboard.errors == 4
+    differences = [m for m in records.messages if m.startswith("Difference")]
+    assert len(differences) == 2
+    assert "First difference at offset 1000" in differences[0]
+    # Capped to report_size bytes around the difference
+    assert len(differences[0]) < 1024
+    assert any("max_reports is 2" in m for m in records.messages)